@@ -1,2 +1,3 @@
 from . import models
-from . import wizards
\ No newline at end of file
+from . import wizards
+from . import controllers
\ No newline at end of file
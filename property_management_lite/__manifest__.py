@@ -1,6 +1,6 @@
 {
     'name': 'Property Management Lite',
-    'version': '18.0.1.0.0',
+    'version': '18.0.1.2.0',
     'category': 'Real Estate',
     'summary': 'Complete Property & Room Rental Management System with Advanced Financial Tracking',
     'description': """
@@ -71,6 +71,12 @@ Optimized for Dubai real estate market with AED currency support.
         'data/cron_create_collection_statements.xml',
         'data/cron_cleanup_statement_entries.xml',
         'data/cron_recalculate_balances.xml',
+        'data/cron_archive_statements.xml',
+        'data/cron_process_payment_jobs.xml',
+        'data/cron_refresh_collection_stats.xml',
+        'data/cron_refresh_dashboard_snapshots.xml',
+        'data/cron_update_kpi_daily.xml',
+        'data/cron_refresh_kpi_today.xml',
         # 'data/email_templates.xml',
 
         # Views - Dashboard
@@ -95,6 +101,13 @@ Optimized for Dubai real estate market with AED currency support.
         # Wizards
         'wizards/property_data_import_wizard_views.xml',
         'views/statement_wizard_views.xml',  # Fixed path
+        'views/collection_bulk_wizard_views.xml',
+        'views/collection_fifo_wizard_views.xml',
+        'views/payment_job_views.xml',
+        'views/bank_import_views.xml',
+        'views/payment_journal_map_views.xml',
+        'views/dashboard_snapshot_views.xml',
+        'views/kpi_daily_views.xml',
 
         # Report templates
         'reports/invoice_reports.xml',
@@ -108,6 +121,11 @@ Optimized for Dubai real estate market with AED currency support.
         # Menus (must come after all views that define actions)
         'views/menu_views.xml',
     ],
+    'assets': {
+        'web.assets_backend': [
+            'property_management_lite/static/src/dashboard/*',
+        ],
+    },
     'installable': True,
     'images': ['static/description/banner.jpg'],
     'auto_install': False,
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+from odoo import fields, http
+from odoo.http import request
+from werkzeug.exceptions import Forbidden, NotFound
+import logging
+import time
+
+from ..models.property_dashboard import DASHBOARD_SECTIONS
+from ..models.property_kpi_daily import ROLLUP_SECTIONS
+
+_logger = logging.getLogger(__name__)
+
+
+class PropertyDashboardController(http.Controller):
+
+    def _check_access(self):
+        if not request.env.user.has_group('property_management_lite.group_property_user'):
+            raise Forbidden()
+
+    @http.route('/property_management_lite/dashboard_properties', type='json', auth='user')
+    def dashboard_properties(self):
+        """Properties the dashboard can be filtered on, and the user's default filter"""
+        self._check_access()
+        properties = request.env['property.property'].search_fetch([], ['name'], order='name')
+        return {
+            'properties': [{'id': prop.id, 'name': prop.name} for prop in properties],
+            'default_ids': request.env['property.dashboard']._get_default_property_ids(),
+        }
+
+    @http.route('/property_management_lite/dashboard/<string:section>', type='json', auth='user')
+    def dashboard_card(self, section, refresh=False, property_ids=None):
+        """Figures of one dashboard card, served from its KPI snapshot
+
+        Each card has its own snapshot (and so its own TTL cache), so the
+        client can request every card in parallel and render them as they come.
+        With ``property_ids`` the sections kept per property are summed from
+        the daily KPI rows of those properties instead, as last written by
+        the refresh cron; the other sections, and the ones the user only sees
+        under record rules, stay portfolio-wide (``filtered`` is false).
+        """
+        if section not in DASHBOARD_SECTIONS:
+            raise NotFound()
+        self._check_access()
+        started = time.time()
+        # Figures computed by this request carry its transaction time; older ones came from the cache
+        request_time = request.env['property.dashboard.snapshot']._get_transaction_time()
+        # The daily rows ignore record rules: restricted users get those sections unfiltered
+        restricted = request.env['property.dashboard.snapshot']._get_restricted_sections()
+        if property_ids and section in ROLLUP_SECTIONS and section not in restricted:
+            properties = request.env['property.property'].search([('id', 'in', property_ids)])
+            KpiDaily = request.env['property.kpi.daily'].sudo()
+            today = fields.Date.today()
+            refreshed_at = KpiDaily._get_today_written(today, request.env.company)
+            values = KpiDaily._get_dashboard_figures(properties.ids, today=today)[section]
+            server_ms = int((time.time() - started) * 1000)
+            return {
+                'section': section,
+                'values': values,
+                'refreshed_at': fields.Datetime.to_string(refreshed_at),
+                'cached': True,
+                'compute_ms': server_ms,
+                'server_ms': server_ms,
+                'filtered': True,
+            }
+        card = request.env['property.dashboard.snapshot']._get_sections(
+            sections=[section], refresh_stale=refresh)[section]
+        server_ms = int((time.time() - started) * 1000)
+        cached = card['refreshed_at'] < request_time
+        _logger.debug("Dashboard card %s served in %sms (%s)", section, server_ms, 'cached' if cached else 'computed')
+        return {
+            'section': section,
+            'values': card['values'],
+            'refreshed_at': fields.Datetime.to_string(card['refreshed_at']),
+            'cached': cached,
+            'compute_ms': card['compute_ms'],
+            'server_ms': server_ms,
+            'filtered': not property_ids,
+        }
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+"""Move collection receipt images to filestore attachments and build their thumbnails
+
+Databases where ``receipt_image`` still lives in a bytea column of
+property_collection get the blobs moved out batch by batch, then the
+column dropped. Receipts already stored as attachments only get their
+128px and 512px thumbnails generated.
+"""
+from odoo import api, SUPERUSER_ID
+from odoo.tools.sql import column_exists
+import logging
+
+_logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+
+def _move_column_blobs(env):
+    cr = env.cr
+    if not column_exists(cr, 'property_collection', 'receipt_image'):
+        return
+    Collection = env['property.collection'].with_context(active_test=False, tracking_disable=True)
+    moved = 0
+    while True:
+        cr.execute("""
+            SELECT id, receipt_image FROM property_collection
+             WHERE receipt_image IS NOT NULL
+          ORDER BY id LIMIT %s
+        """, (BATCH_SIZE,))
+        rows = cr.fetchall()
+        if not rows:
+            break
+        for collection_id, blob in rows:
+            # Binary columns hold the base64 text, which is what the field expects
+            Collection.browse(collection_id).write({'receipt_image': bytes(blob)})
+        env.flush_all()
+        cr.execute("UPDATE property_collection SET receipt_image = NULL WHERE id = ANY(%s)",
+                   ([row[0] for row in rows],))
+        env.invalidate_all()
+        moved += len(rows)
+        _logger.info("Moved %s collection receipt images to attachments", moved)
+    cr.execute("ALTER TABLE property_collection DROP COLUMN receipt_image")
+
+
+def _generate_thumbnails(env):
+    cr = env.cr
+    cr.execute("""
+        SELECT a.res_id FROM ir_attachment a
+         WHERE a.res_model = 'property.collection' AND a.res_field = 'receipt_image' AND a.res_id IS NOT NULL
+           AND NOT EXISTS (
+               SELECT 1 FROM ir_attachment t
+                WHERE t.res_model = 'property.collection' AND t.res_field = 'receipt_image_128'
+                  AND t.res_id = a.res_id
+           )
+      ORDER BY a.res_id
+    """)
+    collection_ids = [row[0] for row in cr.fetchall()]
+    Collection = env['property.collection'].with_context(active_test=False)
+    thumbnail_fields = [Collection._fields['receipt_image_128'], Collection._fields['receipt_image_512']]
+    for offset in range(0, len(collection_ids), BATCH_SIZE):
+        collections = Collection.browse(collection_ids[offset:offset + BATCH_SIZE]).exists()
+        for field in thumbnail_fields:
+            env.add_to_compute(field, collections)
+        collections.flush_recordset(['receipt_image_128', 'receipt_image_512'])
+        env.invalidate_all()
+        _logger.info("Generated receipt thumbnails for %s of %s collections",
+                     min(offset + BATCH_SIZE, len(collection_ids)), len(collection_ids))
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    _move_column_blobs(env)
+    _generate_thumbnails(env)
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+"""Set the company of existing collections
+
+The new column is filled with the main company on upgrade; collections
+already posted as payments take the company of their payment instead.
+"""
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    if not version:
+        return
+    cr.execute("""
+        UPDATE property_collection c
+           SET company_id = p.company_id
+          FROM account_payment p
+         WHERE p.id = c.payment_id
+           AND c.company_id IS DISTINCT FROM p.company_id
+    """)
+    _logger.info("Set the payment company on %s collections", cr.rowcount)
@@ -30,3 +30,13 @@ from . import property_dashboard
 from . import property_other_charges
 from . import property_outstanding_dues
 from . import property_statement
+from . import property_statement_checkpoint
+from . import property_statement_archive
+from . import property_payment_job
+from . import property_bank_import
+from . import property_payment_journal_map
+from . import property_collection_stats
+from . import property_dashboard_snapshot
+from . import property_kpi_daily
+# Keep last: its create() must wrap every other property.collection override
+from . import property_collection_idempotency
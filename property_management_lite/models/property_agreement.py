@@ -19,8 +19,12 @@
 ################################################################################
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools.sql import create_index
 from datetime import datetime, timedelta
 
+# Agreement states whose statement entries can move to the archive
+CLOSED_STATES = ('expired', 'terminated', 'cancelled')
+
 
 class PropertyAgreement(models.Model):
     _name = 'property.agreement'
@@ -83,6 +87,18 @@ class PropertyAgreement(models.Model):
     invoice_ids = fields.One2many('account.move', 'agreement_id', 'Invoices')
     invoices_count = fields.Integer('Invoices Count', compute='_compute_invoices_count',)
 
+    def init(self):
+        # Room occupancy and overlap checks filter by room, state and period
+        create_index(self.env.cr, 'property_agreement_room_state_period_idx', self._table,
+                     ['room_id', 'state', 'start_date', 'end_date'])
+        # Agreements closed before closed_date existed: best guess is their last change
+        self.env.cr.execute("""
+            UPDATE property_agreement
+               SET closed_date = LEAST(COALESCE(write_date::date, end_date), end_date)
+             WHERE closed_date IS NULL
+               AND state IN %s
+        """, (CLOSED_STATES,))
+
     def _compute_invoices_count(self):
         for agreement in self:
             active_invoices = agreement.invoice_ids.filtered('active')
@@ -136,6 +152,8 @@ class PropertyAgreement(models.Model):
         ('terminated', 'Terminated'),
         ('cancelled', 'Cancelled'),
     ], string='Status', default='draft', tracking=True)
+    closed_date = fields.Date('Closed On', readonly=True, copy=False,
+                              help="Date the agreement was terminated, expired or cancelled")
     
     # Agreement Details
     agreement_type = fields.Selection([
@@ -161,9 +179,11 @@ class PropertyAgreement(models.Model):
     # Computed Fields
     duration_months = fields.Integer('Duration (Months)', compute='_compute_duration')
     days_remaining = fields.Integer('Days Remaining', compute='_compute_days_remaining')
-    total_collected = fields.Monetary('Total Collected', compute='_compute_payment_stats', currency_field='currency_id')
-    pending_amount = fields.Monetary('Pending Amount', compute='_compute_payment_stats', currency_field='currency_id')
-    last_payment_date = fields.Date('Last Payment', compute='_compute_payment_stats')
+    # Stored without collection dependencies: computed once on creation (and on install),
+    # then kept up to date by property.collection._apply_collection_stat_deltas()
+    total_collected = fields.Monetary('Total Collected', compute='_compute_payment_stats', store=True, currency_field='currency_id')
+    pending_amount = fields.Monetary('Pending Amount', compute='_compute_pending_amount', store=True, currency_field='currency_id')
+    last_payment_date = fields.Date('Last Payment', compute='_compute_payment_stats', store=True)
     
     # Financial
     currency_id = fields.Many2one('res.currency', 'Currency', 
@@ -203,19 +223,20 @@ class PropertyAgreement(models.Model):
             else:
                 record.days_remaining = 0
     
-    @api.depends('collection_ids.amount_collected', 'collection_ids.active', 'start_date')
     def _compute_payment_stats(self):
+        stats = self.env['property.collection']._get_collection_stats('agreement_id', self._origin.ids)
+        for record in self:
+            record.total_collected, record.last_payment_date = stats.get(record._origin.id, (0.0, False))
+    
+    @api.depends('state', 'rent_amount', 'start_date', 'total_collected')
+    def _compute_pending_amount(self):
+        from dateutil.relativedelta import relativedelta
+        today = fields.Date.today()
         for record in self:
-            active_collections = record.collection_ids.filtered('active')
-            record.total_collected = sum(active_collections.mapped('amount_collected'))
-            record.last_payment_date = max(active_collections.mapped('date')) if active_collections else False
-            
             # Calculate pending amount using whole complete months
-            if record.state == 'active':
-                from dateutil.relativedelta import relativedelta
-                
+            if record.state == 'active' and record.start_date:
                 # Calculate complete months between start_date and today
-                delta = relativedelta(fields.Date.today(), record.start_date)
+                delta = relativedelta(today, record.start_date)
                 complete_months = delta.years * 12 + delta.months
                 
                 # Expected amount based on complete months only (no partial months)
@@ -322,12 +343,12 @@ class PropertyAgreement(models.Model):
         """Create initial statement entries for agreement dues"""
         self.ensure_one()
         
-        statement_obj = self.env['property.statement']
         today = fields.Date.today()
+        vals_list = []
         
         # 1. Create entry for opening balance (if > 0 and not already recorded)
         if self.opening_balance > 0 and not self.opening_balance_recorded:
-            statement_obj.create({
+            vals_list.append({
                 'tenant_id': self.tenant_id.id,
                 'agreement_id': self.id,
                 'transaction_date': today,
@@ -337,12 +358,10 @@ class PropertyAgreement(models.Model):
                 'debit_amount': self.opening_balance,
                 'credit_amount': 0.0,
             })
-            # Mark as recorded so it doesn't get created again
-            self.opening_balance_recorded = True
         
         # 2. Create entry for security deposit (if not paid)
         if self.deposit_amount > 0:
-            statement_obj.create({
+            vals_list.append({
                 'tenant_id': self.tenant_id.id,
                 'agreement_id': self.id,
                 'transaction_date': today,
@@ -355,7 +374,7 @@ class PropertyAgreement(models.Model):
         
         # 3. Create entry for parking charges (if > 0)
         if self.parking_charges > 0:
-            statement_obj.create({
+            vals_list.append({
                 'tenant_id': self.tenant_id.id,
                 'agreement_id': self.id,
                 'transaction_date': today,
@@ -369,7 +388,7 @@ class PropertyAgreement(models.Model):
         # 4. Create entries for other charges (if > 0)
         for charge in self.other_charges_ids:
             if charge.amount > 0:
-                statement_obj.create({
+                vals_list.append({
                     'tenant_id': self.tenant_id.id,
                     'agreement_id': self.id,
                     'transaction_date': today,
@@ -380,11 +399,12 @@ class PropertyAgreement(models.Model):
                     'credit_amount': 0.0,
                 })
         
-        # Recalculate running balances for this tenant
-        tenant_statements = statement_obj.search([
-            ('tenant_id', '=', self.tenant_id.id)
-        ], order='transaction_date asc, id asc')
-        tenant_statements._compute_running_balance()
+        # Single insert; running balances are recomputed once for the tenant
+        self.env['property.statement'].create(vals_list)
+        
+        # Mark as recorded so it doesn't get created again
+        if self.opening_balance > 0 and not self.opening_balance_recorded:
+            self.opening_balance_recorded = True
     
     def action_terminate(self):
         """Regular termination - just marks agreement as terminated"""
@@ -511,6 +531,13 @@ class PropertyAgreement(models.Model):
         
         result = super().write(vals)
         
+        # Stamp the closing date, cleared again if the agreement is reopened
+        if 'state' in vals and 'closed_date' not in vals:
+            if vals['state'] in CLOSED_STATES:
+                self.filtered(lambda a: not a.closed_date).write({'closed_date': fields.Date.today()})
+            else:
+                self.filtered('closed_date').write({'closed_date': False})
+        
         # If active field is being changed, invalidate tenant computed fields
         if 'active' in vals:
             tenants_to_recompute = self.mapped('tenant_id')
@@ -523,10 +550,8 @@ class PropertyAgreement(models.Model):
     @api.model
     def cron_recompute_outstanding_dues(self):
         """Cron job to recompute all outstanding dues - useful after code changes"""
-        # Recompute all active agreements
-        agreements = self.search([('state', '=', 'active')])
-        if agreements:
-            agreements._compute_payment_stats()
+        # Repair the stored collection aggregates (and pending amounts) from the collections
+        self.env['property.collection']._rebuild_collection_stats()
         
         # Recompute all flats
         flats = self.env['property.flat'].search([])
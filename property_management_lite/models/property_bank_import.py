@@ -0,0 +1,495 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from datetime import datetime, timedelta
+from lxml import etree
+import base64
+import csv
+import io
+import logging
+import re
+import time
+
+_logger = logging.getLogger(__name__)
+
+MATCH_DAYS_PARAM = 'property_management_lite.bank_match_days'
+MATCH_DAYS_DEFAULT = 3
+
+# Accepted CSV headers for each line value, lower-cased
+CSV_COLUMNS = {
+    'date': ('date', 'booking date', 'value date', 'transaction date'),
+    'amount': ('amount', 'value'),
+    'credit': ('credit', 'credit amount', 'deposit'),
+    'debit': ('debit', 'debit amount', 'withdrawal'),
+    'reference': ('reference', 'ref', 'transaction reference', 'cheque number'),
+    'description': ('description', 'details', 'narrative', 'remittance information'),
+    'counterparty': ('counterparty', 'name', 'payer', 'beneficiary'),
+    'bank_reference': ('bank reference', 'transaction id', 'id'),
+}
+CSV_DATE_FORMATS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%m/%d/%Y', '%d/%m/%y')
+
+TOKEN_RE = re.compile(r'[A-Za-z0-9][A-Za-z0-9/\-]{3,}')
+
+
+def _normalize_ref(value):
+    """Upper-case a reference and keep only letters and digits"""
+    return re.sub(r'[^0-9A-Z]', '', (value or '').upper())
+
+
+def _ref_keys(value):
+    """Lookup keys of a reference; numbers also match without leading zeros"""
+    key = _normalize_ref(value)
+    if len(key) < 4:
+        return []
+    keys = [key]
+    if key.isdigit() and key.lstrip('0') != key and len(key.lstrip('0')) >= 4:
+        keys.append(key.lstrip('0'))
+    return keys
+
+
+def _cents(amount):
+    return int(round((amount or 0.0) * 100))
+
+
+class PropertyBankImport(models.Model):
+    _name = 'property.bank.import'
+    _description = 'Bank Statement Import'
+    _order = 'create_date desc, id desc'
+
+    name = fields.Char(string='Name', required=True,
+                       default=lambda self: _('Bank Import %s') % fields.Date.context_today(self))
+    journal_id = fields.Many2one('account.journal', string='Bank Journal', domain="[('type', '=', 'bank')]")
+    statement_file = fields.Binary(string='Statement File', required=True, attachment=True)
+    filename = fields.Char(string='File Name')
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('camt053', 'CAMT.053 (XML)'),
+    ], string='Format', help="Detected from the file name when left empty")
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('matched', 'Matched'),
+        ('done', 'Confirmed'),
+    ], string='Status', default='draft', required=True, readonly=True)
+    line_ids = fields.One2many('property.bank.import.line', 'import_id', string='Bank Lines')
+
+    # Figures of the last matching run, written once instead of computed over the lines
+    date_from = fields.Date(string='From', readonly=True)
+    date_to = fields.Date(string='To', readonly=True)
+    line_count = fields.Integer(string='Lines', readonly=True)
+    matched_count = fields.Integer(string='Matched', readonly=True)
+    mismatch_count = fields.Integer(string='Mismatches', readonly=True)
+    ambiguous_count = fields.Integer(string='Ambiguous', readonly=True)
+    unmatched_count = fields.Integer(string='Unmatched', readonly=True)
+    total_credit = fields.Float(string='Total Received', digits=(16, 2), readonly=True)
+    matched_amount = fields.Float(string='Matched Amount', digits=(16, 2), readonly=True)
+    import_log = fields.Text(string='Import Log', readonly=True)
+
+    # ------------------------------------------------------------------
+    # Parsing
+    # ------------------------------------------------------------------
+    def _get_file_format(self):
+        self.ensure_one()
+        if self.file_format:
+            return self.file_format
+        if (self.filename or '').lower().endswith('.xml'):
+            return 'camt053'
+        return 'csv'
+
+    def _parse_file(self):
+        """Parse the statement file into a list of line value dicts"""
+        self.ensure_one()
+        if not self.statement_file:
+            raise UserError(_('Please upload a statement file.'))
+        data = base64.b64decode(self.statement_file)
+        if self._get_file_format() == 'camt053':
+            return self._parse_camt053(data)
+        return self._parse_csv(data)
+
+    @api.model
+    def _parse_csv_date(self, value):
+        value = (value or '').strip()
+        for date_format in CSV_DATE_FORMATS:
+            try:
+                return datetime.strptime(value, date_format).date()
+            except ValueError:
+                continue
+        return False
+
+    @api.model
+    def _parse_csv_amount(self, value):
+        value = (value or '').strip().replace(',', '').replace(' ', '')
+        if value.startswith('(') and value.endswith(')'):
+            value = '-' + value[1:-1]
+        try:
+            return float(value) if value else 0.0
+        except ValueError:
+            return 0.0
+
+    @api.model
+    def _parse_csv(self, data):
+        """Read a CSV export; either an 'amount' column or 'credit'/'debit' columns are needed"""
+        text = data.decode('utf-8-sig', errors='replace')
+        try:
+            dialect = csv.Sniffer().sniff(text[:4096], delimiters=',;\t|')
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(io.StringIO(text), dialect)
+        header = [column.strip().lower() for column in next(reader, [])]
+        columns = {}
+        for key, names in CSV_COLUMNS.items():
+            for name in names:
+                if name in header:
+                    columns[key] = header.index(name)
+                    break
+        if 'date' not in columns or not ({'amount', 'credit'} & set(columns)):
+            raise UserError(_("The CSV file needs a 'Date' column and an 'Amount' or 'Credit' column."))
+
+        def cell(row, key):
+            index = columns.get(key)
+            return row[index].strip() if index is not None and index < len(row) else ''
+
+        lines = []
+        for row in reader:
+            if not any(row):
+                continue
+            if 'amount' in columns:
+                amount = self._parse_csv_amount(cell(row, 'amount'))
+            else:
+                amount = self._parse_csv_amount(cell(row, 'credit')) - abs(self._parse_csv_amount(cell(row, 'debit')))
+            lines.append({
+                'date': self._parse_csv_date(cell(row, 'date')),
+                'amount': amount,
+                'reference': cell(row, 'reference'),
+                'description': cell(row, 'description'),
+                'counterparty': cell(row, 'counterparty'),
+                'bank_reference': cell(row, 'bank_reference'),
+            })
+        return lines
+
+    @api.model
+    def _parse_camt053(self, data):
+        """Stream the <Ntry> elements of a CAMT.053 file, one line per transaction detail"""
+        lines = []
+        parser = etree.iterparse(io.BytesIO(data), events=('end',), tag='{*}Ntry',
+                                 resolve_entities=False, no_network=True, huge_tree=True)
+        try:
+            for _event, entry in parser:
+                sign = -1 if entry.findtext('{*}CdtDbtInd') == 'DBIT' else 1
+                entry_date = entry.findtext('{*}BookgDt/{*}Dt') or entry.findtext('{*}ValDt/{*}Dt') \
+                    or (entry.findtext('{*}BookgDt/{*}DtTm') or '')[:10]
+                entry_ref = entry.findtext('{*}AcctSvcrRef') or entry.findtext('{*}NtryRef') or ''
+                details = entry.findall('{*}NtryDtls/{*}TxDtls')
+                for detail in details or [None]:
+                    amount = entry.findtext('{*}Amt')
+                    reference = description = counterparty = bank_reference = ''
+                    if detail is not None:
+                        if len(details) > 1:
+                            amount = detail.findtext('{*}AmtDtls/{*}TxAmt/{*}Amt') or detail.findtext('{*}Amt') or amount
+                        reference = (detail.findtext('{*}RmtInf/{*}Strd/{*}CdtrRefInf/{*}Ref')
+                                     or detail.findtext('{*}Refs/{*}EndToEndId') or '')
+                        description = ' '.join(text.strip() for text in detail.xpath('.//*[local-name()="Ustrd"]/text()'))
+                        counterparty = (detail.findtext('{*}RltdPties/{*}Dbtr/{*}Nm')
+                                        or detail.findtext('{*}RltdPties/{*}Dbtr/{*}Pty/{*}Nm') or '')
+                        bank_reference = detail.findtext('{*}Refs/{*}AcctSvcrRef') or ''
+                    if reference == 'NOTPROVIDED':
+                        reference = ''
+                    lines.append({
+                        'date': entry_date and fields.Date.to_date(entry_date[:10]),
+                        'amount': sign * float(amount or 0.0),
+                        'reference': reference,
+                        'description': description or entry.findtext('{*}AddtlNtryInf') or '',
+                        'counterparty': counterparty,
+                        'bank_reference': bank_reference or entry_ref,
+                    })
+                # Entries are independent; free them as we go to keep memory flat
+                entry.clear()
+                while entry.getprevious() is not None:
+                    del entry.getparent()[0]
+        except etree.XMLSyntaxError as e:
+            raise UserError(_('The CAMT.053 file could not be read: %s') % e)
+        return lines
+
+    # ------------------------------------------------------------------
+    # Matching
+    # ------------------------------------------------------------------
+    def _get_match_days(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(MATCH_DAYS_PARAM, MATCH_DAYS_DEFAULT))
+
+    def _build_match_indexes(self, date_from, date_to, days):
+        """Load candidate collections and open invoices once and hash them
+
+        Collections are keyed by normalized reference and by amount in cents;
+        invoices by normalized number and payment reference. Collections
+        already matched by another import are left out.
+        """
+        self.ensure_one()
+        collections = self.env['property.collection'].search_fetch([
+            ('status', 'in', ['collected', 'verified', 'deposited']),
+            ('date', '>=', date_from - timedelta(days=days)),
+            ('date', '<=', date_to + timedelta(days=days)),
+        ], ['reference_number', 'amount_collected', 'date', 'tenant_id'])
+        taken = {
+            collection.id for [collection] in self.env['property.bank.import.line']._read_group([
+                ('collection_id', 'in', collections.ids),
+                ('import_id', '!=', self.id),
+                ('match_state', '=', 'matched'),
+            ], ['collection_id'])
+        }
+        by_ref, by_amount = {}, {}
+        for collection in collections:
+            if collection.id in taken:
+                continue
+            for key in _ref_keys(collection.reference_number):
+                by_ref.setdefault(key, []).append(collection)
+            by_amount.setdefault(_cents(collection.amount_collected), []).append(collection)
+
+        invoices = self.env['account.move'].search_fetch([
+            ('move_type', '=', 'out_invoice'),
+            ('state', '=', 'posted'),
+            ('payment_state', 'in', ['not_paid', 'partial']),
+            ('tenant_id', '!=', False),
+        ], ['name', 'payment_reference', 'amount_residual', 'tenant_id'])
+        by_invoice = {}
+        for invoice in invoices:
+            for key in set(_ref_keys(invoice.name) + _ref_keys(invoice.payment_reference)):
+                by_invoice.setdefault(key, invoice)
+        return {
+            'by_ref': by_ref,
+            'by_amount': by_amount,
+            'by_invoice': by_invoice,
+            'residuals': {invoice.id: invoice.amount_residual for invoice in invoices},
+        }
+
+    @api.model
+    def _match_line(self, vals, indexes, claimed, days):
+        """Match one parsed line in place; ``claimed`` holds collection ids already used"""
+        vals.update(match_state='unmatched', match_rule=False, collection_id=False,
+                    invoice_id=False, tenant_id=False, candidate_count=0, match_note=False)
+        if vals['amount'] <= 0:
+            vals['match_state'] = 'ignored'
+            return vals
+        cents = _cents(vals['amount'])
+        line_date = vals['date']
+
+        # 1. Reference: the whole reference, then every token of reference and description
+        keys = _ref_keys(vals['reference'])
+        for token in TOKEN_RE.findall('%s %s' % (vals['reference'], vals['description'])):
+            keys += _ref_keys(token)
+        for key in keys:
+            candidates = [c for c in indexes['by_ref'].get(key, []) if c.id not in claimed]
+            if not candidates:
+                continue
+            exact = [c for c in candidates if _cents(c.amount_collected) == cents]
+            collection = (exact or candidates)[0]
+            claimed.add(collection.id)
+            vals.update(collection_id=collection.id, tenant_id=collection.tenant_id.id,
+                        match_rule='reference', candidate_count=len(candidates))
+            if exact:
+                vals['match_state'] = 'matched'
+            else:
+                vals['match_state'] = 'mismatch'
+                vals['match_note'] = _('Reference found but the collection amount is %.2f') % collection.amount_collected
+            return vals
+
+        # 2. Amount within the date window, narrowed by payer name when several fit
+        if line_date:
+            candidates = [
+                c for c in indexes['by_amount'].get(cents, [])
+                if c.id not in claimed and abs((c.date - line_date).days) <= days
+            ]
+            if len(candidates) > 1 and vals['counterparty']:
+                payer = _normalize_ref(vals['counterparty'])
+                named = [c for c in candidates if _normalize_ref(c.tenant_id.name) == payer]
+                candidates = named or candidates
+            if candidates:
+                candidates.sort(key=lambda c: (abs((c.date - line_date).days), c.id))
+                collection = candidates[0]
+                vals.update(collection_id=collection.id, tenant_id=collection.tenant_id.id,
+                            match_rule='amount_date', candidate_count=len(candidates))
+                if len(candidates) == 1:
+                    claimed.add(collection.id)
+                    vals['match_state'] = 'matched'
+                else:
+                    vals['match_state'] = 'ambiguous'
+                    vals['match_note'] = _('%s collections of this amount in the date window') % len(candidates)
+                return vals
+
+        # 3. Open invoice quoted in the reference or description
+        for key in keys:
+            invoice = indexes['by_invoice'].get(key)
+            if not invoice:
+                continue
+            residual = indexes['residuals'][invoice.id]
+            vals.update(invoice_id=invoice.id, tenant_id=invoice.tenant_id.id,
+                        match_rule='invoice', candidate_count=1)
+            if cents <= _cents(residual):
+                indexes['residuals'][invoice.id] = residual - vals['amount']
+                vals['match_state'] = 'matched'
+            else:
+                vals['match_state'] = 'mismatch'
+                vals['match_note'] = _('Invoice %s only has %.2f open') % (invoice.name, residual)
+            return vals
+        return vals
+
+    def _match_lines(self, lines):
+        """Match parsed lines and replace the import's lines with the result"""
+        self.ensure_one()
+        started = time.time()
+        dated = [vals['date'] for vals in lines if vals.get('date')]
+        date_from = min(dated) if dated else fields.Date.context_today(self)
+        date_to = max(dated) if dated else date_from
+        days = self._get_match_days()
+        indexes = self._build_match_indexes(date_from, date_to, days)
+        claimed = set()
+        for sequence, vals in enumerate(lines, start=1):
+            vals['sequence'] = sequence
+            self._match_line(vals, indexes, claimed, days)
+        matching_time = time.time() - started
+
+        self.line_ids.unlink()
+        self.env['property.bank.import.line'].create([dict(vals, import_id=self.id) for vals in lines])
+
+        counts = dict.fromkeys(['matched', 'mismatch', 'ambiguous', 'unmatched', 'ignored'], 0)
+        for vals in lines:
+            counts[vals['match_state']] += 1
+        elapsed = time.time() - started
+        self.write({
+            'state': 'matched',
+            'date_from': date_from,
+            'date_to': date_to,
+            'line_count': len(lines),
+            'matched_count': counts['matched'],
+            'mismatch_count': counts['mismatch'],
+            'ambiguous_count': counts['ambiguous'],
+            'unmatched_count': counts['unmatched'],
+            'total_credit': sum(vals['amount'] for vals in lines if vals['amount'] > 0),
+            'matched_amount': sum(vals['amount'] for vals in lines if vals['match_state'] == 'matched'),
+            'import_log': _(
+                "%(lines)s lines: %(matched)s matched, %(mismatch)s mismatches, %(ambiguous)s ambiguous, "
+                "%(unmatched)s unmatched, %(ignored)s outgoing ignored.\n"
+                "Matched in %(matching).2fs, saved in %(total).2fs (date window ±%(days)s days)."
+            ) % dict(counts, lines=len(lines), matching=matching_time, total=elapsed, days=days),
+        })
+        _logger.info("Bank import %s: %s lines matched in %.2fs (%.2fs total)",
+                     self.id, len(lines), matching_time, elapsed)
+
+    # ------------------------------------------------------------------
+    # Actions
+    # ------------------------------------------------------------------
+    def action_import(self):
+        """Parse the uploaded file and match its lines"""
+        for record in self:
+            if record.state == 'done':
+                raise UserError(_('Confirmed imports cannot be imported again.'))
+            started = time.time()
+            lines = record._parse_file()
+            if not lines:
+                raise UserError(_('No transactions were found in the file.'))
+            _logger.info("Bank import %s: parsed %s lines in %.2fs", record.id, len(lines), time.time() - started)
+            record._match_lines(lines)
+        return True
+
+    def action_rematch(self):
+        """Match the stored lines again, e.g. after entering missing collections"""
+        text_fields = ['reference', 'description', 'counterparty', 'bank_reference']
+        for record in self:
+            if record.state != 'matched':
+                raise UserError(_('Only matched imports can be matched again.'))
+            lines = self.env['property.bank.import.line'].search_fetch(
+                [('import_id', '=', record.id)], ['date', 'amount'] + text_fields, order='sequence, id')
+            record._match_lines([
+                dict({name: line[name] or '' for name in text_fields}, date=line.date, amount=line.amount)
+                for line in lines
+            ])
+        return True
+
+    def action_confirm(self):
+        """Mark the collections of matched lines as deposited"""
+        for record in self:
+            if record.state != 'matched':
+                raise UserError(_('Import and review the lines before confirming.'))
+            lines = record.line_ids.filtered(lambda l: l.match_state == 'matched' and l.collection_id)
+            lines.collection_id.filtered(lambda c: c.status in ['collected', 'verified']).write({'status': 'deposited'})
+            record.state = 'done'
+        return True
+
+    def action_reset_draft(self):
+        self.filtered(lambda r: r.state == 'matched').write({'state': 'draft'})
+        return True
+
+    def action_view_lines(self):
+        self.ensure_one()
+        return {
+            'name': _('Bank Lines'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'property.bank.import.line',
+            'view_mode': 'list,form',
+            'domain': [('import_id', '=', self.id)],
+            'context': {'search_default_filter_review': 1, 'default_import_id': self.id},
+        }
+
+
+class PropertyBankImportLine(models.Model):
+    _name = 'property.bank.import.line'
+    _description = 'Bank Statement Import Line'
+    _order = 'import_id, sequence, id'
+
+    import_id = fields.Many2one('property.bank.import', string='Import', required=True,
+                                ondelete='cascade', index=True)
+    sequence = fields.Integer(string='Sequence')
+    date = fields.Date(string='Date')
+    amount = fields.Float(string='Amount', digits=(16, 2))
+    reference = fields.Char(string='Reference')
+    description = fields.Char(string='Description')
+    counterparty = fields.Char(string='Counterparty')
+    bank_reference = fields.Char(string='Bank Reference')
+    match_state = fields.Selection([
+        ('matched', 'Matched'),
+        ('mismatch', 'Mismatch'),
+        ('ambiguous', 'Ambiguous'),
+        ('unmatched', 'Unmatched'),
+        ('ignored', 'Outgoing'),
+    ], string='Match', default='unmatched', index=True)
+    match_rule = fields.Selection([
+        ('reference', 'Reference'),
+        ('amount_date', 'Amount & Date'),
+        ('invoice', 'Invoice Number'),
+        ('manual', 'Manual'),
+    ], string='Matched By')
+    collection_id = fields.Many2one('property.collection', string='Collection', index='btree_not_null')
+    invoice_id = fields.Many2one('account.move', string='Invoice', domain="[('move_type', '=', 'out_invoice')]")
+    tenant_id = fields.Many2one('property.tenant', string='Tenant')
+    candidate_count = fields.Integer(string='Candidates')
+    match_note = fields.Char(string='Note')
+    collection_amount = fields.Monetary(related='collection_id.amount_collected', string='Collection Amount',
+                                        currency_field='currency_id')
+    currency_id = fields.Many2one(related='collection_id.currency_id')
+
+    def write(self, vals):
+        # Picking a collection or invoice by hand settles the line
+        if ('collection_id' in vals or 'invoice_id' in vals) and 'match_state' not in vals:
+            if vals.get('collection_id') or vals.get('invoice_id'):
+                vals = dict(vals, match_state='matched', match_rule='manual', match_note=False)
+                if vals.get('collection_id'):
+                    vals['tenant_id'] = self.env['property.collection'].browse(vals['collection_id']).tenant_id.id
+            else:
+                vals = dict(vals, match_state='unmatched', match_rule=False)
+        return super().write(vals)
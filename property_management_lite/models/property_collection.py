@@ -19,7 +19,8 @@
 ################################################################################
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
-from datetime import timedelta
+from odoo.tools.sql import create_index
+from datetime import datetime, timedelta
 
 
 class PropertyCollection(models.Model):
@@ -89,12 +90,19 @@ class PropertyCollection(models.Model):
     
     # Receipt Information
     receipt_number = fields.Char('Receipt Number')
-    receipt_image = fields.Binary('Receipt Image')
+    # Kept in the filestore; lists and kanban read the small thumbnail only
+    receipt_image = fields.Image('Receipt Image', max_width=1920, max_height=1920, attachment=True)
+    receipt_image_512 = fields.Image('Receipt Image (Medium)', related='receipt_image', max_width=512, max_height=512,
+                                     store=True, attachment=True)
+    receipt_image_128 = fields.Image('Receipt Image (Small)', related='receipt_image', max_width=128, max_height=128,
+                                     store=True, attachment=True)
     receipt_filename = fields.Char('Receipt Filename')
     
     # Financial
     currency_id = fields.Many2one('res.currency', 'Currency', 
                                   default=lambda self: self.env.company.currency_id)
+    company_id = fields.Many2one('res.company', 'Company', index=True,
+                                 default=lambda self: self.env.company)
     
     # Archive
     active = fields.Boolean('Active', default=True)
@@ -119,84 +127,157 @@ class PropertyCollection(models.Model):
                                           'collection_id', 'invoice_id',
                                           string='Matched Invoices', readonly=True,
                                           help="Invoices paid by this collection")
+    payment_job_ids = fields.One2many('property.payment.job', 'collection_id', string='Payment Jobs')
+    payment_job_state = fields.Selection(
+        selection=lambda self: self.env['property.payment.job']._fields['state'].selection,
+        string='Payment Registration', compute='_compute_payment_job_state',
+        help="Status of the latest queued payment registration")
+    
+    @api.depends('payment_job_ids.state')
+    def _compute_payment_job_state(self):
+        for record in self:
+            jobs = record.payment_job_ids.sorted('id')
+            record.payment_job_state = jobs[-1].state if jobs else False
+    
+    def action_process_payment_job(self):
+        """Run the queued payment registration right away"""
+        self.payment_job_ids.filtered(lambda j: j.state == 'pending').action_run_now()
+        return True
+    
+    def init(self):
+        # Tenant and room histories only ever look at active collections
+        create_index(self.env.cr, 'property_collection_tenant_date_idx', self._table,
+                     ['tenant_id', 'date'], where='active')
+        create_index(self.env.cr, 'property_collection_room_date_idx', self._table,
+                     ['room_id', 'date'], where='active')
+        create_index(self.env.cr, 'property_collection_agreement_type_status_idx', self._table,
+                     ['agreement_id', 'collection_type', 'status'])
+        # Portfolio-wide period totals (dashboard)
+        create_index(self.env.cr, 'property_collection_date_idx', self._table, ['date'], where='active')
     
     @api.model
-    def create(self, vals):
-        print("iujhygt",self.tenant_id.agreement_ids.room_id)
-        # Generate receipt number for new collections
-        if not vals.get('receipt_number'):
-            sequence = self.env['ir.sequence'].next_by_code('property.collection') or '/'
-            vals['receipt_number'] = sequence
-        
-        # Set collected_by to current user if not set
-        if not vals.get('collected_by'):
-            vals['collected_by'] = self.env.user.id
-        
-        # Auto-populate room and agreement from tenant if not provided
-        if vals.get('tenant_id') and not vals.get('room_id'):
-            tenant = self.env['property.tenant'].browse(vals['tenant_id'])
-            if tenant.current_room_id:
-                vals['room_id'] = tenant.current_room_id.id
-            if tenant.current_agreement_id and not vals.get('agreement_id'):
-                vals['agreement_id'] = tenant.current_agreement_id.id
-                # Auto-set amount if not provided
-                if not vals.get('amount_collected') and vals.get('collection_type'):
-                    if vals['collection_type'] == 'rent':
-                        vals['amount_collected'] = tenant.current_agreement_id.rent_amount
-                    elif vals['collection_type'] == 'deposit':
-                        vals['amount_collected'] = tenant.current_agreement_id.deposit_amount
-                    elif vals['collection_type'] == 'parking_charges':
-                        vals['amount_collected'] = tenant.current_agreement_id.parking_charges
-                    elif vals['collection_type'] == 'parking_deposit':
-                        vals['amount_collected'] = tenant.current_agreement_id.parking_deposit
-        
-        # Auto-calculate rent period if not provided
-        if (vals.get('collection_type') in ['rent', 'parking_charges'] and vals.get('date') and 
-            not vals.get('period_from') and not vals.get('period_to')):
-            
-            from datetime import datetime
-            if isinstance(vals['date'], str):
-                collection_date = datetime.strptime(vals['date'], '%Y-%m-%d').date()
-            else:
-                collection_date = vals['date']
-            
-            year = collection_date.year
-            month = collection_date.month
-            
-            # First day of the month
-            period_from = collection_date.replace(day=1)
-            
-            # Last day of the month
-            if month == 12:
-                next_month = collection_date.replace(year=year + 1, month=1, day=1)
-            else:
-                next_month = collection_date.replace(month=month + 1, day=1)
-            period_to = next_month - timedelta(days=1)
+    def _get_period_bounds(self, collection_date):
+        """Return (period_from, period_to, due_date) for a rent collected on ``collection_date``
+
+        The period is the calendar month of the collection, due on the last
+        day of the previous month.
+        """
+        period_from = collection_date.replace(day=1)
+        if period_from.month == 12:
+            next_month = period_from.replace(year=period_from.year + 1, month=1)
+        else:
+            next_month = period_from.replace(month=period_from.month + 1)
+        return period_from, next_month - timedelta(days=1), period_from - timedelta(days=1)
+
+    @api.model
+    def _reserve_receipt_numbers(self, count):
+        """Draw ``count`` receipt numbers from the collection sequence in one round trip"""
+        if count <= 0:
+            return []
+        sequence = self.env['ir.sequence'].sudo().search([
+            ('code', '=', 'property.collection'),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+        if not sequence:
+            return ['/'] * count
+        if sequence.use_date_range:
+            # Date range sub-sequences keep their own counters
+            return [sequence.next_by_id() for _i in range(count)]
+        
+        if sequence.implementation == 'standard':
+            self.env.cr.execute("SELECT nextval(%s) FROM generate_series(1, %s)",
+                                ('ir_sequence_%03d' % sequence.id, count))
+            numbers = [row[0] for row in self.env.cr.fetchall()]
+        else:
+            # No-gap sequences: lock the row and move it past the whole block
+            self.env.cr.execute("SELECT number_next FROM ir_sequence WHERE id = %s FOR UPDATE NOWAIT", (sequence.id,))
+            first = self.env.cr.fetchone()[0]
+            self.env.cr.execute("UPDATE ir_sequence SET number_next = number_next + %s WHERE id = %s",
+                                (sequence.number_increment * count, sequence.id))
+            sequence.invalidate_recordset(['number_next'])
+            numbers = [first + sequence.number_increment * index for index in range(count)]
+        return [sequence.get_next_char(number) for number in numbers]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Generate receipt numbers for new collections, as one block
+        missing = [vals for vals in vals_list if not vals.get('receipt_number')]
+        for vals, receipt_number in zip(missing, self._reserve_receipt_numbers(len(missing))):
+            vals['receipt_number'] = receipt_number
+        
+        # Prefetch all tenants of the batch at once
+        tenants = self.env['property.tenant'].browse({vals['tenant_id'] for vals in vals_list if vals.get('tenant_id')})
+        tenants.mapped('current_agreement_id')
+        
+        periods = {}
+        for vals in vals_list:
+            # Set collected_by to current user if not set
+            if not vals.get('collected_by'):
+                vals['collected_by'] = self.env.user.id
             
-            vals['period_from'] = period_from
-            vals['period_to'] = period_to
+            # Auto-populate room and agreement from tenant if not provided
+            if vals.get('tenant_id') and not vals.get('room_id'):
+                tenant = self.env['property.tenant'].browse(vals['tenant_id'])
+                if tenant.current_room_id:
+                    vals['room_id'] = tenant.current_room_id.id
+                if tenant.current_agreement_id and not vals.get('agreement_id'):
+                    vals['agreement_id'] = tenant.current_agreement_id.id
+                    # Auto-set amount if not provided
+                    if not vals.get('amount_collected') and vals.get('collection_type'):
+                        if vals['collection_type'] == 'rent':
+                            vals['amount_collected'] = tenant.current_agreement_id.rent_amount
+                        elif vals['collection_type'] == 'deposit':
+                            vals['amount_collected'] = tenant.current_agreement_id.deposit_amount
+                        elif vals['collection_type'] == 'parking_charges':
+                            vals['amount_collected'] = tenant.current_agreement_id.parking_charges
+                        elif vals['collection_type'] == 'parking_deposit':
+                            vals['amount_collected'] = tenant.current_agreement_id.parking_deposit
             
-            # Set due date to last day of previous month
-            if month == 1:
-                due_date = collection_date.replace(year=year - 1, month=12, day=31)
-            else:
-                next_month_first = collection_date.replace(day=1)
-                due_date = next_month_first - timedelta(days=1)
-            vals['due_date'] = due_date
-        
-        collection = super().create(vals)
-        
-        # Auto-register payment against invoices if status is collected/verified
-        if collection.status in ['collected', 'verified'] and not collection.payment_id:
-            try:
-                collection._register_payment_for_collection()
-            except Exception as e:
-                # Log error but don't block collection creation
-                import logging
-                _logger = logging.getLogger(__name__)
-                _logger.warning(f"Could not register payment for collection {collection.name}: {str(e)}")
-        
-        return collection
+            # Auto-calculate rent period if not provided, once per month in the batch
+            if (vals.get('collection_type') in ['rent', 'parking_charges'] and vals.get('date') and 
+                not vals.get('period_from') and not vals.get('period_to')):
+                collection_date = fields.Date.to_date(vals['date'])
+                month = collection_date.replace(day=1)
+                if month not in periods:
+                    periods[month] = self._get_period_bounds(collection_date)
+                vals['period_from'], vals['period_to'], vals['due_date'] = periods[month]
+        
+        collections = super().create(vals_list)
+        
+        # Queue payment registration against invoices if status is collected/verified
+        self.env['property.payment.job']._enqueue(
+            collections.filtered(lambda c: c.status in ['collected', 'verified'] and not c.payment_id))
+        
+        return collections
+
+    @api.model
+    def create_bulk(self, vals_list):
+        """Create many collections in one call, e.g. a collector's day-end entries over RPC
+
+        Items carrying an ``idempotency_key`` that was already submitted are
+        not created again. Returns one dict per item, in the order of
+        ``vals_list``: {'id', 'idempotency_key', 'status'} with status
+        'created' or 'deduplicated'.
+        """
+        if not vals_list:
+            return []
+        keys = [vals.get('idempotency_key') or False for vals in vals_list]
+        seen = set(self._find_by_idempotency_keys(keys))
+        collections = self.create([dict(vals) for vals in vals_list])
+        # create() returns each collection once: map the items back by key
+        by_key = {collection.idempotency_key: collection for collection in collections if collection.idempotency_key}
+        keyless = iter(collections.filtered(lambda c: not c.idempotency_key))
+        result = []
+        for key in keys:
+            collection = by_key[key] if key else next(keyless)
+            result.append({
+                'id': collection.id,
+                'idempotency_key': key,
+                'status': 'deduplicated' if key and key in seen else 'created',
+            })
+            if key:
+                seen.add(key)
+        return result
     
     def write(self, vals):
         """Override write to invalidate related computed fields when active status changes"""
@@ -224,7 +305,7 @@ class PropertyCollection(models.Model):
         if 'status' in vals and vals['status'] in ['collected', 'verified', 'deposited']:
             for record in self:
                 # Create statement entry if doesn't exist
-                if record.tenant_id and not record.statement_id:
+                if record.tenant_id and not record.statement_id and not record.statement_archived:
                     try:
                         # Use savepoint to isolate constraint violations
                         with self.env.cr.savepoint():
@@ -235,37 +316,12 @@ class PropertyCollection(models.Model):
                         import logging
                         _logger = logging.getLogger(__name__)
                         _logger.warning(f"Could not create statement for collection {record.name}: {str(e)}")
-                
-                # Register payment if doesn't exist
-                if not record.payment_id:
-                    try:
-                        record._register_payment_for_collection()
-                    except Exception as e:
-                        # Log error but don't block collection creation
-                        import logging
-                        _logger = logging.getLogger(__name__)
-                        _logger.warning(f"Could not register payment for collection {record.name}: {str(e)}")
-        
-        result = super(PropertyCollection, self).write(vals)
-        
-        # If active field is being changed, invalidate tenant and agreement computed fields
-        if 'active' in vals:
-            # Invalidate tenant computed fields
-            tenants_to_recompute = self.mapped('tenant_id')
-            if tenants_to_recompute:
-                tenants_to_recompute._compute_payment_stats()
             
-            # Invalidate agreement computed fields
-            agreements_to_recompute = self.mapped('agreement_id')
-            if agreements_to_recompute:
-                agreements_to_recompute._compute_payment_stats()
-            
-            # Invalidate room computed fields
-            rooms_to_recompute = self.mapped('room_id')
-            if rooms_to_recompute:
-                rooms_to_recompute._compute_payment_stats()
+            # Queue payment registration if not done yet
+            self.env['property.payment.job']._enqueue(self.filtered(lambda c: not c.payment_id))
         
-        return result
+        # Archiving is covered by the aggregate deltas in property_collection_stats
+        return super(PropertyCollection, self).write(vals)
 
     @api.onchange('date', 'collection_type')
     def _onchange_date_collection_type(self):
@@ -479,38 +535,71 @@ class PropertyCollection(models.Model):
     
     @api.model
     def create_daily_collections_reminder(self):
-        """Cron job to create daily collection reminders"""
+        """Cron job to create daily collection reminders
+        
+        The last rent collection of every agreement comes from one grouped
+        query, agreements that already have an open reminder for today are
+        skipped, and the new activities are created in a single batch.
+        """
+        import logging
+        import time
+        _logger = logging.getLogger(__name__)
+        started = time.time()
         today = fields.Date.today()
         
         # Find all active agreements
-        active_agreements = self.env['property.agreement'].search([('state', '=', 'active')])
-        
-        for agreement in active_agreements:
-            # Check if collection is due based on payment frequency
-            last_collection = self.search([
-                ('agreement_id', '=', agreement.id),
+        active_agreements = self.env['property.agreement'].search_fetch(
+            [('state', '=', 'active'), ('payment_frequency', 'in', ['monthly', 'daily'])],
+            ['payment_frequency', 'payment_day', 'tenant_id', 'room_id', 'rent_amount'])
+        
+        # Last rent collection date per agreement, in one query
+        last_collection_dates = {
+            agreement.id: last_date
+            for agreement, last_date in self._read_group([
+                ('agreement_id', 'in', active_agreements.ids),
                 ('collection_type', '=', 'rent'),
-                ('status', 'in', ['collected', 'verified', 'deposited'])
-            ], order='date desc', limit=1)
-            
-            if agreement.payment_frequency == 'monthly':
-                # Monthly payment due on specific day
-                if today.day == agreement.payment_day:
-                    self._create_due_reminder(agreement, today)
-            elif agreement.payment_frequency == 'daily':
-                # Daily payment
-                if not last_collection or last_collection.date < today:
-                    self._create_due_reminder(agreement, today)
-    
-    def _create_due_reminder(self, agreement, due_date):
-        """Create a due reminder activity"""
-        agreement.activity_schedule(
-            'mail.mail_activity_data_todo',
-            summary=f'Rent Collection Due - {agreement.tenant_id.name}',
-            note=f'Monthly rent of {agreement.rent_amount} is due for room {agreement.room_id.name}',
-            date_deadline=due_date,
-            user_id=agreement.room_id.property_id.manager_id.id,
-        )
+                ('status', 'in', ['collected', 'verified', 'deposited']),
+            ], ['agreement_id'], ['date:max'])
+        }
+        
+        due_agreements = active_agreements.filtered(lambda a: (
+            # Monthly payment due on specific day
+            (a.payment_frequency == 'monthly' and today.day == a.payment_day)
+            # Daily payment
+            or (a.payment_frequency == 'daily' and (
+                not last_collection_dates.get(a.id) or last_collection_dates[a.id] < today))
+        ))
+        
+        created = self._create_due_reminders(due_agreements, today)
+        _logger.info("Collection reminders: %s created for %s due of %s active agreements in %.2fs",
+                     len(created), len(due_agreements), len(active_agreements), time.time() - started)
+        return created
+    
+    @api.model
+    def _create_due_reminders(self, agreements, due_date):
+        """Create due reminder activities in one batch, skipping agreements already reminded for ``due_date``"""
+        activity_type = self.env.ref('mail.mail_activity_data_todo')
+        Activity = self.env['mail.activity']
+        reminded = {
+            res_id for [res_id] in Activity._read_group([
+                ('res_model', '=', 'property.agreement'),
+                ('res_id', 'in', agreements.ids),
+                ('activity_type_id', '=', activity_type.id),
+                ('date_deadline', '=', due_date),
+            ], ['res_id'])
+        }
+        res_model_id = self.env['ir.model']._get_id('property.agreement')
+        vals_list = [{
+            'res_model_id': res_model_id,
+            'res_id': agreement.id,
+            'activity_type_id': activity_type.id,
+            'summary': f'Rent Collection Due - {agreement.tenant_id.name}',
+            'note': f'Monthly rent of {agreement.rent_amount} is due for room {agreement.room_id.name}',
+            'date_deadline': due_date,
+            'user_id': agreement.room_id.property_id.manager_id.id or self.env.uid,
+        } for agreement in agreements if agreement.id not in reminded]
+        # Skip the per-activity assignment notifications of a mass run
+        return Activity.with_context(mail_activity_quick_update=True).create(vals_list)
     
     # ========== INVOICE PAYMENT INTEGRATION ==========
     
@@ -529,12 +618,16 @@ class PropertyCollection(models.Model):
         'other': 'other',
     }
     
-    def _register_payment_for_collection(self):
-        """Register payment against matching invoices when collection is recorded"""
+    def _register_payment_for_collection(self, invoices=None):
+        """Register payment against matching invoices when collection is recorded
+
+        ``invoices`` may be passed in when already matched in batch.
+        """
         self.ensure_one()
         
         # Find matching unpaid invoices
-        invoices = self._find_matching_invoices()
+        if invoices is None:
+            invoices = self._find_matching_invoices()
         
         if not invoices:
             # No invoices to pay - this is OK, invoice might be generated later
@@ -564,67 +657,66 @@ class PropertyCollection(models.Model):
     def _find_matching_invoices(self):
         """Find unpaid invoices that match this collection"""
         self.ensure_one()
-        
+        return self._find_matching_invoices_batch()[self.id]
+    
+    def _find_matching_invoices_batch(self, limit=10):
+        """Match unpaid invoices for all these collections with a single search
+
+        Open posted invoices of the tenants involved are loaded once, in
+        (invoice_date, id) order, and indexed by tenant, agreement and
+        invoice type. Each collection then takes the first match of:
+
+        1. same invoice type (and agreement, if set) whose period overlaps
+           the collection period, for rent and parking
+        2. same invoice type (and agreement, if set)
+        3. any open invoice of the tenant
+
+        Returns {collection_id: account.move recordset} of at most ``limit`` invoices.
+        """
         import logging
         _logger = logging.getLogger(__name__)
         
-        # Map collection type to invoice type
-        invoice_type = self.COLLECTION_TO_INVOICE_TYPE.get(self.collection_type)
-        
-        if not invoice_type:
-            _logger.info(f"Collection {self.name}: No invoice type mapping for collection_type='{self.collection_type}'")
-            return self.env['account.move']
+        Move = self.env['account.move']
+        result = {collection.id: Move for collection in self}
+        collections = self.filtered(lambda c: c.tenant_id and self.COLLECTION_TO_INVOICE_TYPE.get(c.collection_type))
+        if not collections:
+            return result
         
-        # Build search domain - start with basic criteria
-        domain = [
-            ('tenant_id', '=', self.tenant_id.id),
+        invoices = Move.search([
+            ('tenant_id', 'in', collections.tenant_id.ids),
             ('move_type', '=', 'out_invoice'),
             ('state', '=', 'posted'),
             ('payment_state', 'in', ['not_paid', 'partial']),
-        ]
-        
-        _logger.info(f"Collection {self.name}: Searching for invoices with tenant={self.tenant_id.name}, type=out_invoice, state=posted")
-        
-        # Try with invoice_type first
-        domain_with_type = domain + [('invoice_type', '=', invoice_type)]
-        
-        # Add agreement filter if available
-        if self.agreement_id:
-            domain_with_type.append(('agreement_id', '=', self.agreement_id.id))
-            _logger.info(f"  - With agreement={self.agreement_id.name}")
-        
-        # Add period filter for rent/parking (optional - try with and without)
-        if self.collection_type in ['rent', 'parking_charges'] and self.period_from and self.period_to:
-            domain_with_period = domain_with_type + [
-                ('period_from', '<=', self.period_to),
-                ('period_to', '>=', self.period_from),
-            ]
-            _logger.info(f"  - With period overlap: {self.period_from} to {self.period_to}")
-            invoices = self.env['account.move'].search(domain_with_period, order='invoice_date asc', limit=10)
-            
-            if invoices:
-                _logger.info(f"  ✓ Found {len(invoices)} invoice(s) with period matching")
-                return invoices
-            else:
-                _logger.info(f"  - No invoices found with period matching, trying without period filter...")
-        
-        # Try without period filter
-        invoices = self.env['account.move'].search(domain_with_type, order='invoice_date asc', limit=10)
-        
-        if invoices:
-            _logger.info(f"  ✓ Found {len(invoices)} invoice(s) with invoice_type={invoice_type}")
-            return invoices
-        
-        # Try without invoice_type (more lenient)
-        _logger.info(f"  - No invoices found with invoice_type={invoice_type}, trying without invoice_type...")
-        invoices = self.env['account.move'].search(domain, order='invoice_date asc', limit=10)
-        
-        if invoices:
-            _logger.info(f"  ✓ Found {len(invoices)} invoice(s) without invoice_type filter")
-            return invoices
-        
-        _logger.info(f"  ✗ No matching invoices found for collection {self.name}")
-        return self.env['account.move']
+        ], order='invoice_date asc, id asc')
+        
+        by_tenant = {}
+        by_type = {}
+        for invoice in invoices:
+            tenant_id = invoice.tenant_id.id
+            by_tenant.setdefault(tenant_id, []).append(invoice)
+            by_type.setdefault((tenant_id, None, invoice.invoice_type), []).append(invoice)
+            by_type.setdefault((tenant_id, invoice.agreement_id.id, invoice.invoice_type), []).append(invoice)
+        
+        for collection in collections:
+            invoice_type = self.COLLECTION_TO_INVOICE_TYPE[collection.collection_type]
+            tenant_id = collection.tenant_id.id
+            typed = by_type.get((tenant_id, collection.agreement_id.id or None, invoice_type), [])
+            matches = []
+            if collection.collection_type in ['rent', 'parking_charges'] and collection.period_from and collection.period_to:
+                matches = [
+                    invoice for invoice in typed
+                    if invoice.period_from and invoice.period_to
+                    and invoice.period_from <= collection.period_to and invoice.period_to >= collection.period_from
+                ]
+            if not matches:
+                matches = typed
+            if not matches:
+                matches = by_tenant.get(tenant_id, [])
+            result[collection.id] = Move.union(*matches[:limit])
+        
+        _logger.info("Matched invoices for %s of %s collections from %s open invoices",
+                     len([ids for ids in result.values() if ids]), len(self), len(invoices))
+        return result
     
     def _create_payment_from_collection(self, invoices):
         """Create account.payment record from collection"""
@@ -705,24 +797,150 @@ class PropertyCollection(models.Model):
         except Exception as e:
             _logger.error(f"Failed to reconcile payment {payment.name}: {str(e)}")
     
-    def _get_payment_journal(self):
-        """Get appropriate journal based on payment method"""
+    def _prepare_fifo_payment_vals(self):
+        """Payment values for a collection reconciled by the FIFO engine, or None"""
         self.ensure_one()
+        journal = self._get_payment_journal()
+        if not journal or not self.tenant_id.partner_id:
+            return None
+        return {
+            'payment_type': 'inbound',
+            'partner_type': 'customer',
+            'partner_id': self.tenant_id.partner_id.id,
+            'amount': self.amount_collected,
+            'date': self.date,
+            'journal_id': journal.id,
+            'collection_id': self.id,
+            'tenant_id': self.tenant_id.id,
+        }
+    
+    def _reconcile_collections_fifo(self, dry_run=False):
+        """Allocate these collections oldest-first over their tenants' open receivables
+
+        Collections are taken in (date, id) order and each one pays the
+        oldest open receivable lines of its tenant (by maturity, then id),
+        leaving the last one partially paid when the money runs out.
+        Collections without a payment get one, created and posted in bulk.
+        Each tenant's allocation is then applied with a single reconcile().
+
+        With ``dry_run`` nothing is written and the plan is only computed.
+        Returns {'plan': [allocation dicts], 'reconcile_calls': int, 'payments_created': int}.
+        """
+        import logging
+        _logger = logging.getLogger(__name__)
+        started = datetime.now()
+        AML = self.env['account.move.line']
+        
+        collections = self.filtered(
+            lambda c: c.tenant_id.partner_id and c.status in ['collected', 'verified', 'deposited'] and c.amount_collected > 0
+        ).sorted(lambda c: (c.date, c.id))
+        
+        payments_created = 0
+        if not dry_run:
+            unpaid = collections.filtered(lambda c: not c.payment_id)
+            vals_list, to_link = [], []
+            for collection in unpaid:
+                vals = collection._prepare_fifo_payment_vals()
+                if vals:
+                    vals_list.append(vals)
+                    to_link.append(collection)
+            if vals_list:
+                payments = self.env['account.payment'].create(vals_list)
+                payments.action_post()
+                for collection, payment in zip(to_link, payments):
+                    collection.write({'payment_id': payment.id, 'payment_reference': payment.name})
+                payments_created = len(payments)
+        
+        partners = collections.tenant_id.partner_id
+        debit_lines = AML.search([
+            ('partner_id', 'in', partners.ids),
+            ('account_id.account_type', '=', 'asset_receivable'),
+            ('parent_state', '=', 'posted'),
+            ('reconciled', '=', False),
+            ('amount_residual', '>', 0),
+        ]).sorted(lambda l: (l.date_maturity or l.date, l.id))
+        credit_lines = AML.search([
+            ('payment_id', 'in', collections.payment_id.ids),
+            ('account_id.account_type', '=', 'asset_receivable'),
+            ('reconciled', '=', False),
+            ('amount_residual', '<', 0),
+        ])
+        credit_by_payment = {line.payment_id.id: line for line in credit_lines}
+        
+        # Open invoices per tenant, oldest first: [line, residual still to allocate]
+        open_debits = {}
+        for line in debit_lines:
+            open_debits.setdefault(line.partner_id.id, []).append([line, line.amount_residual])
+        
+        plan = []
+        to_reconcile = {}
+        for collection in collections:
+            partner_id = collection.tenant_id.partner_id.id
+            credit_line = credit_by_payment.get(collection.payment_id.id)
+            if collection.payment_id and not credit_line:
+                continue  # Already fully reconciled
+            if not dry_run and not credit_line:
+                continue  # No payment could be created, nothing to reconcile
+            currency = collection.currency_id or self.env.company.currency_id
+            remaining = -credit_line.amount_residual if credit_line else collection.amount_collected
+            queue = open_debits.get(partner_id, [])
+            touched = AML
+            for entry in queue:
+                if currency.is_zero(remaining):
+                    break
+                line, residual = entry
+                if currency.is_zero(residual) or (credit_line and line.account_id != credit_line.account_id):
+                    continue
+                amount = min(remaining, residual)
+                entry[1] = currency.round(residual - amount)
+                remaining = currency.round(remaining - amount)
+                touched |= line
+                plan.append({
+                    'collection_id': collection.id,
+                    'tenant_id': collection.tenant_id.id,
+                    'move_line_id': line.id,
+                    'invoice_id': line.move_id.id,
+                    'invoice': line.move_id.name,
+                    'amount': amount,
+                    'invoice_residual': entry[1],
+                    'partial': not currency.is_zero(entry[1]),
+                })
+            open_debits[partner_id] = [entry for entry in queue if not currency.is_zero(entry[1])]
+            if credit_line and touched:
+                group = to_reconcile.setdefault((partner_id, credit_line.account_id.id), [AML, AML])
+                group[0] |= credit_line
+                group[1] |= touched
+        
+        reconcile_calls = 0
+        if not dry_run:
+            for (partner_id, account_id), (credits, debits) in to_reconcile.items():
+                try:
+                    with self.env.cr.savepoint():
+                        (credits + debits).reconcile()
+                    reconcile_calls += 1
+                except Exception as e:
+                    _logger.error(f"FIFO reconciliation failed for partner {partner_id}: {str(e)}")
+            # Keep the collection view of what was paid in line with the allocation
+            invoice_ids = {}
+            for allocation in plan:
+                invoice_ids.setdefault(allocation['collection_id'], set()).add(allocation['invoice_id'])
+            for collection in collections:
+                if collection.id in invoice_ids:
+                    collection.matched_invoice_ids = [(4, invoice_id) for invoice_id in invoice_ids[collection.id]]
+        
+        elapsed = (datetime.now() - started).total_seconds()
+        _logger.info(f"FIFO reconciliation{' (dry run)' if dry_run else ''}: {len(collections)} collections, "
+                     f"{len(debit_lines)} open lines, {len(plan)} allocations, {reconcile_calls} reconcile calls "
+                     f"in {elapsed:.2f}s")
+        return {'plan': plan, 'reconcile_calls': reconcile_calls, 'payments_created': payments_created}
+    
+    def _get_payment_journal(self):
+        """Get appropriate journal based on payment method
         
-        # Map payment method to journal type
-        if self.payment_method in ['cash']:
-            journal_type = 'cash'
-        elif self.payment_method in ['bank_transfer', 'cheque', 'online', 'card']:
-            journal_type = 'bank'
-        else:
-            journal_type = 'cash'  # default
-        
-        # Find suitable journal
-        journal = self.env['account.journal'].search([
-            ('type', '=', journal_type),
-            ('company_id', '=', self.env.company.id),
-        ], limit=1)
-        
-        return journal
+        Resolved through the configured payment journals and cached per
+        company and method, so batches of collections do not query journals.
+        """
+        self.ensure_one()
+        return self.env['property.payment.journal.map']._get_journal(self.payment_method)
     
     # ========== END INVOICE PAYMENT INTEGRATION ==========
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+from odoo import models, fields, api
+
+
+class PropertyCollection(models.Model):
+    _inherit = 'property.collection'
+
+    idempotency_key = fields.Char(string='Idempotency Key', readonly=True, copy=False,
+                                  help="Client-supplied key of the submission that created this collection; "
+                                       "retries with the same key return this collection instead of a new one")
+
+    _sql_constraints = [
+        ('idempotency_key_unique', 'unique(idempotency_key)',
+         'A collection was already submitted with this idempotency key.'),
+    ]
+
+    @api.model
+    def _find_by_idempotency_keys(self, keys):
+        """Return {key: collection} for the given keys that already exist, archived ones included"""
+        keys = list({key for key in keys if key})
+        if not keys:
+            return {}
+        collections = self.with_context(active_test=False).search_fetch(
+            [('idempotency_key', 'in', keys)], ['idempotency_key'])
+        return {collection.idempotency_key: collection.with_context(self.env.context) for collection in collections}
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Outermost create override (imported last): a repeated key returns the
+        # existing collection before any receipt number, statement or payment work
+        keys = [vals.get('idempotency_key') or False for vals in vals_list]
+        if not any(keys):
+            return super().create(vals_list)
+        found = self._find_by_idempotency_keys(keys)
+        batch_keys = set()
+        to_create = []
+        for vals, key in zip(vals_list, keys):
+            if key and (key in found or key in batch_keys):
+                continue
+            if key:
+                batch_keys.add(key)
+            to_create.append(vals)
+        created = super().create(to_create) if to_create else self.browse()
+        found.update({collection.idempotency_key: collection for collection in created if collection.idempotency_key})
+
+        # Each collection once, in the order it was first submitted; keyless vals
+        # map to the created records in turn. create_bulk() reports the repeats.
+        created_keyless = iter(created.filtered(lambda c: not c.idempotency_key))
+        return self.browse(list(dict.fromkeys(
+            found[key].id if key else next(created_keyless).id
+            for key in keys
+        )))
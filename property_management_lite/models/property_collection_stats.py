@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Collection fields that change the aggregates stored on agreements and rooms
+STAT_SOURCE_FIELDS = {'agreement_id', 'room_id', 'amount_collected', 'date', 'active'}
+AGREEMENT_STAT_FIELDS = ['total_collected', 'last_payment_date', 'pending_amount']
+ROOM_STAT_FIELDS = ['total_collected', 'last_collection_date']
+
+# Pending amount of an agreement from its stored total, as in _compute_pending_amount()
+PENDING_AMOUNT_SQL = """
+    CASE WHEN a.state = 'active' AND a.start_date IS NOT NULL
+         THEN GREATEST(0, COALESCE(a.rent_amount, 0) * (
+                  EXTRACT(YEAR FROM age(%(today)s::date, a.start_date)) * 12
+                  + EXTRACT(MONTH FROM age(%(today)s::date, a.start_date))
+              ) - COALESCE(a.total_collected, 0))
+         ELSE 0 END
+"""
+
+
+class PropertyCollection(models.Model):
+    _inherit = 'property.collection'
+
+    @api.model
+    def _get_collection_stats(self, group_field, ids):
+        """Return {id: (total, last date)} of active collections grouped by ``group_field``"""
+        if not ids:
+            return {}
+        return {
+            record.id: (total, last_date)
+            for record, total, last_date in self._read_group(
+                [(group_field, 'in', ids), ('active', '=', True)], [group_field], ['amount_collected:sum', 'date:max'])
+        }
+
+    def _get_stat_contributions(self):
+        """Return [(agreement_id, room_id, amount, date)] of these collections, active ones only"""
+        return [
+            (collection.agreement_id.id, collection.room_id.id, collection.amount_collected or 0.0, collection.date)
+            for collection in self if collection.active
+        ]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        collections = super().create(vals_list)
+        self._apply_collection_stat_deltas(collections._get_stat_contributions())
+        return collections
+
+    def write(self, vals):
+        if not STAT_SOURCE_FIELDS & set(vals):
+            return super().write(vals)
+        before = self._get_stat_contributions()
+        result = super().write(vals)
+        self._apply_collection_stat_deltas(self._get_stat_contributions(), before)
+        return result
+
+    def unlink(self):
+        before = self._get_stat_contributions()
+        result = super().unlink()
+        self._apply_collection_stat_deltas([], before)
+        return result
+
+    @api.model
+    def _apply_collection_stat_deltas(self, added, removed=None):
+        """Shift the stored agreement and room aggregates by the given contributions
+
+        Totals move by the difference. The last date moves forward for added
+        collections; when a collection goes away the date is re-read with a
+        MAX() over that agreement's or room's collections only.
+        """
+        removed = removed or []
+        if not added and not removed:
+            return
+        Agreement = self.env['property.agreement']
+        Room = self.env['property.room']
+        Agreement.flush_model(AGREEMENT_STAT_FIELDS + ['state', 'rent_amount', 'start_date'])
+        Room.flush_model(ROOM_STAT_FIELDS)
+        self.flush_model(list(STAT_SOURCE_FIELDS))
+
+        deltas = {'agreement': {}, 'room': {}}
+        for sign, contributions in ((1, added), (-1, removed)):
+            for agreement_id, room_id, amount, date in contributions:
+                for key, record_id in (('agreement', agreement_id), ('room', room_id)):
+                    if not record_id:
+                        continue
+                    delta = deltas[key].setdefault(record_id, [0.0, None, False])
+                    delta[0] += sign * amount
+                    if sign > 0:
+                        delta[1] = max(delta[1], date) if delta[1] and date else (delta[1] or date)
+                    else:
+                        delta[2] = True
+
+        today = fields.Date.today()
+        for key, table, date_column, fk_column in (
+            ('agreement', 'property_agreement', 'last_payment_date', 'agreement_id'),
+            ('room', 'property_room', 'last_collection_date', 'room_id'),
+        ):
+            if not deltas[key]:
+                continue
+            ids = list(deltas[key])
+            params = {
+                'ids': ids,
+                'amounts': [deltas[key][record_id][0] for record_id in ids],
+                'dates': [deltas[key][record_id][1] for record_id in ids],
+                'recheck': [deltas[key][record_id][2] for record_id in ids],
+                'today': today,
+            }
+            pending = ", pending_amount = %s" % PENDING_AMOUNT_SQL.replace(
+                'COALESCE(a.total_collected, 0)', 'COALESCE(a.total_collected, 0) + d.amount'
+            ) if key == 'agreement' else ''
+            self.env.cr.execute(f"""
+                UPDATE {table} a
+                   SET total_collected = COALESCE(a.total_collected, 0) + d.amount,
+                       {date_column} = CASE
+                           WHEN d.recheck THEN (SELECT MAX(c.date) FROM property_collection c
+                                                 WHERE c.{fk_column} = a.id AND c.active)
+                           ELSE GREATEST(a.{date_column}, d.last_date)
+                       END
+                       {pending}
+                  FROM unnest(%(ids)s::int[], %(amounts)s::float8[], %(dates)s::date[], %(recheck)s::bool[])
+                       AS d(id, amount, last_date, recheck)
+                 WHERE a.id = d.id
+            """, params)
+        self._mark_stats_modified(Agreement, deltas['agreement'], AGREEMENT_STAT_FIELDS)
+        self._mark_stats_modified(Room, deltas['room'], ROOM_STAT_FIELDS)
+
+    @api.model
+    def _mark_stats_modified(self, model, ids, fnames):
+        """Drop the cached aggregates written in SQL and recompute what depends on them"""
+        model.invalidate_model(fnames)
+        if ids:
+            model.browse(list(ids)).modified(fnames)
+
+    @api.model
+    def _refresh_pending_amounts(self, agreement_ids=None):
+        """Recompute stored pending amounts for today, for active agreements or the given ones"""
+        Agreement = self.env['property.agreement']
+        Agreement.flush_model(AGREEMENT_STAT_FIELDS + ['state', 'rent_amount', 'start_date'])
+        where = "a.id = ANY(%(ids)s)" if agreement_ids is not None else "a.state = 'active'"
+        self.env.cr.execute(f"""
+            UPDATE property_agreement a
+               SET pending_amount = {PENDING_AMOUNT_SQL}
+             WHERE {where}
+               AND a.pending_amount IS DISTINCT FROM {PENDING_AMOUNT_SQL}
+         RETURNING a.id
+        """, {'ids': agreement_ids, 'today': fields.Date.today()})
+        refreshed_ids = [row[0] for row in self.env.cr.fetchall()]
+        self._mark_stats_modified(Agreement, refreshed_ids, ['pending_amount'])
+        return len(refreshed_ids)
+
+    @api.model
+    def _rebuild_collection_stats(self, chunk_size=5000):
+        """Repair the stored agreement and room aggregates from the collections
+
+        Returns the number of agreements and rooms whose stored values had drifted.
+        """
+        self.flush_model(list(STAT_SOURCE_FIELDS))
+        self.env['property.agreement'].flush_model(AGREEMENT_STAT_FIELDS)
+        self.env['property.room'].flush_model(ROOM_STAT_FIELDS)
+        fixed = 0
+        for model, fnames, date_column, fk_column in (
+            (self.env['property.agreement'], AGREEMENT_STAT_FIELDS, 'last_payment_date', 'agreement_id'),
+            (self.env['property.room'], ROOM_STAT_FIELDS, 'last_collection_date', 'room_id'),
+        ):
+            table = model._table
+            fixed_ids = []
+            self.env.cr.execute(f"SELECT id FROM {table} ORDER BY id")
+            ids = [row[0] for row in self.env.cr.fetchall()]
+            for offset in range(0, len(ids), chunk_size):
+                self.env.cr.execute(f"""
+                    UPDATE {table} a
+                       SET total_collected = s.total,
+                           {date_column} = s.last_date
+                      FROM (
+                          SELECT r.id, COALESCE(SUM(c.amount_collected), 0) AS total, MAX(c.date) AS last_date
+                            FROM unnest(%s::int[]) AS r(id)
+                       LEFT JOIN property_collection c ON c.{fk_column} = r.id AND c.active
+                        GROUP BY r.id
+                      ) s
+                     WHERE a.id = s.id
+                       AND (a.total_collected IS DISTINCT FROM s.total
+                            OR a.{date_column} IS DISTINCT FROM s.last_date)
+                 RETURNING a.id
+                """, (ids[offset:offset + chunk_size],))
+                fixed_ids += [row[0] for row in self.env.cr.fetchall()]
+            self._mark_stats_modified(model, fixed_ids, fnames)
+            fixed += len(fixed_ids)
+        self._refresh_pending_amounts()
+        if fixed:
+            _logger.info("Repaired collection aggregates of %s agreements and rooms", fixed)
+        return fixed
+
+    @api.model
+    def cron_refresh_collection_stats(self):
+        """Daily: pending amounts grow with each completed month"""
+        refreshed = self._refresh_pending_amounts()
+        _logger.info("Refreshed pending amounts of %s agreements", refreshed)
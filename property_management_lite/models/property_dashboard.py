@@ -18,9 +18,24 @@
 #
 ################################################################################
 from odoo import api, fields, models
+from odoo.tools import SQL
 from datetime import datetime, timedelta
 from dateutil.relativedelta import relativedelta
 
+OVERDUE_STATUSES = ('overdue_30', 'overdue_60', 'overdue_90', 'overdue_90plus', 'critical')
+CRITICAL_STATUSES = ('overdue_90', 'overdue_90plus', 'critical')
+
+# Dashboard sections (one KPI card each) and the method computing their figures
+DASHBOARD_SECTIONS = {
+    'collections': '_get_collection_figures',
+    'expenses': '_get_expense_figures',
+    'occupancy': '_get_occupancy_figures',
+    'agents': '_get_agent_figures',
+    'dues': '_get_dues_figures',
+    'balances': '_get_balance_figures',
+    'recent': '_get_recent_activity',
+}
+
 
 class PropertyDashboard(models.TransientModel):
     _name = 'property.dashboard'
@@ -40,255 +55,291 @@ class PropertyDashboard(models.TransientModel):
     def default_get(self, fields_list):
         """Override to ensure fresh data is always computed"""
         res = super().default_get(fields_list)
-        
-        # Compute fresh values directly in the result
-        today = fields.Date.today()
-        
-        # Today's collections
-        collections = self.env['property.collection'].search([
-            ('date', '=', today),
-            ('status', '!=', 'cancelled')
-        ])
-        res['today_collections'] = sum(collections.mapped('amount_collected'))
-        res['today_collections_count'] = len(collections)
-        
-        # Today's expenses
-        expenses = self.env['account.move'].search([
-            ('move_type','in', ('in_invoice','in_refund')),
-            ('invoice_date', '=', today),
-            ('state', 'in', ['posted'])
-        ])
-        res['today_expenses'] = sum(expenses.mapped('amount_total'))
-        res['today_expenses_count'] = len(expenses)
-        res['today_profit'] = res['today_collections'] - res['today_expenses']
-        
-        # Today's new tenants
-        tenants = self.env['property.tenant'].search([
-            ('create_date', '>=', fields.Datetime.to_string(datetime.combine(today, datetime.min.time()))),
-            ('create_date', '<', fields.Datetime.to_string(datetime.combine(today + timedelta(days=1), datetime.min.time())))
-        ])
-        res['today_new_tenants'] = len(tenants)
-        
-        # Vacant rooms today
-        vacant_rooms = self.env['property.room'].search([('status', '=', 'vacant')])
-        res['today_vacant_rooms'] = len(vacant_rooms)
-        
-        # Week stats
+        res.update(self._get_dashboard_values(fields.Date.today()))
+        return res
+
+    @api.model
+    def _get_dashboard_values(self, today, refresh_stale=False, property_ids=None):
+        """Dashboard figures served from the company's KPI snapshots
+
+        Sections are recomputed only when their snapshot is older than the
+        configured TTL (or stale, when ``refresh_stale`` is set). With
+        ``property_ids`` the sections kept per property are replaced by the
+        sums of those properties' daily KPI rows, except the ones the user
+        only sees under record rules.
+        """
+        res = {}
+        cards = self.env['property.dashboard.snapshot']._get_sections(today=today, refresh_stale=refresh_stale)
+        for section, card in cards.items():
+            res.update(card['values'])
+            res[f'{section}_refreshed_at'] = card['refreshed_at']
+        if property_ids:
+            KpiDaily = self.env['property.kpi.daily'].sudo()
+            refreshed_at = KpiDaily._get_today_written(today, self.env.company)
+            restricted = self.env['property.dashboard.snapshot']._get_restricted_sections()
+            for section, values in KpiDaily._get_dashboard_figures(property_ids, today=today).items():
+                if section in restricted:
+                    continue
+                res.update(values)
+                res[f'{section}_refreshed_at'] = refreshed_at
+        res.update(self._get_derived_figures(res))
+        return res
+
+    @api.model
+    def _get_default_property_ids(self):
+        """Properties the current user manages; the dashboard opens filtered on them"""
+        return self.env['property.property'].search([('manager_id', '=', self.env.uid)]).ids
+
+    @api.model
+    def _get_dashboard_periods(self, today):
         week_start = today - timedelta(days=today.weekday())
-        week_collections = self.env['property.collection'].search([
-            ('date', '>=', week_start),
-            ('date', '<=', today),
-            ('status', '!=', 'cancelled')
-        ])
-        res['week_collections'] = sum(week_collections.mapped('amount_collected'))
-        res['week_collections_count'] = len(week_collections)
-        
-        # Week expenses
-        week_expenses = self.env['account.move'].search([
-            ('move_type','in', ('in_invoice','in_refund')),
-            ('invoice_date', '>=', week_start),
-            ('invoice_date', '<=', today),
-            ('state', 'in', ['posted'])
-        ])
-        res['week_expenses'] = sum(week_expenses.mapped('amount_total'))
-        res['week_expenses_count'] = len(week_expenses)
-        res['week_profit'] = res['week_collections'] - res['week_expenses']
-        
-        week_start_datetime = fields.Datetime.to_string(datetime.combine(week_start, datetime.min.time()))
-        today_end_datetime = fields.Datetime.to_string(datetime.combine(today + timedelta(days=1), datetime.min.time()))
-        week_tenants = self.env['property.tenant'].search([
-            ('create_date', '>=', week_start_datetime),
-            ('create_date', '<', today_end_datetime)
-        ])
-        res['week_new_tenants'] = len(week_tenants)
-        
-        # Month stats
         month_start = today.replace(day=1)
-        month_collections = self.env['property.collection'].search([
-            ('date', '>=', month_start),
+        return {
+            'today': today,
+            'week_start': week_start,
+            'month_start': month_start,
+            'range_start': min(week_start, month_start),
+        }
+
+    @api.model
+    def _get_derived_figures(self, res):
+        """Figures combining several sections"""
+        derived = {}
+        for period in ('today', 'week', 'month'):
+            if f'{period}_collections' in res and f'{period}_expenses' in res:
+                derived[f'{period}_profit'] = res[f'{period}_collections'] - res[f'{period}_expenses']
+        return derived
+
+    @api.model
+    def _get_collection_figures(self, today):
+        """Today's, this week's and this month's collections in one pass
+
+        The query is built from an ORM domain, so collection record rules
+        apply: users restricted to their own collections only see those.
+        """
+        Collection = self.env['property.collection']
+        Collection.flush_model(['date', 'amount_collected', 'status', 'active', 'collected_by', 'company_id'])
+        periods = self._get_dashboard_periods(today)
+        query = Collection._search([
+            ('status', '!=', 'cancelled'),
+            ('company_id', 'in', self.env.companies.ids),
+            ('date', '>=', periods['range_start']),
             ('date', '<=', today),
-            ('status', '!=', 'cancelled')
-        ])
-        res['month_collections'] = sum(month_collections.mapped('amount_collected'))
-        res['month_collections_count'] = len(month_collections)
-        
-        # Month expenses
-        month_expenses = self.env['account.move'].search([
-            ('move_type','in', ('in_invoice','in_refund')),
-            ('invoice_date', '>=', month_start),
-            ('invoice_date', '<=', today),
-            ('state', 'in', ['posted'])
-        ])
-        res['month_expenses'] = sum(month_expenses.mapped('amount_total'))
-        res['month_expenses_count'] = len(month_expenses)
-        res['month_profit'] = res['month_collections'] - res['month_expenses']
-        
-        month_start_datetime = fields.Datetime.to_string(datetime.combine(month_start, datetime.min.time()))
-        today_end_datetime = fields.Datetime.to_string(datetime.combine(today + timedelta(days=1), datetime.min.time()))
-        month_tenants = self.env['property.tenant'].search([
-            ('create_date', '>=', month_start_datetime),
-            ('create_date', '<', today_end_datetime)
         ])
-        res['month_new_tenants'] = len(month_tenants)
-        
-        # Overall stats
-        res['total_properties'] = self.env['property.property'].search_count([])
-        
-        all_rooms = self.env['property.room'].search([])
-        res['total_rooms'] = len(all_rooms)
-        
-        occupied_rooms = all_rooms.filtered(lambda r: r.status == 'occupied')
-        res['occupied_rooms'] = len(occupied_rooms)
+        amount = SQL.identifier(query.table, 'amount_collected')
+        date = SQL.identifier(query.table, 'date')
+        self.env.cr.execute(query.select(SQL("""
+            COALESCE(SUM(%(amount)s) FILTER (WHERE %(date)s = %(today)s), 0)::float8,
+            COUNT(*) FILTER (WHERE %(date)s = %(today)s),
+            COALESCE(SUM(%(amount)s) FILTER (WHERE %(date)s >= %(week_start)s), 0)::float8,
+            COUNT(*) FILTER (WHERE %(date)s >= %(week_start)s),
+            COALESCE(SUM(%(amount)s) FILTER (WHERE %(date)s >= %(month_start)s), 0)::float8,
+            COUNT(*) FILTER (WHERE %(date)s >= %(month_start)s)
+        """, amount=amount, date=date, today=today,
+            week_start=periods['week_start'], month_start=periods['month_start'])))
+        row = self.env.cr.fetchone()
+        return dict(zip([
+            'today_collections', 'today_collections_count',
+            'week_collections', 'week_collections_count',
+            'month_collections', 'month_collections_count',
+        ], row))
+
+    @api.model
+    def _get_expense_figures(self, today):
+        """Today's, this week's and this month's posted vendor bills in one pass"""
+        self.env['account.move'].flush_model(['move_type', 'invoice_date', 'state', 'amount_total', 'company_id', 'active'])
+        params = dict(self._get_dashboard_periods(today), company_ids=self.env.companies.ids)
+        self.env.cr.execute("""
+            SELECT COALESCE(SUM(amount_total) FILTER (WHERE invoice_date = %(today)s), 0)::float8,
+                   COUNT(*) FILTER (WHERE invoice_date = %(today)s),
+                   COALESCE(SUM(amount_total) FILTER (WHERE invoice_date >= %(week_start)s), 0)::float8,
+                   COUNT(*) FILTER (WHERE invoice_date >= %(week_start)s),
+                   COALESCE(SUM(amount_total) FILTER (WHERE invoice_date >= %(month_start)s), 0)::float8,
+                   COUNT(*) FILTER (WHERE invoice_date >= %(month_start)s)
+              FROM account_move
+             WHERE move_type IN ('in_invoice', 'in_refund')
+               AND state = 'posted'
+               AND active
+               AND company_id = ANY(%(company_ids)s)
+               AND invoice_date >= %(range_start)s AND invoice_date <= %(today)s
+        """, params)
+        row = self.env.cr.fetchone()
+        return dict(zip([
+            'today_expenses', 'today_expenses_count',
+            'week_expenses', 'week_expenses_count',
+            'month_expenses', 'month_expenses_count',
+        ], row))
+
+    @api.model
+    def _get_occupancy_figures(self, today):
+        """Property, room and tenant counts, with new tenants per period"""
+        self.env['property.room'].flush_model(['status', 'active'])
+        self.env['property.property'].flush_model(['active'])
+        self.env['property.tenant'].flush_model(['status', 'active'])
+        periods = self._get_dashboard_periods(today)
+        res = {}
+
+        self.env.cr.execute("""
+            SELECT (SELECT COUNT(*) FROM property_property WHERE active),
+                   COUNT(*),
+                   COUNT(*) FILTER (WHERE status = 'occupied'),
+                   COUNT(*) FILTER (WHERE status = 'vacant')
+              FROM property_room
+             WHERE active
+        """)
+        res['total_properties'], res['total_rooms'], res['occupied_rooms'], res['today_vacant_rooms'] = self.env.cr.fetchone()
         res['vacant_rooms'] = res['total_rooms'] - res['occupied_rooms']
         
         # Calculate occupancy rate as a decimal (0.0 to 1.0)
         # The percentage widget in the view will multiply by 100 for display
-        if res['total_rooms'] > 0:
-            res['occupancy_rate'] = res['occupied_rooms'] / res['total_rooms']
-        else:
-            res['occupancy_rate'] = 0.0
-        
-        res['total_tenants'] = self.env['property.tenant'].search_count([('status', '=', 'active')])
-        
-        # Agent Statistics
-        all_agents = self.env['res.partner'].search([
+        res['occupancy_rate'] = res['occupied_rooms'] / res['total_rooms'] if res['total_rooms'] else 0.0
+
+        def day_start(day):
+            return fields.Datetime.to_string(datetime.combine(day, datetime.min.time()))
+
+        self.env.cr.execute("""
+            SELECT COUNT(*) FILTER (WHERE create_date >= %(today)s AND create_date < %(tomorrow)s),
+                   COUNT(*) FILTER (WHERE create_date >= %(week_start)s AND create_date < %(tomorrow)s),
+                   COUNT(*) FILTER (WHERE create_date >= %(month_start)s AND create_date < %(tomorrow)s),
+                   COUNT(*) FILTER (WHERE status = 'active')
+              FROM property_tenant
+             WHERE active
+        """, {
+            'today': day_start(today),
+            'tomorrow': day_start(today + timedelta(days=1)),
+            'week_start': day_start(periods['week_start']),
+            'month_start': day_start(periods['month_start']),
+        })
+        res['today_new_tenants'], res['week_new_tenants'], res['month_new_tenants'], res['total_tenants'] = self.env.cr.fetchone()
+        return res
+
+    @api.model
+    def _get_agent_figures(self, today):
+        """Agent counts and rankings from one grouped read of active agreements"""
+        res = {}
+        res['total_agents'] = self.env['res.partner'].search_count([
             ('is_company', '=', False),
             '|', ('category_id.name', 'in', ['Property Agent', 'Rental Agent', 'Sales Agent']),
             ('function', 'ilike', 'agent')
         ])
-        res['total_agents'] = len(all_agents)
-        
-        # Count agents with active agreements
-        active_agreements = self.env['property.agreement'].search([('state', '=', 'active')])
-        agents_with_agreements = active_agreements.mapped('agent_id').filtered(lambda a: a)
-        res['active_agents'] = len(set(agents_with_agreements.ids))
-        res['agents_with_tenants'] = len(set(agents_with_agreements.ids))
         
-        # Top performing agents by tenant count
-        agent_performance = {}
-        for agreement in active_agreements:
-            if agreement.agent_id:
-                agent_name = agreement.agent_id.name
-                if agent_name not in agent_performance:
-                    agent_performance[agent_name] = {
-                        'tenant_count': 0,
-                        'total_rent': 0,
-                        'agent_id': agreement.agent_id.id
-                    }
-                agent_performance[agent_name]['tenant_count'] += 1
-                agent_performance[agent_name]['total_rent'] += agreement.rent_amount
+        # Tenant count and monthly rent per agent with active agreements
+        agent_groups = self.env['property.agreement']._read_group(
+            [('state', '=', 'active'), ('agent_id', '!=', False)],
+            ['agent_id'], ['__count', 'rent_amount:sum'])
+        res['active_agents'] = len(agent_groups)
+        res['agents_with_tenants'] = len(agent_groups)
         
         # Sort agents by tenant count (descending)
-        sorted_agents = sorted(agent_performance.items(), 
-                             key=lambda x: x[1]['tenant_count'], 
-                             reverse=True)
+        sorted_agents = sorted(agent_groups, key=lambda group: group[1], reverse=True)
         
         # Format top agents list
         top_agents_text = ""
-        for i, (agent_name, stats) in enumerate(sorted_agents[:10], 1):
-            top_agents_text += f"{i}. {agent_name} - {stats['tenant_count']} tenants (AED {stats['total_rent']:,.0f}/month)\n"
+        for i, (agent, tenant_count, total_rent) in enumerate(sorted_agents[:10], 1):
+            top_agents_text += f"{i}. {agent.name} - {tenant_count} tenants (AED {total_rent:,.0f}/month)\n"
         res['top_agents_list'] = top_agents_text or "No agents assigned to agreements"
         
         # Agent performance summary
-        if agent_performance:
-            avg_tenants = sum(stats['tenant_count'] for stats in agent_performance.values()) / len(agent_performance)
-            avg_rent = sum(stats['total_rent'] for stats in agent_performance.values()) / len(agent_performance)
-            max_tenants = max(stats['tenant_count'] for stats in agent_performance.values())
-            min_tenants = min(stats['tenant_count'] for stats in agent_performance.values())
+        if agent_groups:
+            tenant_counts = [group[1] for group in agent_groups]
+            avg_tenants = sum(tenant_counts) / len(agent_groups)
+            avg_rent = sum(group[2] for group in agent_groups) / len(agent_groups)
             
             performance_summary = f"Average tenants per agent: {avg_tenants:.1f}\n"
             performance_summary += f"Average monthly rent per agent: AED {avg_rent:,.0f}\n"
-            performance_summary += f"Highest tenant count: {max_tenants}\n"
-            performance_summary += f"Lowest tenant count: {min_tenants}\n"
+            performance_summary += f"Highest tenant count: {max(tenant_counts)}\n"
+            performance_summary += f"Lowest tenant count: {min(tenant_counts)}\n"
             performance_summary += f"Agents without assignments: {res['total_agents'] - res['agents_with_tenants']}"
         else:
             performance_summary = "No agent performance data available"
-        
         res['agent_performance_summary'] = performance_summary
-        
-        # Statement and Outstanding Dues Statistics
-        # Total outstanding dues across all tenants
-        outstanding_dues = self.env['property.outstanding.dues'].search([])
-        res['total_outstanding_amount'] = sum(outstanding_dues.mapped('total_outstanding'))
-        res['total_outstanding_count'] = len(outstanding_dues.filtered(lambda d: d.total_outstanding > 0))
-        
-        # Outstanding dues by status
-        overdue_dues = outstanding_dues.filtered(lambda d: d.status in ['overdue_30', 'overdue_60', 'overdue_90', 'overdue_90plus', 'critical'])
-        res['overdue_tenants_count'] = len(overdue_dues)
-        res['overdue_amount'] = sum(overdue_dues.mapped('total_outstanding'))
-        
-        # Critical overdue (90+ days)
-        critical_dues = outstanding_dues.filtered(lambda d: d.status in ['overdue_90', 'overdue_90plus', 'critical'])
-        res['critical_overdue_count'] = len(critical_dues)
-        res['critical_overdue_amount'] = sum(critical_dues.mapped('total_outstanding'))
-        
-        # Statement entries this month
-        month_statements = self.env['property.statement'].search([
-            ('transaction_date', '>=', month_start),
-            ('transaction_date', '<=', today)
-        ])
-        res['month_statement_entries'] = len(month_statements)
-        res['month_total_debits'] = sum(month_statements.mapped('debit_amount'))
-        res['month_total_credits'] = sum(month_statements.mapped('credit_amount'))
-        res['month_net_balance'] = res['month_total_debits'] - res['month_total_credits']
-        
-        
-        # Tenant payment behavior analysis based on statement balances
-        active_tenants = self.env['property.tenant'].search([('status', '=', 'active')])
-        
-        # Count tenants with credit balance (negative running balance = advance payment)
-        # and debit balance (positive running balance = pending payment)
-        tenants_credit = 0
-        tenants_debit = 0
-        
-        for tenant in active_tenants:
-            # Get latest statement entry for this tenant to get current running balance
-            latest_statement = self.env['property.statement'].search([
-                ('tenant_id', '=', tenant.id)
-            ], order='transaction_date desc, id desc', limit=1)
-            
-            if latest_statement:
-                if latest_statement.running_balance < 0:
-                    tenants_credit += 1  # Negative balance = credit (advance payment)
-                elif latest_statement.running_balance > 0:
-                    tenants_debit += 1   # Positive balance = debit (pending payment)
-        
-        res['tenants_with_negative_balance'] = tenants_credit
-        res['tenants_with_positive_balance'] = tenants_debit
+        return res
+
+    @api.model
+    def _get_dues_figures(self, today):
+        """Outstanding, overdue and critical dues in one pass, plus the top debtors"""
+        Dues = self.env['property.outstanding.dues']
+        Dues.flush_model(['total_outstanding', 'status', 'tenant_id'])
+        self.env.cr.execute("""
+            SELECT COALESCE(SUM(total_outstanding), 0)::float8,
+                   COUNT(*) FILTER (WHERE total_outstanding > 0),
+                   COUNT(*) FILTER (WHERE status IN %(overdue)s),
+                   COALESCE(SUM(total_outstanding) FILTER (WHERE status IN %(overdue)s), 0)::float8,
+                   COUNT(*) FILTER (WHERE status IN %(critical)s),
+                   COALESCE(SUM(total_outstanding) FILTER (WHERE status IN %(critical)s), 0)::float8
+              FROM property_outstanding_dues
+        """, {'overdue': OVERDUE_STATUSES, 'critical': CRITICAL_STATUSES})
+        res = dict(zip([
+            'total_outstanding_amount', 'total_outstanding_count',
+            'overdue_tenants_count', 'overdue_amount',
+            'critical_overdue_count', 'critical_overdue_amount',
+        ], self.env.cr.fetchone()))
         
         # Top debtors list
-        top_debtors = outstanding_dues.filtered(lambda d: d.total_outstanding > 0).sorted('total_outstanding', reverse=True)[:10]
+        top_debtors = Dues.search_fetch([('total_outstanding', '>', 0)], ['tenant_id', 'total_outstanding', 'status'],
+                                        order='total_outstanding desc', limit=10)
         debtors_text = ""
         for i, debtor in enumerate(top_debtors, 1):
             debtors_text += f"{i}. {debtor.tenant_id.name} - AED {debtor.total_outstanding:,.0f} ({debtor.status.replace('_', ' ').title()})\n"
         res['top_debtors_list'] = debtors_text or "No outstanding dues found"
+        return res
+
+    @api.model
+    def _get_balance_figures(self, today):
+        """This month's statement totals and the tenants' statement balances"""
+        self.env['property.statement'].flush_model(['transaction_date', 'debit_amount', 'credit_amount'])
+        self.env.cr.execute("""
+            SELECT COUNT(*), COALESCE(SUM(debit_amount), 0)::float8, COALESCE(SUM(credit_amount), 0)::float8
+              FROM property_statement
+             WHERE transaction_date >= %s AND transaction_date <= %s
+        """, (today.replace(day=1), today))
+        res = dict(zip(['month_statement_entries', 'month_total_debits', 'month_total_credits'], self.env.cr.fetchone()))
+        res['month_net_balance'] = res['month_total_debits'] - res['month_total_credits']
         
         # Collection efficiency (payments vs expected)
-        total_expected = res['month_total_debits']
-        total_collected = res['month_total_credits']
-        if total_expected > 0:
-            res['collection_efficiency'] = (total_collected / total_expected)
+        if res['month_total_debits'] > 0:
+            res['collection_efficiency'] = res['month_total_credits'] / res['month_total_debits']
         else:
             res['collection_efficiency'] = 0.0
         
-        # Recent activities
-        recent_collections = self.env['property.collection'].search([
+        # Count tenants with credit balance (negative running balance = advance payment)
+        # and debit balance (positive running balance = pending payment)
+        active_tenant_ids = self.env['property.tenant'].search([('status', '=', 'active')]).ids
+        balances = self.env['property.statement'].get_tenant_balances(active_tenant_ids, today)
+        res['tenants_with_negative_balance'] = len([b for b in balances.values() if b['balance'] < 0])
+        res['tenants_with_positive_balance'] = len([b for b in balances.values() if b['balance'] > 0])
+        return res
+
+    @api.model
+    def _get_recent_activity(self, today):
+        """Latest collections and tenants"""
+        res = {}
+        recent_collections = self.env['property.collection'].search_fetch([
             ('status', '!=', 'cancelled')
-        ], order='date desc', limit=5)
+        ], ['date', 'tenant_id', 'amount_collected'], order='date desc', limit=5)
         
         collections_text = ""
         for collection in recent_collections:
             collections_text += f"• {collection.date} - {collection.tenant_id.name} - {collection.amount_collected} AED\n"
         res['recent_collections'] = collections_text or "No recent collections"
         
-        recent_tenants = self.env['property.tenant'].search([], order='create_date desc', limit=5)
+        recent_tenants = self.env['property.tenant'].search_fetch([], ['name', 'mobile', 'status'],
+                                                                  order='create_date desc', limit=5)
         tenants_text = ""
         for tenant in recent_tenants:
             tenants_text += f"• {tenant.name} - {tenant.mobile} - {tenant.status}\n"
         res['recent_tenants'] = tenants_text or "No recent tenants"
-        
         return res
 
+    # Snapshot refresh times
+    collections_refreshed_at = fields.Datetime('Collections Updated')
+    expenses_refreshed_at = fields.Datetime('Expenses Updated')
+    occupancy_refreshed_at = fields.Datetime('Occupancy Updated')
+    agents_refreshed_at = fields.Datetime('Agents Updated')
+    dues_refreshed_at = fields.Datetime('Outstanding Dues Updated')
+    balances_refreshed_at = fields.Datetime('Balances Updated')
+    recent_refreshed_at = fields.Datetime('Recent Activity Updated')
+
     # Today's Stats
     today_collections = fields.Float('Today Collections')
     today_collections_count = fields.Integer('Today Collections Count')
@@ -340,6 +391,8 @@ class PropertyDashboard(models.TransientModel):
     overdue_amount = fields.Float('Overdue Amount')
     critical_overdue_count = fields.Integer('Critical Overdue Count')
     critical_overdue_amount = fields.Float('Critical Overdue Amount')
+    statement_outstanding_amount = fields.Float('Statement Balance of the Filtered Properties')
+    statement_overdue_amount = fields.Float('Statement Balance Older than 30 Days')
     
     # Monthly Statement Analysis
     month_statement_entries = fields.Integer('Monthly Statement Entries')
@@ -353,6 +406,17 @@ class PropertyDashboard(models.TransientModel):
     tenants_with_positive_balance = fields.Integer('Tenants with Debit Balance')
     top_debtors_list = fields.Text('Top Debtors List')
 
+    def action_refresh_dashboard(self):
+        """Recompute the sections whose data changed, then reopen the dashboard"""
+        self.env['property.dashboard.snapshot']._get_sections(today=fields.Date.today(), refresh_stale=True)
+        return {
+            'name': 'Property Dashboard',
+            'type': 'ir.actions.act_window',
+            'res_model': 'property.dashboard',
+            'view_mode': 'form',
+            'target': 'current',
+        }
+
     def action_open_collections(self):
         return {
             'name': 'Collections',
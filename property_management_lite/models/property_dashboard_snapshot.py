@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+from odoo import models, fields, api
+from datetime import timedelta
+from .property_dashboard import DASHBOARD_SECTIONS
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+SNAPSHOT_TTL_PARAM = 'property_management_lite.dashboard_ttl_seconds'
+SNAPSHOT_TTL_DEFAULT = 300
+
+# Sections whose figures depend on collection record rules: shared snapshots
+# (computed as superuser) only serve users who may see every collection
+RESTRICTED_SECTIONS = ('collections', 'recent')
+SHARED_SECTIONS_GROUP = 'property_management_lite.group_property_officer'
+
+# First key of the advisory locks taken while a snapshot is refreshed
+SNAPSHOT_LOCK_KEY = 815370
+
+
+class PropertyDashboardSnapshot(models.Model):
+    _name = 'property.dashboard.snapshot'
+    _description = 'Dashboard KPI Snapshot'
+    _order = 'company_id, section'
+    _rec_name = 'section'
+
+    company_id = fields.Many2one('res.company', string='Company', required=True, ondelete='cascade', readonly=True)
+    section = fields.Selection([
+        ('collections', 'Collections'),
+        ('expenses', 'Expenses'),
+        ('occupancy', 'Occupancy'),
+        ('agents', 'Agents'),
+        ('dues', 'Outstanding Dues'),
+        ('balances', 'Statement Balances'),
+        ('recent', 'Recent Activity'),
+    ], string='Section', required=True, readonly=True)
+    snapshot_date = fields.Date(string='Figures Of', readonly=True, help="Day the today/week/month figures refer to")
+    values = fields.Json(string='Figures', readonly=True)
+    refreshed_at = fields.Datetime(string='Last Refreshed', readonly=True,
+                                   help="Start of the transaction that computed the figures")
+    compute_ms = fields.Integer(string='Compute Time (ms)', readonly=True)
+    changed_at = fields.Datetime(string='Data Changed', readonly=True,
+                                 help="Last commit that changed data behind this section, once it was computed")
+    stale = fields.Boolean(string='Stale', compute='_compute_stale',
+                           help="Data behind this section changed since it was computed")
+
+    _sql_constraints = [
+        ('company_section_unique', 'unique(company_id, section)', 'Only one snapshot per company and section is allowed.'),
+    ]
+
+    @api.depends('changed_at', 'refreshed_at')
+    def _compute_stale(self):
+        for snapshot in self:
+            snapshot.stale = bool(snapshot.changed_at and snapshot.refreshed_at
+                                  and snapshot.changed_at >= snapshot.refreshed_at)
+
+    @api.model
+    def _get_ttl(self):
+        return int(self.env['ir.config_parameter'].sudo().get_param(SNAPSHOT_TTL_PARAM, SNAPSHOT_TTL_DEFAULT))
+
+    def _needs_refresh(self, today, refresh_stale=False):
+        """Missing, from another day, older than the TTL, or (when asked) stale"""
+        self.ensure_one()
+        if not self.refreshed_at or self.snapshot_date != today:
+            return True
+        if refresh_stale and self.stale:
+            return True
+        return self.refreshed_at < fields.Datetime.now() - timedelta(seconds=self._get_ttl())
+
+    def _as_card(self):
+        self.ensure_one()
+        return {'values': self.values or {}, 'refreshed_at': self.refreshed_at, 'compute_ms': self.compute_ms}
+
+    @api.model
+    def _get_sections(self, sections=None, company=None, today=None, refresh_stale=False, force=False):
+        """Return {section: {'values', 'refreshed_at', 'compute_ms'}} for a company
+
+        Shared snapshots within the TTL are served as they are. With
+        ``refresh_stale`` the stale ones are recomputed too, and ``force``
+        recomputes everything. A snapshot being refreshed by another
+        transaction is served from its previous figures instead of waiting.
+        Users bound by the collection record rules get the RESTRICTED_SECTIONS
+        computed for them, outside the shared cache.
+        """
+        company = company or self.env.company
+        today = today or fields.Date.today()
+        sections = list(sections or DASHBOARD_SECTIONS)
+        res = {}
+        restricted = self._get_restricted_sections()
+        for section in [section for section in sections if section in restricted]:
+            res[section] = self._compute_section(section, company, today, shared=False)
+        sections = [section for section in sections if section not in res]
+        if not sections:
+            return res
+
+        Snapshot = self.sudo()
+        # Create missing rows without racing concurrent openers on the unique constraint
+        self.env.cr.execute("""
+            INSERT INTO property_dashboard_snapshot (company_id, section, create_uid, create_date, write_uid, write_date)
+            SELECT %s, s.section, %s, now() AT TIME ZONE 'UTC', %s, now() AT TIME ZONE 'UTC'
+              FROM unnest(%s::varchar[]) AS s(section)
+            ON CONFLICT (company_id, section) DO NOTHING
+        """, (company.id, self.env.uid, self.env.uid, sections))
+        snapshots = Snapshot.search([('company_id', '=', company.id), ('section', 'in', sections)])
+        for snapshot in snapshots:
+            if (force or snapshot._needs_refresh(today, refresh_stale)) and (
+                    snapshot._try_lock() or not snapshot.refreshed_at):
+                snapshot._refresh(today)
+            res[snapshot.section] = snapshot._as_card()
+        return res
+
+    @api.model
+    def _get_restricted_sections(self):
+        """Sections the current user must get computed under their own record rules"""
+        if self.env.su or self.env.user.has_group(SHARED_SECTIONS_GROUP):
+            return ()
+        return RESTRICTED_SECTIONS
+
+    def _try_lock(self):
+        """Advisory lock on the snapshot for the rest of the transaction; False if another one holds it
+
+        Row locks are avoided so writers flagging the section stale never
+        wait for a refresh in progress.
+        """
+        self.ensure_one()
+        self.env.cr.execute("SELECT pg_try_advisory_xact_lock(%s, %s)", (SNAPSHOT_LOCK_KEY, self.id))
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _get_transaction_time(self):
+        """Start of the current transaction (UTC, whole seconds, as Datetime fields store it)"""
+        self.env.cr.execute("SELECT date_trunc('second', now() AT TIME ZONE 'UTC')")
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _compute_section(self, section, company, today, shared=True):
+        """Figures of one section for a company; as superuser when they are to be shared"""
+        Dashboard = self.env['property.dashboard']
+        if shared:
+            Dashboard = Dashboard.sudo()
+        # Figures of this company only, whatever the companies of the requesting user
+        Dashboard = Dashboard.with_company(company).with_context(allowed_company_ids=company.ids)
+        refreshed_at = self._get_transaction_time()
+        started = time.time()
+        values = getattr(Dashboard, DASHBOARD_SECTIONS[section])(today)
+        return {'values': values, 'refreshed_at': refreshed_at, 'compute_ms': int((time.time() - started) * 1000)}
+
+    def _refresh(self, today=None):
+        """Recompute these shared snapshots from the dashboard section methods
+
+        ``refreshed_at`` is the start of this transaction, so any change
+        committed after the figures were read flags them stale again.
+        """
+        today = today or fields.Date.today()
+        for snapshot in self:
+            card = self._compute_section(snapshot.section, snapshot.company_id, today)
+            snapshot.write(dict(card, snapshot_date=today))
+
+    @api.model
+    def _mark_stale(self, sections):
+        """Flag sections of every company as changed once the current transaction commits
+
+        Sections are collected per transaction and flagged in one UPDATE from
+        a separate cursor after the commit, so writers never hold or wait for
+        snapshot row locks. Rows already stale are left alone.
+        """
+        postcommit = self.env.cr.postcommit
+        pending = postcommit.data.get('property.dashboard.stale')
+        if pending is None:
+            pending = postcommit.data['property.dashboard.stale'] = set()
+            registry = self.env.registry
+
+            @postcommit.add
+            def flag_stale():
+                with registry.cursor() as cr:
+                    cr.execute("""
+                        UPDATE property_dashboard_snapshot SET changed_at = now() AT TIME ZONE 'UTC'
+                         WHERE section = ANY(%s)
+                           AND refreshed_at IS NOT NULL
+                           AND (changed_at IS NULL OR changed_at < refreshed_at)
+                    """, (sorted(pending),))
+        pending.update(sections)
+
+    @api.model
+    def cron_refresh_snapshots(self):
+        """Keep the cache warm: recompute stale or expired sections of every company"""
+        started = time.time()
+        auto_commit = not self.env.registry.in_test_mode()
+        for company in self.env['res.company'].search([]):
+            self.sudo()._get_sections(company=company, refresh_stale=True)
+            if auto_commit:
+                self.env.cr.commit()
+        _logger.info("Dashboard snapshots refreshed in %.2fs", time.time() - started)
+
+    def action_refresh(self):
+        self._refresh()
+        return True
+
+
+class PropertyDashboardSource(models.AbstractModel):
+    """Marks dashboard snapshot sections stale when records of the model change"""
+    _name = 'property.dashboard.source'
+    _description = 'Dashboard Snapshot Source'
+
+    # Snapshot sections fed by the model
+    _dashboard_sections = ()
+
+    def _mark_dashboard_stale(self):
+        if self._dashboard_sections:
+            self.env['property.dashboard.snapshot']._mark_stale(self._dashboard_sections)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._mark_dashboard_stale()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        self._mark_dashboard_stale()
+        return result
+
+    def unlink(self):
+        self._mark_dashboard_stale()
+        return super().unlink()
+
+
+class PropertyCollection(models.Model):
+    _name = 'property.collection'
+    _inherit = ['property.collection', 'property.dashboard.source']
+    _dashboard_sections = ('collections', 'recent')
+
+
+class AccountMove(models.Model):
+    _name = 'account.move'
+    _inherit = ['account.move', 'property.dashboard.source']
+    _dashboard_sections = ('expenses',)
+
+    def _mark_dashboard_stale(self):
+        # Only vendor bills feed the dashboard
+        if any(move.move_type in ('in_invoice', 'in_refund') for move in self):
+            super()._mark_dashboard_stale()
+
+
+class PropertyProperty(models.Model):
+    _name = 'property.property'
+    _inherit = ['property.property', 'property.dashboard.source']
+    _dashboard_sections = ('occupancy',)
+
+
+class PropertyRoom(models.Model):
+    _name = 'property.room'
+    _inherit = ['property.room', 'property.dashboard.source']
+    _dashboard_sections = ('occupancy',)
+
+
+class PropertyTenant(models.Model):
+    _name = 'property.tenant'
+    _inherit = ['property.tenant', 'property.dashboard.source']
+    _dashboard_sections = ('occupancy', 'recent', 'balances')
+
+
+class PropertyAgreement(models.Model):
+    _name = 'property.agreement'
+    _inherit = ['property.agreement', 'property.dashboard.source']
+    _dashboard_sections = ('agents',)
+
+
+class PropertyOutstandingDues(models.Model):
+    _name = 'property.outstanding.dues'
+    _inherit = ['property.outstanding.dues', 'property.dashboard.source']
+    _dashboard_sections = ('dues',)
+
+
+class PropertyStatement(models.Model):
+    _name = 'property.statement'
+    _inherit = ['property.statement', 'property.dashboard.source']
+    _dashboard_sections = ('balances',)
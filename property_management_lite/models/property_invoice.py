@@ -19,6 +19,7 @@
 ################################################################################
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError, UserError
+from odoo.tools.sql import create_index
 from datetime import timedelta
 from datetime import date, timedelta
 import logging
@@ -83,6 +84,13 @@ class AccountInvoice(models.Model):
     # Archive
     active = fields.Boolean('Active', default=True)
 
+    def init(self):
+        super().init()
+        # Open tenant invoices, as searched by payment matching and outstanding dues
+        create_index(self.env.cr, 'account_move_tenant_open_invoice_idx', self._table,
+                     ['tenant_id', 'agreement_id', 'invoice_type', 'invoice_date'],
+                     where="move_type = 'out_invoice' AND state = 'posted' AND payment_state IN ('not_paid', 'partial')")
+
     @api.onchange('room_id')
     def _onchange_room_id(self):
         if self.room_id:
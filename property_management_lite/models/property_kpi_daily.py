@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+from odoo import models, fields, api
+from odoo.tools.sql import create_index
+from datetime import timedelta
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Days computed per statement; the running sums need at most OVERDUE_DAYS of lead-in
+KPI_CHUNK_DAYS = 366
+# Charges younger than this are not overdue yet
+OVERDUE_DAYS = 30
+# First key of the advisory locks serializing the KPI upserts of a company
+KPI_LOCK_KEY = 815371
+
+KPI_COLUMNS = [
+    'collections_amount', 'collections_count', 'expenses_amount', 'expenses_count',
+    'rooms_total', 'rooms_occupied', 'occupancy_rate', 'outstanding_amount', 'overdue_amount',
+]
+
+# Dashboard sections that can be answered per property from the daily rows
+ROLLUP_SECTIONS = ('collections', 'expenses', 'occupancy', 'dues')
+
+
+class PropertyKpiDaily(models.Model):
+    _name = 'property.kpi.daily'
+    _description = 'Daily Property KPIs'
+    _order = 'day desc, property_id'
+    _rec_name = 'day'
+
+    day = fields.Date(string='Day', required=True, readonly=True, index=True)
+    company_id = fields.Many2one('res.company', string='Company', required=True, ondelete='cascade', readonly=True)
+    property_id = fields.Many2one('property.property', string='Property', required=True, ondelete='cascade', readonly=True)
+
+    # Flows of the day
+    collections_amount = fields.Float(string='Collections', digits=(16, 2), readonly=True)
+    collections_count = fields.Integer(string='Collections Count', readonly=True)
+    expenses_amount = fields.Float(string='Expenses', digits=(16, 2), readonly=True)
+    expenses_count = fields.Integer(string='Expenses Count', readonly=True)
+
+    # Position at the end of the day, averaged when grouped
+    rooms_total = fields.Integer(string='Rooms', readonly=True, aggregator='avg')
+    rooms_occupied = fields.Integer(string='Occupied Rooms', readonly=True, aggregator='avg')
+    occupancy_rate = fields.Float(string='Occupancy (%)', digits=(16, 2), readonly=True, aggregator='avg')
+    outstanding_amount = fields.Float(string='Outstanding', digits=(16, 2), readonly=True, aggregator='avg',
+                                      help="Statement balance of the property's tenants (charges less payments)")
+    overdue_amount = fields.Float(string='Overdue', digits=(16, 2), readonly=True, aggregator='avg',
+                                  help="Outstanding balance not covered by charges of the last 30 days")
+
+    _sql_constraints = [
+        ('day_company_property_unique', 'unique(day, company_id, property_id)',
+         'Only one KPI row per day, company and property is allowed.'),
+    ]
+
+    def init(self):
+        create_index(self.env.cr, 'property_kpi_daily_company_day_idx', self._table, ['company_id', 'day'])
+        create_index(self.env.cr, 'property_kpi_daily_property_day_idx', self._table, ['property_id', 'day'])
+
+    @api.model
+    def _backfill(self, date_from, date_to, company=None, chunk_days=KPI_CHUNK_DAYS, auto_commit=False):
+        """(Re)compute the KPI rows of every active property between two dates
+
+        Each chunk of days is one INSERT ... SELECT over grouped aggregates of
+        collections, vendor bills, agreements, rooms and the statement history
+        (live and archived entries), upserted on (day, company, property).
+        Returns the number of rows written.
+        """
+        company = company or self.env.company
+        date_from, date_to = fields.Date.to_date(date_from), fields.Date.to_date(date_to)
+        for model in ('property.collection', 'account.move', 'property.agreement', 'property.room', 'property.statement'):
+            self.env[model].flush_model()
+        history_query = self.env['property.statement.history']._table_query
+
+        start = time.time()
+        written = 0
+        chunk_from = date_from
+        while chunk_from <= date_to:
+            chunk_to = min(chunk_from + timedelta(days=chunk_days - 1), date_to)
+            written += self._backfill_chunk(chunk_from, chunk_to, company, history_query)
+            if auto_commit:
+                self.env.cr.commit()
+            chunk_from = chunk_to + timedelta(days=1)
+        self.invalidate_model()
+
+        _logger.info("Daily KPIs of %s written from %s to %s: %s rows in %.2fs",
+                     company.name, date_from, date_to, written, time.time() - start)
+        return written
+
+    def _backfill_chunk(self, date_from, date_to, company, history_query):
+        params = {
+            'date_from': date_from,
+            'date_to': date_to,
+            # Lead-in days so the overdue window is complete on the first day
+            'grid_from': date_from - timedelta(days=OVERDUE_DAYS - 1),
+            'overdue_rows': OVERDUE_DAYS - 1,
+            'company_id': company.id,
+            'uid': self.env.uid,
+        }
+        columns = ', '.join(KPI_COLUMNS)
+        updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in KPI_COLUMNS)
+        # Concurrent upserts of the same rows would deadlock; run them one after the other
+        self.env.cr.execute("SELECT pg_advisory_xact_lock(%s, %s)", (KPI_LOCK_KEY, company.id))
+        # Rooms created and statement entries dated before the grid are folded
+        # into its first day, so the running sums start from the right opening value
+        self.env.cr.execute(f"""
+            WITH days AS (
+                SELECT d::date AS day
+                  FROM generate_series(%(grid_from)s::date, %(date_to)s::date, interval '1 day') d
+            ),
+            grid AS (
+                SELECT p.id AS property_id, days.day
+                  FROM property_property p
+            CROSS JOIN days
+                 WHERE p.active
+            ),
+            collections AS (
+                SELECT property_id, date AS day, SUM(amount_collected) AS amount, COUNT(*) AS cnt
+                  FROM property_collection
+                 WHERE active
+                   AND company_id = %(company_id)s
+                   AND (status IS NULL OR status != 'cancelled')
+                   AND date BETWEEN %(date_from)s AND %(date_to)s
+              GROUP BY property_id, date
+            ),
+            expenses AS (
+                SELECT property_id, invoice_date AS day, SUM(amount_total) AS amount, COUNT(*) AS cnt
+                  FROM account_move
+                 WHERE move_type IN ('in_invoice', 'in_refund')
+                   AND state = 'posted'
+                   AND active
+                   AND company_id = %(company_id)s
+                   AND invoice_date BETWEEN %(date_from)s AND %(date_to)s
+              GROUP BY property_id, invoice_date
+            ),
+            rooms AS (
+                SELECT property_id, GREATEST(create_date::date, %(grid_from)s) AS day, COUNT(*) AS cnt
+                  FROM property_room
+                 WHERE active AND create_date::date <= %(date_to)s
+              GROUP BY 1, 2
+            ),
+            occupied AS (
+                SELECT a.property_id, days.day, COUNT(DISTINCT a.room_id) AS cnt
+                  FROM property_agreement a
+                  JOIN days
+                    ON days.day >= a.start_date
+                   AND days.day <= COALESCE(LEAST(a.end_date, a.closed_date), days.day)
+                 WHERE a.state NOT IN ('draft', 'cancelled')
+                   AND days.day >= %(date_from)s
+              GROUP BY a.property_id, days.day
+            ),
+            statement AS (
+                SELECT COALESCE(r.property_id, a.property_id) AS property_id,
+                       GREATEST(h.transaction_date, %(grid_from)s) AS day,
+                       SUM(COALESCE(h.debit_amount, 0) - COALESCE(h.credit_amount, 0)) AS net,
+                       SUM(COALESCE(h.debit_amount, 0)) FILTER (WHERE h.transaction_date >= %(grid_from)s) AS debit
+                  FROM ({history_query}) h
+             LEFT JOIN property_room r ON r.id = h.room_id
+             LEFT JOIN property_agreement a ON a.id = h.agreement_id
+                 WHERE h.transaction_date <= %(date_to)s
+              GROUP BY 1, 2
+            ),
+            rolled AS (
+                SELECT g.property_id, g.day,
+                       COALESCE(c.amount, 0) AS collections_amount, COALESCE(c.cnt, 0) AS collections_count,
+                       COALESCE(e.amount, 0) AS expenses_amount, COALESCE(e.cnt, 0) AS expenses_count,
+                       SUM(COALESCE(r.cnt, 0)) OVER running AS rooms_total,
+                       COALESCE(o.cnt, 0) AS rooms_occupied,
+                       SUM(COALESCE(s.net, 0)) OVER running AS balance,
+                       SUM(COALESCE(s.debit, 0)) OVER (
+                           PARTITION BY g.property_id ORDER BY g.day ROWS %(overdue_rows)s PRECEDING
+                       ) AS recent_debits
+                  FROM grid g
+             LEFT JOIN collections c ON c.property_id = g.property_id AND c.day = g.day
+             LEFT JOIN expenses e ON e.property_id = g.property_id AND e.day = g.day
+             LEFT JOIN rooms r ON r.property_id = g.property_id AND r.day = g.day
+             LEFT JOIN occupied o ON o.property_id = g.property_id AND o.day = g.day
+             LEFT JOIN statement s ON s.property_id = g.property_id AND s.day = g.day
+                WINDOW running AS (PARTITION BY g.property_id ORDER BY g.day ROWS UNBOUNDED PRECEDING)
+            )
+            INSERT INTO property_kpi_daily (
+                day, company_id, property_id, {columns},
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT day, %(company_id)s, property_id,
+                   collections_amount, collections_count, expenses_amount, expenses_count,
+                   rooms_total, rooms_occupied,
+                   CASE WHEN rooms_total > 0 THEN 100.0 * rooms_occupied / rooms_total ELSE 0 END,
+                   GREATEST(balance, 0), GREATEST(balance - recent_debits, 0),
+                   %(uid)s, now() AT TIME ZONE 'UTC', %(uid)s, now() AT TIME ZONE 'UTC'
+              FROM rolled
+             WHERE day >= %(date_from)s
+            ON CONFLICT (day, company_id, property_id) DO UPDATE
+               SET {updates}, write_uid = EXCLUDED.write_uid, write_date = EXCLUDED.write_date
+        """, params)
+        return self.env.cr.rowcount
+
+    @api.model
+    def _get_first_day(self):
+        """Earliest day with collections or statement history"""
+        self.env.cr.execute(f"""
+            SELECT LEAST(
+                (SELECT MIN(date) FROM property_collection),
+                (SELECT MIN(transaction_date) FROM ({self.env['property.statement.history']._table_query}) h)
+            )
+        """)
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def cron_update_kpi_daily(self):
+        """Recompute yesterday and today, or backfill the whole history on the first run"""
+        today = fields.Date.today()
+        company = self.env.company
+        self.env.cr.execute("SELECT MAX(day) FROM property_kpi_daily WHERE company_id = %s", (company.id,))
+        last_day = self.env.cr.fetchone()[0]
+        if last_day:
+            date_from = min(last_day, today - timedelta(days=1))
+        else:
+            date_from = self._get_first_day() or today
+        return self._backfill(date_from, today, company=company,
+                              auto_commit=not self.env.registry.in_test_mode())
+
+    @api.model
+    def cron_refresh_kpi_today(self):
+        """Recompute today's rows, so the filtered dashboard cards stay current
+
+        Skipped when another refresh or backfill of the company is running.
+        """
+        company = self.env.company
+        self.env.cr.execute("SELECT pg_try_advisory_xact_lock(%s, %s)", (KPI_LOCK_KEY, company.id))
+        if not self.env.cr.fetchone()[0]:
+            _logger.info("Daily KPIs of %s are being written by another job, skipping", company.name)
+            return 0
+        today = fields.Date.today()
+        return self._backfill(today, today, company=company)
+
+    @api.model
+    def _get_today_written(self, today, company):
+        """Time today's rows were last written, or None before the first refresh"""
+        self.env.cr.execute("""
+            SELECT MAX(write_date) FROM property_kpi_daily WHERE company_id = %s AND day = %s
+        """, (company.id, today))
+        return self.env.cr.fetchone()[0]
+
+    @api.model
+    def _get_dashboard_figures(self, property_ids, today=None, company=None):
+        """Dashboard figures of a set of properties, summed from their daily rows
+
+        Returns ``{section: values}`` for the ROLLUP_SECTIONS, using the same
+        keys as the portfolio-wide dashboard sections. Figures the daily rows
+        do not hold (tenant counts, debtor lists) are left out. Dues are the
+        net statement balances of the properties, not the outstanding dues
+        of their tenants, so they get their own ``statement_*`` keys.
+        """
+        today = today or fields.Date.today()
+        company = company or self.env.company
+        periods = self.env['property.dashboard']._get_dashboard_periods(today)
+        self.env.cr.execute("""
+            SELECT COALESCE(SUM(collections_amount) FILTER (WHERE day = %(today)s), 0)::float8,
+                   COALESCE(SUM(collections_count) FILTER (WHERE day = %(today)s), 0),
+                   COALESCE(SUM(collections_amount) FILTER (WHERE day >= %(week_start)s), 0)::float8,
+                   COALESCE(SUM(collections_count) FILTER (WHERE day >= %(week_start)s), 0),
+                   COALESCE(SUM(collections_amount) FILTER (WHERE day >= %(month_start)s), 0)::float8,
+                   COALESCE(SUM(collections_count) FILTER (WHERE day >= %(month_start)s), 0),
+                   COALESCE(SUM(expenses_amount) FILTER (WHERE day = %(today)s), 0)::float8,
+                   COALESCE(SUM(expenses_count) FILTER (WHERE day = %(today)s), 0),
+                   COALESCE(SUM(expenses_amount) FILTER (WHERE day >= %(week_start)s), 0)::float8,
+                   COALESCE(SUM(expenses_count) FILTER (WHERE day >= %(week_start)s), 0),
+                   COALESCE(SUM(expenses_amount) FILTER (WHERE day >= %(month_start)s), 0)::float8,
+                   COALESCE(SUM(expenses_count) FILTER (WHERE day >= %(month_start)s), 0),
+                   COALESCE(SUM(rooms_total) FILTER (WHERE day = %(today)s), 0),
+                   COALESCE(SUM(rooms_occupied) FILTER (WHERE day = %(today)s), 0),
+                   COALESCE(SUM(outstanding_amount) FILTER (WHERE day = %(today)s), 0)::float8,
+                   COALESCE(SUM(overdue_amount) FILTER (WHERE day = %(today)s), 0)::float8
+              FROM property_kpi_daily
+             WHERE company_id = %(company_id)s
+               AND property_id = ANY(%(property_ids)s)
+               AND day >= %(range_start)s AND day <= %(today)s
+        """, dict(periods, company_id=company.id, property_ids=list(property_ids)))
+        row = self.env.cr.fetchone()
+        res = {
+            'collections': dict(zip([
+                'today_collections', 'today_collections_count',
+                'week_collections', 'week_collections_count',
+                'month_collections', 'month_collections_count',
+            ], row[0:6])),
+            'expenses': dict(zip([
+                'today_expenses', 'today_expenses_count',
+                'week_expenses', 'week_expenses_count',
+                'month_expenses', 'month_expenses_count',
+            ], row[6:12])),
+            'dues': dict(zip(['statement_outstanding_amount', 'statement_overdue_amount'], row[14:16])),
+        }
+        total_rooms, occupied_rooms = row[12:14]
+        res['occupancy'] = {
+            'total_properties': len(property_ids),
+            'total_rooms': total_rooms,
+            'occupied_rooms': occupied_rooms,
+            'vacant_rooms': total_rooms - occupied_rooms,
+            'occupancy_rate': occupied_rooms / total_rooms if total_rooms else 0.0,
+        }
+        return res
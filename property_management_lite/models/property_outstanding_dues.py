@@ -40,6 +40,8 @@ class PropertyOutstandingDues(models.Model):
     other_charges_outstanding = fields.Monetary('Other Charges Outstanding', currency_field='currency_id')
     total_outstanding = fields.Monetary('Total Outstanding', currency_field='currency_id', 
                                        compute='_compute_total_outstanding', store=True)
+    statement_balance = fields.Monetary('Statement Balance', currency_field='currency_id',
+                                        help="Tenant balance on the statement of account when dues were updated")
     
     # Period Information
     last_payment_date = fields.Date('Last Payment Date')
@@ -145,6 +147,9 @@ class PropertyOutstandingDues(models.Model):
             ('current_agreement_id', '!=', False)
         ])
         
+        # Statement balances for all tenants in one query
+        balances = self.env['property.statement'].get_tenant_balances(tenants.ids)
+        
         for tenant in tenants:
             agreement = tenant.current_agreement_id
             if not agreement or agreement.state != 'active':
@@ -175,6 +180,7 @@ class PropertyOutstandingDues(models.Model):
                     'parking_outstanding': parking_outstanding,
                     'other_charges_outstanding': other_charges_outstanding,
                     'last_payment_date': last_payment_date,
+                    'statement_balance': balances[tenant.id]['balance'],
                 })
     
     def _calculate_rent_outstanding(self, tenant, agreement):
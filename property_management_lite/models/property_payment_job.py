@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+from odoo import models, fields, api, _
+from datetime import timedelta
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Minutes to wait before each retry; a job fails for good once they run out
+RETRY_BACKOFF_MINUTES = [1, 5, 15, 60, 240]
+
+
+class PropertyPaymentJob(models.Model):
+    _name = 'property.payment.job'
+    _description = 'Collection Payment Registration Job'
+    _order = 'next_attempt asc, id asc'
+    _rec_name = 'collection_id'
+
+    collection_id = fields.Many2one('property.collection', string='Collection', required=True,
+                                    ondelete='cascade', readonly=True, index=True)
+    tenant_id = fields.Many2one(related='collection_id.tenant_id', string='Tenant')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ], string='Status', default='pending', required=True, readonly=True, index=True)
+    attempts = fields.Integer(string='Attempts', readonly=True)
+    next_attempt = fields.Datetime(string='Next Attempt', default=fields.Datetime.now, readonly=True)
+    done_date = fields.Datetime(string='Done On', readonly=True)
+    last_error = fields.Char(string='Last Error', readonly=True)
+    error_log = fields.Text(string='Error Log', readonly=True)
+    waiting_minutes = fields.Integer(string='Waiting (min)', compute='_compute_waiting_minutes',
+                                     help="Time since the job was queued, while it is still pending")
+
+    def init(self):
+        # The worker polls due pending jobs only
+        self.env.cr.execute("""
+            CREATE INDEX IF NOT EXISTS property_payment_job_due_idx
+                ON property_payment_job (next_attempt, id)
+             WHERE state = 'pending'
+        """)
+
+    def _compute_waiting_minutes(self):
+        now = fields.Datetime.now()
+        for job in self:
+            if job.state == 'pending' and job.create_date:
+                job.waiting_minutes = int((now - job.create_date).total_seconds() // 60)
+            else:
+                job.waiting_minutes = 0
+
+    @api.model
+    def _enqueue(self, collections):
+        """Queue payment registration for collections without an open job"""
+        if not collections:
+            return self.browse()
+        queued = self.search([('collection_id', 'in', collections.ids), ('state', '=', 'pending')]).collection_id
+        return self.create([{'collection_id': collection.id} for collection in collections - queued])
+
+    def _run(self):
+        """Register the payments of these jobs, recording retries and errors per job"""
+        # Match the whole batch at once; a tenant's later collections are
+        # matched again once an earlier one may have paid their invoices
+        matches = self.collection_id._find_matching_invoices_batch()
+        paid_tenants = set()
+        for job in self:
+            collection = job.collection_id
+            if collection.payment_id or collection.status not in ['collected', 'verified', 'deposited']:
+                # Paid through another path, or cancelled while queued
+                job.write({'state': 'cancelled', 'done_date': fields.Datetime.now()})
+                continue
+            invoices = None if collection.tenant_id.id in paid_tenants else matches.get(collection.id)
+            try:
+                with self.env.cr.savepoint():
+                    collection._register_payment_for_collection(invoices)
+                if collection.payment_id:
+                    paid_tenants.add(collection.tenant_id.id)
+                job.write({'state': 'done', 'attempts': job.attempts + 1, 'done_date': fields.Datetime.now()})
+            except Exception as e:
+                job._record_failure(e)
+
+    def _record_failure(self, error):
+        self.ensure_one()
+        attempts = self.attempts + 1
+        now = fields.Datetime.now()
+        vals = {
+            'attempts': attempts,
+            'last_error': str(error)[:250],
+            'error_log': (self.error_log or '') + f"[{now}] attempt {attempts}: {error}\n",
+        }
+        if attempts > len(RETRY_BACKOFF_MINUTES):
+            vals['state'] = 'failed'
+            _logger.error("Payment registration for collection %s failed after %s attempts: %s",
+                          self.collection_id.display_name, attempts, error)
+        else:
+            vals['next_attempt'] = now + timedelta(minutes=RETRY_BACKOFF_MINUTES[attempts - 1])
+            _logger.warning("Payment registration for collection %s failed (attempt %s), retrying at %s: %s",
+                            self.collection_id.display_name, attempts, vals['next_attempt'], error)
+        self.write(vals)
+
+    @api.model
+    def _get_queue_stats(self):
+        """Return queue depth, failed job count and the age of the oldest pending job in minutes"""
+        self.flush_model()
+        self.env.cr.execute("""
+            SELECT COUNT(*) FILTER (WHERE state = 'pending'),
+                   COUNT(*) FILTER (WHERE state = 'failed'),
+                   EXTRACT(EPOCH FROM (now() AT TIME ZONE 'UTC') - MIN(create_date) FILTER (WHERE state = 'pending')) / 60
+              FROM property_payment_job
+        """)
+        depth, failed, lag = self.env.cr.fetchone()
+        return {'depth': depth, 'failed': failed, 'lag_minutes': int(lag or 0)}
+
+    @api.model
+    def cron_process_payment_jobs(self, batch_size=50, time_limit=240):
+        """Drain due jobs in committed batches; concurrent workers skip each other's rows"""
+        auto_commit = not self.env.registry.in_test_mode()
+        started = time.monotonic()
+        processed = 0
+        while time.monotonic() - started < time_limit:
+            self.env.cr.execute("""
+                SELECT id FROM property_payment_job
+                 WHERE state = 'pending'
+                   AND next_attempt <= now() AT TIME ZONE 'UTC'
+              ORDER BY next_attempt, id
+                 LIMIT %s
+                   FOR UPDATE SKIP LOCKED
+            """, (batch_size,))
+            job_ids = [row[0] for row in self.env.cr.fetchall()]
+            if not job_ids:
+                break
+            self.browse(job_ids)._run()
+            processed += len(job_ids)
+            if auto_commit:
+                self.env.cr.commit()
+            else:
+                break
+        
+        stats = self._get_queue_stats()
+        _logger.info("Payment queue: processed %s jobs; %s pending (oldest %s min), %s failed",
+                     processed, stats['depth'], stats['lag_minutes'], stats['failed'])
+        return processed
+
+    def action_retry(self):
+        """Put failed jobs back in the queue for an immediate attempt"""
+        self.filtered(lambda j: j.state == 'failed').write({
+            'state': 'pending',
+            'attempts': 0,
+            'next_attempt': fields.Datetime.now(),
+        })
+        return True
+
+    def action_run_now(self):
+        self.filtered(lambda j: j.state == 'pending')._run()
+        return True
+
+    @api.model
+    def action_show_queue_stats(self):
+        stats = self._get_queue_stats()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Payment Queue'),
+                'message': _('%(depth)s pending, oldest waiting %(lag_minutes)s min, %(failed)s failed', **stats),
+                'type': 'warning' if stats['failed'] else 'info',
+            }
+        }
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+from odoo import models, fields, api, tools, _
+
+# Journal type used when a payment method has no explicit mapping
+DEFAULT_JOURNAL_TYPES = {
+    'cash': 'cash',
+    'bank_transfer': 'bank',
+    'cheque': 'bank',
+    'online': 'bank',
+    'card': 'bank',
+}
+
+
+class PropertyPaymentJournalMap(models.Model):
+    _name = 'property.payment.journal.map'
+    _description = 'Collection Payment Journal'
+    _order = 'company_id, payment_method'
+    _rec_name = 'payment_method'
+
+    company_id = fields.Many2one('res.company', string='Company', required=True,
+                                 default=lambda self: self.env.company)
+    payment_method = fields.Selection(
+        selection=lambda self: self.env['property.collection']._fields['payment_method'].selection,
+        string='Payment Method', required=True)
+    journal_id = fields.Many2one('account.journal', string='Journal', required=True, ondelete='cascade',
+                                 domain="[('type', 'in', ['bank', 'cash']), ('company_id', '=', company_id)]")
+
+    _sql_constraints = [
+        ('company_method_unique', 'unique(company_id, payment_method)',
+         'Each payment method can only be mapped to one journal per company.'),
+    ]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    def write(self, vals):
+        result = super().write(vals)
+        self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self.env.registry.clear_cache()
+        return result
+
+    @api.model
+    @tools.ormcache('company_id', 'payment_method')
+    def _get_journal_id(self, company_id, payment_method):
+        """Journal id for a payment method in a company, cached per (company, method)
+
+        Uses the configured mapping, falling back to the first cash or bank
+        journal of the company. Returns False when none is found.
+        """
+        mapping = self.sudo().search([
+            ('company_id', '=', company_id),
+            ('payment_method', '=', payment_method),
+        ], limit=1)
+        if mapping and mapping.journal_id.active:
+            return mapping.journal_id.id
+        journal = self.env['account.journal'].sudo().search([
+            ('type', '=', DEFAULT_JOURNAL_TYPES.get(payment_method, 'cash')),
+            ('company_id', '=', company_id),
+        ], limit=1)
+        return journal.id or False
+
+    @api.model
+    def _get_journal(self, payment_method, company=None):
+        company = company or self.env.company
+        return self.env['account.journal'].browse(self._get_journal_id(company.id, payment_method))
+
+
+class AccountJournal(models.Model):
+    _inherit = 'account.journal'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        journals = super().create(vals_list)
+        if any(journal.type in ('bank', 'cash') for journal in journals):
+            self.env.registry.clear_cache()
+        return journals
+
+    def write(self, vals):
+        result = super().write(vals)
+        # Cached payment journals depend on the type, company and archiving of journals
+        if {'type', 'company_id', 'active'} & set(vals):
+            self.env.registry.clear_cache()
+        return result
+
+    def unlink(self):
+        result = super().unlink()
+        self.env.registry.clear_cache()
+        return result
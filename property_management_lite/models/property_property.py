@@ -215,11 +215,9 @@ class PropertyProperty(models.Model):
                 tenant._compute_agreement_stats()
                 tenant._compute_payment_stats()
             
-            # Recalculate Agreement computed fields
-            agreements = self.env['property.agreement'].search([])
-            _logger.info(f"Recalculating computed fields for {len(agreements)} agreements...")
-            for agreement in agreements:
-                agreement._compute_payment_stats()
+            # Repair the stored agreement and room collection aggregates
+            _logger.info("Repairing agreement and room collection aggregates...")
+            self.env['property.collection']._rebuild_collection_stats()
             
             _logger.info("Successfully completed recalculation of all computed fields!")
             
@@ -130,8 +130,10 @@ class PropertyRoom(models.Model):
     active = fields.Boolean('Active', default=True)
     
     # Financial Tracking
-    total_collected = fields.Monetary('Total Collected', compute='_compute_financial_stats', currency_field='currency_id')
-    last_collection_date = fields.Date('Last Collection', compute='_compute_financial_stats')
+    # Stored without collection dependencies: computed once on creation (and on install),
+    # then kept up to date by property.collection._apply_collection_stat_deltas()
+    total_collected = fields.Monetary('Total Collected', compute='_compute_collection_stats', store=True, currency_field='currency_id')
+    last_collection_date = fields.Date('Last Collection', compute='_compute_collection_stats', store=True)
     pending_amount = fields.Monetary('Pending Amount', compute='_compute_financial_stats', currency_field='currency_id')
     
     # Security deposit and outstanding dues for current tenant
@@ -200,12 +202,13 @@ class PropertyRoom(models.Model):
             else:
                 record.days_vacant = 0
     
+    def _compute_collection_stats(self):
+        stats = self.env['property.collection']._get_collection_stats('room_id', self._origin.ids)
+        for record in self:
+            record.total_collected, record.last_collection_date = stats.get(record._origin.id, (0.0, False))
+    
     def _compute_financial_stats(self):
         for record in self:
-            collections = self.env['property.collection'].search([('room_id', '=', record.id), ('active', '=', True)])
-            record.total_collected = sum(collections.mapped('amount_collected'))
-            record.last_collection_date = max(collections.mapped('date')) if collections else False
-            
             # Calculate pending amount based on current agreement
             if record.current_agreement_id and record.status == 'occupied':
                 # This would need more complex logic based on payment schedule
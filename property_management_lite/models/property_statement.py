@@ -18,7 +18,35 @@
 #
 ################################################################################
 from odoo import models, fields, api
+from odoo.tools import float_compare
+from odoo.tools.sql import create_index
+from collections import defaultdict
 from datetime import datetime, timedelta
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# ir.config_parameter holding the last tenant id rebuilt by an interrupted run
+REBUILD_CHECKPOINT_PARAM = 'property_management_lite.balance_rebuild_last_tenant_id'
+
+# Fields that move a statement entry within its tenant's running balance
+BALANCE_FIELDS = {'tenant_id', 'transaction_date', 'debit_amount', 'credit_amount'}
+
+# Fields deciding how much an entry adds to its tenant's stored totals
+TOTAL_FIELDS = {'tenant_id', 'debit_amount', 'credit_amount', 'agreement_id', 'period_key'}
+
+# Stored statement totals on property.tenant
+TENANT_TOTAL_FIELDS = ['total_debits', 'total_credits', 'current_balance']
+
+# period_key of the balance row standing in for a tenant's archived entries
+CARRY_FORWARD_KEY = 'carry'
+
+# Fields kept in line with the agreement schedule by _sync_agreement_schedules()
+SCHEDULE_SYNC_FIELDS = [
+    'tenant_id', 'transaction_date', 'reference', 'description',
+    'debit_amount', 'credit_amount', 'room_id',
+]
 
 
 class PropertyStatement(models.Model):
@@ -42,40 +70,292 @@ class PropertyStatement(models.Model):
     ], string='Transaction Type', required=True)
     debit_amount = fields.Monetary('Debit', currency_field='currency_id', default=0.0)
     credit_amount = fields.Monetary('Credit', currency_field='currency_id', default=0.0)
-    running_balance = fields.Float(string='Running Balance', digits=(16, 2), compute='_compute_running_balance', store=True)
+    running_balance = fields.Float(string='Running Balance', digits=(16, 2), readonly=True, copy=False,
+                                   help="Tenant balance after this entry, in (transaction_date, id) order")
     
     room_id = fields.Many2one('property.room', string='Room')
     agreement_id = fields.Many2one('property.agreement', string='Agreement', ondelete='cascade')
     collection_id = fields.Many2one('property.collection', string='Collection')
+    period_key = fields.Char(string='Schedule Period', readonly=True, copy=False,
+                             help="Rent month (YYYYMM) or 'deposit' for entries generated from the agreement schedule")
     
     currency_id = fields.Many2one('res.currency', string='Currency', 
                                   default=lambda self: self.env.company.currency_id)
-    
-    @api.depends('tenant_id', 'transaction_date', 'debit_amount', 'credit_amount')
-    def _compute_running_balance(self):
-        # Process each statement individually to ensure correct chronological balance
+
+    _sql_constraints = [
+        ('unique_agreement_transaction', 'unique(agreement_id, transaction_type, period_key)',
+         'Only one schedule entry per agreement, transaction type and period is allowed.'),
+    ]
+
+    def init(self):
+        # Key schedule entries generated before period_key existed; duplicates
+        # are left unkeyed so the next schedule sync removes them
+        self.env.cr.execute("""
+            UPDATE property_statement s
+               SET period_key = k.period_key
+              FROM (
+                    SELECT id, period_key,
+                           ROW_NUMBER() OVER (PARTITION BY agreement_id, transaction_type, period_key ORDER BY id) AS rn
+                      FROM (
+                            SELECT id, agreement_id, transaction_type,
+                                   CASE WHEN transaction_type = 'deposit' THEN 'deposit'
+                                        ELSE to_char(transaction_date, 'YYYYMM') END AS period_key
+                              FROM property_statement
+                             WHERE period_key IS NULL
+                               AND collection_id IS NULL
+                               AND agreement_id IS NOT NULL
+                               AND (reference = 'AGR/' || agreement_id || '/DEPOSIT'
+                                    OR reference LIKE 'AGR/' || agreement_id || '/RENT/%')
+                           ) candidates
+                   ) k
+             WHERE s.id = k.id
+               AND k.rn = 1
+               AND NOT EXISTS (
+                    SELECT 1 FROM property_statement e
+                     WHERE e.agreement_id = s.agreement_id
+                       AND e.transaction_type = s.transaction_type
+                       AND e.period_key = k.period_key
+               )
+        """)
+        # Per-tenant ledger walks: balances, checkpoints and exports all read in this order
+        create_index(self.env.cr, 'property_statement_tenant_date_id_idx', self._table,
+                     ['tenant_id', 'transaction_date', 'id'])
+        # Portfolio-wide period totals (dashboard)
+        create_index(self.env.cr, 'property_statement_date_idx', self._table, ['transaction_date'])
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        # Pending first computations of tenant totals must not see the new rows
+        self.env['property.tenant'].flush_model(TENANT_TOTAL_FIELDS)
+        statements = super().create(vals_list)
+        self._apply_tenant_total_deltas(statements._get_total_contributions())
+        self._update_running_balances(statements._get_balance_bounds())
+        return statements
+
+    def write(self, vals):
+        track_balances = BALANCE_FIELDS.intersection(vals)
+        track_totals = TOTAL_FIELDS.intersection(vals)
+        if not (track_balances or track_totals):
+            return super().write(vals)
+        # Rows may move to another tenant or date, so the suffix starts at the
+        # earliest of the old and new positions
+        bounds = self._get_balance_bounds() if track_balances else None
+        before = self._get_total_contributions() if track_totals else None
+        result = super().write(vals)
+        if track_totals:
+            self._apply_tenant_total_deltas(self._get_total_contributions(), before)
+        if track_balances:
+            for tenant_id, date_from in self._get_balance_bounds().items():
+                if tenant_id not in bounds or date_from < bounds[tenant_id]:
+                    bounds[tenant_id] = date_from
+            self._update_running_balances(bounds)
+        return result
+
+    def unlink(self):
+        bounds = self._get_balance_bounds()
+        before = self._get_total_contributions()
+        result = super().unlink()
+        self._apply_tenant_total_deltas({}, before)
+        self._update_running_balances(bounds)
+        return result
+
+    def _get_balance_bounds(self):
+        """Return {tenant_id: earliest transaction date} for these entries"""
+        bounds = {}
         for record in self:
-            if not record.tenant_id:
-                record.running_balance = 0.0
+            tenant_id = record.tenant_id.id
+            if not tenant_id:
                 continue
+            if tenant_id not in bounds or record.transaction_date < bounds[tenant_id]:
+                bounds[tenant_id] = record.transaction_date
+        return bounds
+
+    def _get_total_contributions(self):
+        """Return {tenant_id: [debit, credit]} these entries add to their tenants' totals
+
+        Entries of agreements that are no longer active, and carry-forward
+        rows of archived ones, do not count, matching outstanding dues.
+        """
+        self.env['property.tenant'].flush_model(TENANT_TOTAL_FIELDS)
+        totals = defaultdict(lambda: [0.0, 0.0])
+        for record in self:
+            if not record.tenant_id or record.period_key == CARRY_FORWARD_KEY:
+                continue
+            if record.agreement_id and record.agreement_id.state != 'active':
+                continue
+            totals[record.tenant_id.id][0] += record.debit_amount or 0.0
+            totals[record.tenant_id.id][1] += record.credit_amount or 0.0
+        return totals
+
+    @api.model
+    def _apply_tenant_total_deltas(self, added, removed=None):
+        """Shift the stored tenant totals by ``added`` minus ``removed`` in one UPDATE"""
+        deltas = defaultdict(lambda: [0.0, 0.0])
+        for sign, contributions in ((1, added), (-1, removed or {})):
+            for tenant_id, (debit, credit) in contributions.items():
+                deltas[tenant_id][0] += sign * debit
+                deltas[tenant_id][1] += sign * credit
+        deltas = {tenant_id: delta for tenant_id, delta in deltas.items() if delta[0] or delta[1]}
+        if not deltas:
+            return
+        tenant_ids = list(deltas)
+        self.env['property.tenant'].flush_model(TENANT_TOTAL_FIELDS)
+        # Relative updates, so concurrent deltas on the same tenant serialise on the row lock
+        self.env.cr.execute("""
+            UPDATE property_tenant t
+               SET total_debits = COALESCE(t.total_debits, 0) + d.debit,
+                   total_credits = COALESCE(t.total_credits, 0) + d.credit,
+                   current_balance = COALESCE(t.current_balance, 0) + d.debit - d.credit
+              FROM unnest(%s::int[], %s::float8[], %s::float8[]) AS d(tenant_id, debit, credit)
+             WHERE t.id = d.tenant_id
+        """, (tenant_ids, [deltas[t][0] for t in tenant_ids], [deltas[t][1] for t in tenant_ids]))
+        self.env['property.tenant'].invalidate_model(TENANT_TOTAL_FIELDS)
+
+    def _compute_running_balance(self):
+        """Recompute running balances from the earliest of these entries onwards"""
+        self._update_running_balances(self._get_balance_bounds())
+
+    @api.model
+    def _update_running_balances(self, bounds):
+        """Rewrite running balances and monthly checkpoints from a date onwards
+
+        ``bounds`` maps tenant ids to the first transaction date that may have
+        changed (``None`` rebuilds the tenant's whole history).
+        """
+        if not bounds:
+            return
+        self.flush_model(['tenant_id', 'transaction_date', 'debit_amount', 'credit_amount'])
+        tenant_ids = list(bounds)
+        self.env.cr.execute("""
+            WITH bounds AS (
+                SELECT * FROM unnest(%s::int[], %s::date[]) AS b(tenant_id, date_from)
+            ),
+            opening AS (
+                -- Nearest monthly checkpoint plus the entries of the month before date_from
+                SELECT b.tenant_id, b.date_from,
+                       COALESCE((
+                           SELECT c.closing_balance
+                             FROM property_statement_checkpoint c
+                            WHERE c.tenant_id = b.tenant_id
+                              AND c.month < date_trunc('month', b.date_from)::date
+                         ORDER BY c.month DESC
+                            LIMIT 1
+                       ), 0) + COALESCE((
+                           SELECT SUM(COALESCE(s.debit_amount, 0) - COALESCE(s.credit_amount, 0))
+                             FROM property_statement s
+                            WHERE s.tenant_id = b.tenant_id
+                              AND s.transaction_date >= date_trunc('month', b.date_from)::date
+                              AND s.transaction_date < b.date_from
+                       ), 0) AS balance
+                  FROM bounds b
+            ),
+            suffix AS (
+                SELECT s.id,
+                       o.balance + SUM(COALESCE(s.debit_amount, 0) - COALESCE(s.credit_amount, 0)) OVER (
+                           PARTITION BY s.tenant_id
+                           ORDER BY s.transaction_date, s.id
+                           ROWS UNBOUNDED PRECEDING
+                       ) AS balance
+                  FROM property_statement s
+                  JOIN opening o
+                    ON o.tenant_id = s.tenant_id
+                   AND (o.date_from IS NULL OR s.transaction_date >= o.date_from)
+            )
+            UPDATE property_statement s
+               SET running_balance = suffix.balance
+              FROM suffix
+             WHERE s.id = suffix.id
+               AND s.running_balance IS DISTINCT FROM suffix.balance
+        """, (tenant_ids, [bounds[tenant_id] for tenant_id in tenant_ids]))
+        self.invalidate_model(['running_balance'])
+        self.env['property.statement.checkpoint']._rebuild(bounds)
+
+    @api.model
+    def get_tenant_balances(self, tenant_ids, as_of=None):
+        """Return {tenant_id: {'balance', 'debit', 'credit'}} as of a date, in one query
+
+        Whole months come from the checkpoints; only the entries of the
+        ``as_of`` month itself are read from the statement table.
+        """
+        tenant_ids = list(tenant_ids)
+        if not tenant_ids:
+            return {}
+        as_of = fields.Date.to_date(as_of) or fields.Date.context_today(self)
+        self.flush_model(['tenant_id', 'transaction_date', 'debit_amount', 'credit_amount'])
+        self.env.cr.execute("""
+            WITH months AS (
+                SELECT tenant_id, SUM(debit_amount) AS debit, SUM(credit_amount) AS credit
+                  FROM property_statement_checkpoint
+                 WHERE tenant_id = ANY(%(tenant_ids)s)
+                   AND month < %(month_start)s
+              GROUP BY tenant_id
+            ),
+            tail AS (
+                SELECT tenant_id,
+                       SUM(COALESCE(debit_amount, 0)) AS debit,
+                       SUM(COALESCE(credit_amount, 0)) AS credit
+                  FROM property_statement
+                 WHERE tenant_id = ANY(%(tenant_ids)s)
+                   AND transaction_date >= %(month_start)s
+                   AND transaction_date <= %(as_of)s
+              GROUP BY tenant_id
+            )
+            SELECT t.tenant_id,
+                   COALESCE(m.debit, 0) + COALESCE(tl.debit, 0),
+                   COALESCE(m.credit, 0) + COALESCE(tl.credit, 0)
+              FROM unnest(%(tenant_ids)s::int[]) AS t(tenant_id)
+         LEFT JOIN months m ON m.tenant_id = t.tenant_id
+         LEFT JOIN tail tl ON tl.tenant_id = t.tenant_id
+        """, {'tenant_ids': tenant_ids, 'month_start': as_of.replace(day=1), 'as_of': as_of})
+        return {
+            tenant_id: {'balance': debit - credit, 'debit': debit, 'credit': credit}
+            for tenant_id, debit, credit in self.env.cr.fetchall()
+        }
+
+    @api.model
+    def cron_recalculate_running_balances(self, chunk_size=500):
+        """Rebuild all running balances tenant by tenant in committed, resumable chunks"""
+        params = self.env['ir.config_parameter'].sudo()
+        last_tenant_id = int(params.get_param(REBUILD_CHECKPOINT_PARAM, 0) or 0)
+        if last_tenant_id:
+            _logger.info("Resuming running balance rebuild after tenant %s", last_tenant_id)
+        auto_commit = not self.env.registry.in_test_mode()
+        
+        started = time.monotonic()
+        total_rows = 0
+        total_tenants = 0
+        while True:
+            self.env.cr.execute("""
+                SELECT tenant_id, COUNT(*)
+                  FROM property_statement
+                 WHERE tenant_id > %s
+              GROUP BY tenant_id
+              ORDER BY tenant_id
+                 LIMIT %s
+            """, (last_tenant_id, chunk_size))
+            chunk = self.env.cr.fetchall()
+            if not chunk:
+                break
             
-            # Search ALL statements for this tenant up to and including this one
-            # Order by date first, then by ID for same-date transactions
-            previous_statements = self.search([
-                ('tenant_id', '=', record.tenant_id.id),
-                '|',
-                ('transaction_date', '<', record.transaction_date),
-                '&',
-                ('transaction_date', '=', record.transaction_date),
-                ('id', '<=', record.id)
-            ], order='transaction_date asc, id asc')
-            
-            # Calculate cumulative balance
-            balance = 0.0
-            for stmt in previous_statements:
-                balance += stmt.debit_amount - stmt.credit_amount
+            self._update_running_balances(dict.fromkeys(tenant_id for tenant_id, _count in chunk))
+            self.env['property.tenant']._rebuild_statement_totals([tenant_id for tenant_id, _count in chunk])
+            last_tenant_id = chunk[-1][0]
+            total_rows += sum(count for _tenant_id, count in chunk)
+            total_tenants += len(chunk)
             
-            record.running_balance = balance
+            # Record progress together with the chunk so a killed run resumes here
+            params.set_param(REBUILD_CHECKPOINT_PARAM, last_tenant_id)
+            if auto_commit:
+                self.env.cr.commit()
+            elapsed = time.monotonic() - started
+            _logger.info("Running balances rebuilt for %s tenants / %s rows (%.0f rows/s), last tenant %s",
+                         total_tenants, total_rows, total_rows / elapsed if elapsed else total_rows, last_tenant_id)
+        
+        params.set_param(REBUILD_CHECKPOINT_PARAM, False)
+        elapsed = time.monotonic() - started
+        _logger.info("Running balance rebuild finished: %s tenants, %s rows in %.1fs (%.0f rows/s)",
+                     total_tenants, total_rows, elapsed, total_rows / elapsed if elapsed else total_rows)
+        return True
 
     def name_get(self):
         result = []
@@ -87,6 +367,11 @@ class PropertyStatement(models.Model):
     @api.model
     def create_from_collection(self, collection):
         """Create statement entry from collection record"""
+        return self.create(self._prepare_collection_statement_vals(collection))
+
+    @api.model
+    def _prepare_collection_statement_vals(self, collection):
+        """Build the credit entry recording a collection"""
         description = f"Payment for {collection.collection_type}"
         if collection.room_id:
             description += f" - Room {collection.room_id.name}"
@@ -112,16 +397,21 @@ class PropertyStatement(models.Model):
             'collection_id': collection.id,
         }
         
-        return self.create(vals)
+        return vals
 
     @api.model
     def create_from_agreement(self, agreement):
         """Create statement entries from agreement charges"""
-        statements = self.env['property.statement']
+        return self.create(self._prepare_agreement_statement_vals(agreement))
+
+    @api.model
+    def _prepare_agreement_statement_vals(self, agreement):
+        """Build the deposit and monthly rent schedule of an agreement"""
+        vals_list = []
         
         # Security deposit entry
         if agreement.deposit_amount > 0:
-            vals = {
+            vals_list.append({
                 'tenant_id': agreement.tenant_id.id,
                 'transaction_date': agreement.start_date,
                 'reference': f"AGR/{agreement.id}/DEPOSIT",
@@ -131,8 +421,8 @@ class PropertyStatement(models.Model):
                 'credit_amount': 0.0,
                 'room_id': agreement.room_id.id,
                 'agreement_id': agreement.id,
-            }
-            statements += self.create(vals)
+                'period_key': 'deposit',
+            })
         
         # Monthly rent entries - only create up to today (never future months)
         today = fields.Date.today()
@@ -143,7 +433,7 @@ class PropertyStatement(models.Model):
         
         current_date = agreement.start_date
         while current_date <= end_limit:
-            vals = {
+            vals_list.append({
                 'tenant_id': agreement.tenant_id.id,
                 'transaction_date': current_date,
                 'reference': f"AGR/{agreement.id}/RENT/{current_date.strftime('%Y%m')}",
@@ -153,8 +443,8 @@ class PropertyStatement(models.Model):
                 'credit_amount': 0.0,
                 'room_id': agreement.room_id.id,
                 'agreement_id': agreement.id,
-            }
-            statements += self.create(vals)
+                'period_key': current_date.strftime('%Y%m'),
+            })
             
             # Move to next month
             if current_date.month == 12:
@@ -162,7 +452,66 @@ class PropertyStatement(models.Model):
             else:
                 current_date = current_date.replace(month=current_date.month + 1)
         
-        return statements
+        return vals_list
+
+
+    @api.model
+    def _sync_agreement_schedules(self, agreements=None):
+        """Insert, update and delete generated rent/deposit entries to match agreement schedules
+
+        Without ``agreements`` every active agreement is synced and generated
+        entries of any other agreement are removed. Returns a summary dict.
+        """
+        full_sync = agreements is None
+        if full_sync:
+            agreements = self.env['property.agreement'].search([('state', '=', 'active')])
+        
+        expected = {}
+        for agreement in agreements:
+            for vals in self._prepare_agreement_statement_vals(agreement):
+                expected[(vals['agreement_id'], vals['transaction_type'], vals['period_key'])] = vals
+        
+        # Generated entries only - collection entries are never touched
+        domain = [('transaction_type', 'in', ['rent', 'deposit']), ('collection_id', '=', False)]
+        if not full_sync:
+            domain.append(('agreement_id', 'in', agreements.ids))
+        existing = self.search_fetch(domain, SCHEDULE_SYNC_FIELDS + ['agreement_id', 'transaction_type', 'period_key'])
+        
+        to_delete = self.browse()
+        updates = defaultdict(list)
+        for statement in existing:
+            key = (statement.agreement_id.id, statement.transaction_type, statement.period_key)
+            vals = expected.pop(key, None) if statement.period_key else None
+            if vals is None:
+                to_delete |= statement
+                continue
+            changes = {}
+            for field_name in SCHEDULE_SYNC_FIELDS:
+                current, wanted = statement[field_name], vals[field_name]
+                if isinstance(current, models.BaseModel):
+                    current = current.id
+                if isinstance(wanted, float):
+                    if float_compare(current or 0.0, wanted, precision_digits=2):
+                        changes[field_name] = wanted
+                elif (current or False) != (wanted or False):
+                    changes[field_name] = wanted
+            if changes:
+                updates[tuple(sorted(changes.items()))].append(statement.id)
+        
+        # Bulk operations: one unlink, one write per distinct change set, one create
+        to_delete.unlink()
+        for changes, statement_ids in updates.items():
+            self.browse(statement_ids).write(dict(changes))
+        self.create(list(expected.values()))
+        
+        summary = {
+            'created': len(expected),
+            'updated': sum(len(statement_ids) for statement_ids in updates.values()),
+            'deleted': len(to_delete),
+        }
+        _logger.info("Statement schedule sync for %s agreements: %s inserted, %s updated, %s deleted",
+                     len(agreements), summary['created'], summary['updated'], summary['deleted'])
+        return summary
 
 
 class PropertyTenant(models.Model):
@@ -170,27 +519,69 @@ class PropertyTenant(models.Model):
 
     statement_ids = fields.One2many('property.statement', 'tenant_id', string='Statement of Account')
     statement_count = fields.Integer(string='Statement Entries', compute='_compute_statement_count')
-    total_debits = fields.Float(string='Total Debits', compute='_compute_statement_totals')
-    total_credits = fields.Float(string='Total Credits', compute='_compute_statement_totals')
-    current_balance = fields.Float(string='Current Balance', compute='_compute_statement_totals')
+    # Stored without dependencies: computed once on creation (and on install),
+    # then kept up to date by property.statement._apply_tenant_total_deltas()
+    total_debits = fields.Float(string='Total Debits', compute='_compute_statement_totals', store=True)
+    total_credits = fields.Float(string='Total Credits', compute='_compute_statement_totals', store=True)
+    current_balance = fields.Float(string='Current Balance', compute='_compute_statement_totals', store=True)
 
     @api.depends('statement_ids')
     def _compute_statement_count(self):
         for tenant in self:
             tenant.statement_count = len(tenant.statement_ids)
 
-    @api.depends('statement_ids.debit_amount', 'statement_ids.credit_amount', 'statement_ids.agreement_id.state')
+    @api.model
+    def _get_statement_totals(self, tenant_ids):
+        """Return {tenant_id: (debit, credit)} over the entries that count towards tenant totals"""
+        return {
+            tenant.id: (debit, credit)
+            for tenant, debit, credit in self.env['property.statement']._read_group(
+                [('tenant_id', 'in', tenant_ids), ('period_key', '!=', CARRY_FORWARD_KEY),
+                 '|', ('agreement_id', '=', False), ('agreement_id.state', '=', 'active')],
+                ['tenant_id'], ['debit_amount:sum', 'credit_amount:sum'])
+        }
+
     def _compute_statement_totals(self):
+        totals = self._get_statement_totals(self._origin.ids)
         for tenant in self:
-            # Only count statement entries from ACTIVE agreements
-            # Exclude terminated agreements to match outstanding dues logic
-            active_statements = tenant.statement_ids.filtered(
-                lambda s: not s.agreement_id or s.agreement_id.state == 'active'
-            )
-            
-            tenant.total_debits = sum(active_statements.mapped('debit_amount'))
-            tenant.total_credits = sum(active_statements.mapped('credit_amount'))
-            tenant.current_balance = tenant.total_debits - tenant.total_credits
+            debit, credit = totals.get(tenant._origin.id, (0.0, 0.0))
+            tenant.total_debits = debit
+            tenant.total_credits = credit
+            tenant.current_balance = debit - credit
+
+    @api.model
+    def _rebuild_statement_totals(self, tenant_ids=None, chunk_size=5000):
+        """Repair stored statement totals from a grouped read of the entries
+
+        Without ``tenant_ids`` every tenant is rebuilt. Returns the number of
+        tenants whose stored totals had drifted.
+        """
+        if tenant_ids is None:
+            tenant_ids = self.with_context(active_test=False).search([], order='id').ids
+        self.env['property.statement'].flush_model()
+        self.flush_model(TENANT_TOTAL_FIELDS)
+        fixed = 0
+        for offset in range(0, len(tenant_ids), chunk_size):
+            chunk = tenant_ids[offset:offset + chunk_size]
+            totals = self._get_statement_totals(chunk)
+            debits = [totals.get(tenant_id, (0.0, 0.0))[0] for tenant_id in chunk]
+            credits = [totals.get(tenant_id, (0.0, 0.0))[1] for tenant_id in chunk]
+            self.env.cr.execute("""
+                UPDATE property_tenant t
+                   SET total_debits = d.debit,
+                       total_credits = d.credit,
+                       current_balance = d.debit - d.credit
+                  FROM unnest(%s::int[], %s::float8[], %s::float8[]) AS d(tenant_id, debit, credit)
+                 WHERE t.id = d.tenant_id
+                   AND (t.total_debits IS DISTINCT FROM d.debit
+                        OR t.total_credits IS DISTINCT FROM d.credit
+                        OR t.current_balance IS DISTINCT FROM d.debit - d.credit)
+            """, (chunk, debits, credits))
+            fixed += self.env.cr.rowcount
+        self.invalidate_model(TENANT_TOTAL_FIELDS)
+        if fixed:
+            _logger.info("Repaired statement totals of %s tenants", fixed)
+        return fixed
 
     def action_view_statement(self):
         """Action to view tenant's statement of account"""
@@ -226,20 +617,36 @@ class PropertyCollection(models.Model):
     _inherit = 'property.collection'
 
     statement_id = fields.Many2one('property.statement', string='Statement Entry', readonly=True)
+    statement_archived = fields.Boolean(string='Statement Archived', readonly=True, copy=False,
+                                        help="The statement entry of this collection was moved to the archive")
 
     @api.model_create_multi
     def create(self, vals_list):
         collections = super().create(vals_list)
-        for collection in collections:
-            if collection.tenant_id and collection.status in ['collected', 'verified', 'deposited']:
-                statement = self.env['property.statement'].create_from_collection(collection)
-                collection.statement_id = statement.id
+        to_record = collections.filtered(
+            lambda c: c.tenant_id and c.status in ['collected', 'verified', 'deposited'] and not c.statement_id)
+        if to_record:
+            # One insert for the batch; running balances are rebuilt once per tenant
+            Statement = self.env['property.statement']
+            statements = Statement.create([Statement._prepare_collection_statement_vals(c) for c in to_record])
+            to_record._link_statements(statements)
         return collections
 
+    def _link_statements(self, statements):
+        """Point each collection at its statement entry (same order) in one UPDATE"""
+        self.flush_recordset(['statement_id'])
+        self.env.cr.execute("""
+            UPDATE property_collection c
+               SET statement_id = l.statement_id
+              FROM unnest(%s::int[], %s::int[]) AS l(collection_id, statement_id)
+             WHERE c.id = l.collection_id
+        """, (self.ids, statements.ids))
+        self.invalidate_recordset(['statement_id'])
+
     def write(self, vals):
         result = super().write(vals)
         for collection in self:
-            if 'status' in vals and vals['status'] in ['collected', 'verified', 'deposited'] and collection.tenant_id and not collection.statement_id:
+            if 'status' in vals and vals['status'] in ['collected', 'verified', 'deposited'] and collection.tenant_id and not collection.statement_id and not collection.statement_archived:
                 try:
                     # Use savepoint to isolate constraint violations
                     with self.env.cr.savepoint():
@@ -260,6 +667,7 @@ class PropertyCollection(models.Model):
         collections = self.search([
             ('status', 'in', ['collected', 'verified', 'deposited']),
             ('statement_id', '=', False),
+            ('statement_archived', '=', False),
             ('tenant_id', '!=', False)
         ])
         
@@ -292,25 +700,7 @@ class PropertyCollection(models.Model):
     @api.model
     def cron_recalculate_running_balances(self):
         """Recalculate running balances for all statement entries"""
-        import logging
-        _logger = logging.getLogger(__name__)
-        
-        # Get all statement entries
-        all_statements = self.search([], order='transaction_date asc, id asc')
-        
-        if not all_statements:
-            _logger.info("No statement entries found to recalculate")
-            return True
-        
-        _logger.info(f"Recalculating running balances for {len(all_statements)} statements...")
-        
-        # Trigger recomputation for all statements
-        # This will use the _compute_running_balance method
-        all_statements._compute_running_balance()
-        
-        _logger.info(f"Running balances recalculated successfully")
-        
-        return True
+        return self.env['property.statement'].cron_recalculate_running_balances()
 
 
 class PropertyAgreement(models.Model):
@@ -343,8 +733,17 @@ class PropertyAgreement(models.Model):
     
     def write(self, vals):
         """Auto-generate statement entries when agreement becomes active"""
+        was_active = None
+        if 'state' in vals:
+            self.env['property.tenant'].flush_model(TENANT_TOTAL_FIELDS)
+            was_active = set(self.filtered(lambda a: a.state == 'active').ids)
         result = super().write(vals)
         
+        # Entries only count towards tenant totals while their agreement is active
+        if was_active is not None:
+            is_active = set(self.filtered(lambda a: a.state == 'active').ids)
+            self._shift_statement_totals(is_active - was_active, was_active - is_active)
+        
         # If state changes to active and no statement entries exist, generate them
         if 'state' in vals and vals['state'] == 'active':
             for agreement in self:
@@ -353,6 +752,21 @@ class PropertyAgreement(models.Model):
         
         return result
     
+    @api.model
+    def _shift_statement_totals(self, activated_ids, deactivated_ids):
+        """Add or remove the entries of agreements that changed active state from tenant totals"""
+        if not activated_ids and not deactivated_ids:
+            return
+        added, removed = {}, {}
+        for tenant, agreement, debit, credit in self.env['property.statement']._read_group(
+                [('agreement_id', 'in', list(activated_ids | deactivated_ids))],
+                ['tenant_id', 'agreement_id'], ['debit_amount:sum', 'credit_amount:sum']):
+            target = added if agreement.id in activated_ids else removed
+            totals = target.setdefault(tenant.id, [0.0, 0.0])
+            totals[0] += debit
+            totals[1] += credit
+        self.env['property.statement']._apply_tenant_total_deltas(added, removed)
+    
     @api.model
     def cron_generate_missing_statement_entries(self):
         """Batch generate statement entries for all agreements without them"""
@@ -379,40 +793,12 @@ class PropertyAgreement(models.Model):
         
         return True
     
+    @api.model
+    def cron_sync_statement_entries(self):
+        """Sync generated statement entries of all active agreements with their schedules"""
+        return self.env['property.statement']._sync_agreement_schedules()
+    
     @api.model
     def cron_cleanup_and_regenerate_statement_entries(self):
-        """Clean up and regenerate all statement entries for agreements"""
-        
-        # Delete ALL rent and deposit statement entries
-        # This includes both active ones AND orphaned ones (where agreement was deleted)
-        all_statements = self.env['property.statement'].search([
-            ('transaction_type', 'in', ['rent', 'deposit'])
-            # Removed agreement_id filter to catch orphaned entries too
-        ])
-        
-        deleted_count = len(all_statements)
-        all_statements.unlink()
-        
-        import logging
-        _logger = logging.getLogger(__name__)
-        _logger.info(f"Deleted {deleted_count} existing statement entries (including orphaned ones)")
-        
-        # Find ONLY ACTIVE agreements (not terminated ones)
-        # This prevents duplicates from old terminated agreements
-        agreements = self.search([('state', '=', 'active')])
-        
-        regenerated_count = 0
-        for agreement in agreements:
-            try:
-                self.env['property.statement'].create_from_agreement(agreement)
-                regenerated_count += 1
-            except Exception as e:
-                import logging
-                _logger = logging.getLogger(__name__)
-                _logger.error(f"Failed to regenerate statement for agreement {agreement.id}: {str(e)}")
-        
-        import logging
-        _logger = logging.getLogger(__name__)
-        _logger.info(f"Regenerated statement entries for {regenerated_count} active agreements")
-        
-        return True
\ No newline at end of file
+        """Kept for existing scheduled actions; entries are now synced in place"""
+        return self.cron_sync_statement_entries()
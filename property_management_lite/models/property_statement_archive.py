@@ -0,0 +1,261 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+from odoo import models, fields, api
+from odoo.tools.sql import create_index
+from datetime import timedelta
+import logging
+import time
+
+from .property_agreement import CLOSED_STATES
+from .property_statement import CARRY_FORWARD_KEY
+
+_logger = logging.getLogger(__name__)
+
+# ir.config_parameter: days an agreement stays closed before its entries are archived
+ARCHIVE_DAYS_PARAM = 'property_management_lite.statement_archive_days'
+ARCHIVE_DAYS_DEFAULT = 365
+
+# Columns copied as-is between property_statement and property_statement_archive
+ARCHIVE_COLUMNS = [
+    'tenant_id', 'transaction_date', 'reference', 'description', 'transaction_type',
+    'debit_amount', 'credit_amount', 'room_id', 'agreement_id', 'collection_id',
+    'period_key', 'currency_id',
+]
+
+
+class PropertyStatementArchive(models.Model):
+    _name = 'property.statement.archive'
+    _description = 'Archived Statement Entry'
+    _order = 'transaction_date asc, statement_id asc'
+    _rec_name = 'reference'
+
+    statement_id = fields.Integer(string='Original Entry ID', readonly=True,
+                                  help="Id of the entry in the statement of account, kept for ordering")
+    tenant_id = fields.Many2one('property.tenant', string='Tenant', required=True, ondelete='cascade', readonly=True)
+    transaction_date = fields.Date(string='Transaction Date', required=True, readonly=True)
+    reference = fields.Char(string='Reference', readonly=True)
+    description = fields.Text(string='Description', readonly=True)
+    transaction_type = fields.Selection(
+        selection=lambda self: self.env['property.statement']._fields['transaction_type']._description_selection(self.env),
+        string='Transaction Type', readonly=True)
+    debit_amount = fields.Monetary('Debit', currency_field='currency_id', readonly=True)
+    credit_amount = fields.Monetary('Credit', currency_field='currency_id', readonly=True)
+    room_id = fields.Many2one('property.room', string='Room', readonly=True)
+    agreement_id = fields.Many2one('property.agreement', string='Agreement', ondelete='cascade', readonly=True)
+    collection_id = fields.Many2one('property.collection', string='Collection', readonly=True)
+    period_key = fields.Char(string='Schedule Period', readonly=True)
+    currency_id = fields.Many2one('res.currency', string='Currency', readonly=True)
+    archived_on = fields.Datetime(string='Archived On', readonly=True)
+
+    def init(self):
+        create_index(self.env.cr, 'property_statement_archive_tenant_date_idx', self._table,
+                     ['tenant_id', 'transaction_date', 'statement_id'])
+
+    @api.model
+    def _archive_closed_agreements(self, days=None, batch_size=200):
+        """Move statement entries of long-closed agreements to the archive
+
+        The archived entries of each tenant are replaced by one carry-forward
+        row (no agreement) dated at the earliest archived entry. That keeps the
+        tenant's running balances unchanged only when no other entry sits
+        between the archived ones, so tenants with interleaved live entries
+        are skipped (see _get_interleaved_tenants). Batches are committed as
+        they go. Returns the number of entries archived.
+        """
+        if days is None:
+            days = int(self.env['ir.config_parameter'].sudo().get_param(ARCHIVE_DAYS_PARAM, ARCHIVE_DAYS_DEFAULT))
+        cutoff = fields.Date.today() - timedelta(days=days)
+        agreements = self.env['property.agreement'].with_context(active_test=False).search([
+            ('state', 'in', CLOSED_STATES),
+            ('closed_date', '<=', cutoff),
+            ('statement_ids', '!=', False),
+        ], order='tenant_id, id')
+        
+        start = time.time()
+        archived = 0
+        for offset in range(0, len(agreements), batch_size):
+            archived += self._archive_agreements(agreements[offset:offset + batch_size])
+            if not self.env.registry.in_test_mode():
+                self.env.cr.commit()
+        
+        _logger.info("Archived %s statement entries of %s closed agreements in %.2fs",
+                     archived, len(agreements), time.time() - start)
+        return archived
+
+    def _get_interleaved_tenants(self, agreements):
+        """Tenants whose live entries would be reordered by archiving ``agreements``
+
+        Entries are ordered by (date, id). The carry-forward row replacing the
+        archived entries is dated at the first of them and gets a new (highest)
+        id, so it lands after every entry of that date. A tenant is returned
+        when one of its other entries sorts between the first and the last
+        archived entry, or after the first one on the same date.
+        """
+        self.env.cr.execute("""
+            WITH moving AS (
+                SELECT id, tenant_id, transaction_date
+                  FROM property_statement
+                 WHERE agreement_id = ANY(%(agreement_ids)s)
+            ),
+            first_entry AS (
+                SELECT DISTINCT ON (tenant_id) tenant_id, transaction_date AS lo_date, id AS lo_id
+                  FROM moving
+              ORDER BY tenant_id, transaction_date, id
+            ),
+            last_entry AS (
+                SELECT DISTINCT ON (tenant_id) tenant_id, transaction_date AS hi_date, id AS hi_id
+                  FROM moving
+              ORDER BY tenant_id, transaction_date DESC, id DESC
+            )
+            SELECT DISTINCT s.tenant_id
+              FROM property_statement s
+              JOIN first_entry f ON f.tenant_id = s.tenant_id
+              JOIN last_entry l ON l.tenant_id = s.tenant_id
+             WHERE (s.agreement_id IS NULL OR NOT s.agreement_id = ANY(%(agreement_ids)s))
+               AND (s.transaction_date, s.id) > (f.lo_date, f.lo_id)
+               AND ((s.transaction_date, s.id) < (l.hi_date, l.hi_id) OR s.transaction_date = f.lo_date)
+        """, {'agreement_ids': agreements.ids})
+        return {row[0] for row in self.env.cr.fetchall()}
+
+    def _archive_agreements(self, agreements):
+        """Move the statement entries of ``agreements`` and add a carry-forward row per tenant"""
+        Statement = self.env['property.statement']
+        Statement.flush_model()
+        cr = self.env.cr
+        columns = ', '.join(ARCHIVE_COLUMNS)
+        
+        interleaved = self._get_interleaved_tenants(agreements)
+        if interleaved:
+            _logger.info("Not archiving agreements of %s tenants with interleaved statement entries", len(interleaved))
+            agreements = agreements.filtered(lambda a: a.tenant_id.id not in interleaved)
+            if not agreements:
+                return 0
+        
+        cr.execute(f"""
+            WITH moved AS (
+                DELETE FROM property_statement
+                 WHERE agreement_id = ANY(%s)
+             RETURNING id, {columns}
+            )
+            INSERT INTO property_statement_archive (
+                statement_id, {columns}, archived_on,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT id, {columns}, now() AT TIME ZONE 'UTC',
+                   %s, now() AT TIME ZONE 'UTC', %s, now() AT TIME ZONE 'UTC'
+              FROM moved
+         RETURNING tenant_id, transaction_date, debit_amount, credit_amount, collection_id
+        """, (agreements.ids, self.env.uid, self.env.uid))
+        moved = cr.fetchall()
+        # The DELETE bypassed the ORM, and nulled collection links to the moved rows
+        Statement.invalidate_model()
+        self.env['property.collection'].invalidate_model(['statement_id'])
+        if not moved:
+            return 0
+        
+        carry = {}
+        collection_ids = set()
+        for tenant_id, date, debit, credit, collection_id in moved:
+            entry = carry.setdefault(tenant_id, {'date': date, 'amount': 0.0})
+            entry['date'] = min(entry['date'], date)
+            entry['amount'] += (debit or 0.0) - (credit or 0.0)
+            if collection_id:
+                collection_ids.add(collection_id)
+        
+        # Earlier carry-forward rows stay where they are: moving their amount
+        # to this batch's date would shift the balances in between
+        Statement.create([{
+            'tenant_id': tenant_id,
+            'transaction_date': entry['date'],
+            'reference': 'ARCHIVE/%s' % tenant_id,
+            'description': 'Balance carried forward from archived agreements',
+            'transaction_type': 'outstanding',
+            'debit_amount': max(entry['amount'], 0.0),
+            'credit_amount': max(-entry['amount'], 0.0),
+            'period_key': CARRY_FORWARD_KEY,
+        } for tenant_id, entry in carry.items()])
+        
+        # Collection links were nulled by the delete; keep them from being re-created
+        if collection_ids:
+            self.env['property.collection'].browse(collection_ids).write({'statement_archived': True})
+        
+        # No separate balance refresh: create() rebuilds each tenant from the
+        # carry date, which is the date of the earliest entry that moved
+        return len(moved)
+
+    @api.model
+    def cron_archive_statements(self):
+        """Scheduled archival of statement entries of closed agreements"""
+        return self._archive_closed_agreements()
+
+
+class PropertyStatementHistory(models.Model):
+    _name = 'property.statement.history'
+    _description = 'Statement History (Live and Archived)'
+    _auto = False
+    _order = 'transaction_date asc, statement_id asc'
+    _rec_name = 'reference'
+
+    statement_id = fields.Integer(string='Original Entry ID', readonly=True)
+    tenant_id = fields.Many2one('property.tenant', string='Tenant', readonly=True)
+    transaction_date = fields.Date(string='Transaction Date', readonly=True)
+    reference = fields.Char(string='Reference', readonly=True)
+    description = fields.Text(string='Description', readonly=True)
+    transaction_type = fields.Selection(
+        selection=lambda self: self.env['property.statement']._fields['transaction_type']._description_selection(self.env),
+        string='Transaction Type', readonly=True)
+    debit_amount = fields.Monetary('Debit', currency_field='currency_id', readonly=True)
+    credit_amount = fields.Monetary('Credit', currency_field='currency_id', readonly=True)
+    room_id = fields.Many2one('property.room', string='Room', readonly=True)
+    agreement_id = fields.Many2one('property.agreement', string='Agreement', readonly=True)
+    collection_id = fields.Many2one('property.collection', string='Collection', readonly=True)
+    currency_id = fields.Many2one('res.currency', string='Currency', readonly=True)
+    archived = fields.Boolean(string='Archived', readonly=True)
+
+    @property
+    def _table_query(self):
+        # Even ids for live entries, odd ids for archived ones; carry-forward
+        # rows are left out since the archived entries they stand for are shown
+        return f"""
+            SELECT s.id * 2 AS id, s.id AS statement_id, s.tenant_id, s.transaction_date, s.reference,
+                   s.description, s.transaction_type, s.debit_amount, s.credit_amount, s.room_id,
+                   s.agreement_id, s.collection_id, s.currency_id, FALSE AS archived
+              FROM property_statement s
+             WHERE s.period_key IS DISTINCT FROM '{CARRY_FORWARD_KEY}'
+            UNION ALL
+            SELECT a.id * 2 + 1, a.statement_id, a.tenant_id, a.transaction_date, a.reference,
+                   a.description, a.transaction_type, a.debit_amount, a.credit_amount, a.room_id,
+                   a.agreement_id, a.collection_id, a.currency_id, TRUE
+              FROM property_statement_archive a
+        """
+
+    @api.model
+    def _get_balances_before(self, tenant_ids, date):
+        """Return {tenant_id: balance} over live and archived entries dated before ``date``"""
+        self.env['property.statement'].flush_model()
+        self.env.cr.execute(f"""
+            SELECT t.tenant_id, COALESCE(SUM(COALESCE(h.debit_amount, 0) - COALESCE(h.credit_amount, 0)), 0)
+              FROM unnest(%s::int[]) AS t(tenant_id)
+         LEFT JOIN ({self._table_query}) h
+                ON h.tenant_id = t.tenant_id
+               AND h.transaction_date < %s
+          GROUP BY t.tenant_id
+        """, (list(tenant_ids), date))
+        return dict(self.env.cr.fetchall())
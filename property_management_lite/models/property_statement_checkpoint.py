@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class PropertyStatementCheckpoint(models.Model):
+    _name = 'property.statement.checkpoint'
+    _description = 'Statement Monthly Checkpoint'
+    _order = 'tenant_id, month'
+    _rec_name = 'month'
+
+    tenant_id = fields.Many2one('property.tenant', string='Tenant', required=True, ondelete='cascade', readonly=True)
+    month = fields.Date(string='Month', required=True, readonly=True, help="First day of the month")
+    debit_amount = fields.Float(string='Debits', digits=(16, 2), readonly=True)
+    credit_amount = fields.Float(string='Credits', digits=(16, 2), readonly=True)
+    entry_count = fields.Integer(string='Entries', readonly=True)
+    closing_balance = fields.Float(string='Closing Balance', digits=(16, 2), readonly=True,
+                                   help="Tenant balance after the last entry of the month")
+
+    _sql_constraints = [
+        ('tenant_month_unique', 'unique(tenant_id, month)', 'Only one checkpoint per tenant and month is allowed.'),
+    ]
+
+    def init(self):
+        # Seed checkpoints for databases that already have statement history
+        self.env.cr.execute("SELECT 1 FROM property_statement_checkpoint LIMIT 1")
+        if self.env.cr.fetchone():
+            return
+        self.env.cr.execute("SELECT DISTINCT tenant_id FROM property_statement WHERE tenant_id IS NOT NULL")
+        tenant_ids = [row[0] for row in self.env.cr.fetchall()]
+        if tenant_ids:
+            _logger.info("Building statement checkpoints for %s tenants", len(tenant_ids))
+            self._rebuild(dict.fromkeys(tenant_ids))
+
+    @api.model
+    def _rebuild(self, bounds):
+        """Rebuild checkpoints from the month of each tenant's date onwards
+
+        ``bounds`` maps tenant ids to the first transaction date that may have
+        changed (``None`` rebuilds every month of the tenant).
+        """
+        if not bounds:
+            return
+        self.env['property.statement'].flush_model(['tenant_id', 'transaction_date', 'debit_amount', 'credit_amount'])
+        tenant_ids = list(bounds)
+        params = (tenant_ids, [bounds[tenant_id] for tenant_id in tenant_ids])
+        self.env.cr.execute("""
+            DELETE FROM property_statement_checkpoint c
+             USING unnest(%s::int[], %s::date[]) AS b(tenant_id, date_from)
+             WHERE c.tenant_id = b.tenant_id
+               AND (b.date_from IS NULL OR c.month >= date_trunc('month', b.date_from)::date)
+        """, params)
+        self.env.cr.execute("""
+            WITH bounds AS (
+                SELECT b.tenant_id, date_trunc('month', b.date_from)::date AS month_from
+                  FROM unnest(%s::int[], %s::date[]) AS b(tenant_id, date_from)
+            ),
+            monthly AS (
+                SELECT s.tenant_id,
+                       date_trunc('month', s.transaction_date)::date AS month,
+                       SUM(COALESCE(s.debit_amount, 0)) AS debit_amount,
+                       SUM(COALESCE(s.credit_amount, 0)) AS credit_amount,
+                       COUNT(*) AS entry_count
+                  FROM property_statement s
+                  JOIN bounds b
+                    ON b.tenant_id = s.tenant_id
+                   AND (b.month_from IS NULL OR s.transaction_date >= b.month_from)
+              GROUP BY s.tenant_id, date_trunc('month', s.transaction_date)
+            ),
+            opening AS (
+                SELECT b.tenant_id,
+                       COALESCE((
+                           SELECT c.closing_balance
+                             FROM property_statement_checkpoint c
+                            WHERE c.tenant_id = b.tenant_id
+                              AND c.month < b.month_from
+                         ORDER BY c.month DESC
+                            LIMIT 1
+                       ), 0) AS balance
+                  FROM bounds b
+            )
+            INSERT INTO property_statement_checkpoint (
+                tenant_id, month, debit_amount, credit_amount, entry_count, closing_balance,
+                create_uid, create_date, write_uid, write_date
+            )
+            SELECT m.tenant_id, m.month, m.debit_amount, m.credit_amount, m.entry_count,
+                   o.balance + SUM(m.debit_amount - m.credit_amount) OVER (
+                       PARTITION BY m.tenant_id ORDER BY m.month ROWS UNBOUNDED PRECEDING
+                   ),
+                   %s, now() AT TIME ZONE 'UTC', %s, now() AT TIME ZONE 'UTC'
+              FROM monthly m
+              JOIN opening o ON o.tenant_id = m.tenant_id
+        """, params + (self.env.uid, self.env.uid))
+        self.invalidate_model()
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the daily collection reminder cron
+
+Loads 20,000 active agreements over generated tenants: half paid daily
+(a quarter of them already collected today) and half monthly, due today.
+Runs create_daily_collections_reminder() twice and prints the timing, the
+query count and the number of reminders created; the second run should
+create none. Everything runs inside one transaction that is rolled back.
+
+Run this script from Odoo shell (the module must be installed and at least
+one room must exist):
+    odoo-bin shell -d your_database -c your_config.conf
+    >>> exec(open('Custom_Addons/property_management_lite/scripts/benchmark_collection_reminders.py').read())
+"""
+import time
+from datetime import date
+
+# Get environment
+env = globals().get('env')
+if not env:
+    print("ERROR: This script must be run from Odoo shell")
+    print("Usage: odoo-bin shell -d your_database")
+    print("Then: exec(open('Custom_Addons/property_management_lite/scripts/benchmark_collection_reminders.py').read())")
+    exit(1)
+
+AGREEMENTS = 20000
+
+cr = env.cr
+today = date.today()
+
+print("\n" + "="*80)
+print("Collection Reminder Benchmark")
+print("="*80 + "\n")
+
+cr.execute("SELECT id FROM property_room ORDER BY id LIMIT 1")
+room = cr.fetchone()
+if not room:
+    print("ERROR: Create at least one room before running the benchmark")
+    exit(1)
+room_id = room[0]
+
+# ------------------------------------------------------------------
+# Dataset
+# ------------------------------------------------------------------
+start = time.time()
+cr.execute("""
+    INSERT INTO property_tenant (name, mobile, phone, email, id_passport, id_type, active)
+    SELECT 'Reminder Tenant ' || g, '+9710' || g, '+9710' || g, 'remind' || g || '@example.com',
+           'REMIND-' || g, 'emirates_id', true
+      FROM generate_series(1, %s) g
+ RETURNING id
+""", (AGREEMENTS,))
+tenant_ids = [row[0] for row in cr.fetchall()]
+
+cr.execute("""
+    INSERT INTO property_agreement (tenant_id, room_id, start_date, end_date, rent_amount, state,
+                                    payment_method, payment_frequency, payment_day)
+    SELECT t.ids[g], %s, %s::date - 30, %s::date + 335, 1000, 'active', 'cash',
+           CASE WHEN g %% 2 = 0 THEN 'daily' ELSE 'monthly' END, %s
+      FROM generate_series(1, %s) g, (SELECT %s::int[] AS ids) t
+ RETURNING id
+""", (room_id, today, today, today.day, AGREEMENTS, tenant_ids))
+agreement_ids = [row[0] for row in cr.fetchall()]
+
+cr.execute("""
+    INSERT INTO property_collection (tenant_id, room_id, agreement_id, date, amount_collected,
+                                     payment_method, collection_type, status, active)
+    SELECT a.tenant_id, a.room_id, a.id, %s, 1000, 'cash', 'rent', 'collected', true
+      FROM property_agreement a
+     WHERE a.id = ANY(%s) AND a.payment_frequency = 'daily' AND a.id %% 2 = 0
+""", (today, agreement_ids))
+env.invalidate_all()
+print(f"Loaded {AGREEMENTS:,} agreements in {time.time() - start:.1f}s\n")
+
+# ------------------------------------------------------------------
+# Runs
+# ------------------------------------------------------------------
+Collection = env['property.collection']
+for label in ('First run', 'Second run'):
+    queries_before = cr.sql_log_count
+    start = time.time()
+    created = Collection.create_daily_collections_reminder()
+    env.flush_all()
+    elapsed = time.time() - start
+    print(label)
+    print(f"   reminders created: {len(created):,}")
+    print(f"   queries:           {cr.sql_log_count - queries_before:,}")
+    print(f"   time:              {elapsed:.2f}s\n")
+
+cr.rollback()
+
+print("="*80)
+print("Benchmark finished, all generated data rolled back")
+print("="*80 + "\n")
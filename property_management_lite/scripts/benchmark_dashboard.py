@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the property dashboard
+
+Loads 2,000,000 collections and 1,000,000 statement entries over 5,000
+generated tenants, then opens the dashboard and prints the query count and
+time of each section. The query counts must not grow with the data; the
+script fails loudly when a section runs more queries than its budget.
+Everything runs inside one transaction that is rolled back at the end.
+
+Run this script from Odoo shell (the module must be installed and at least
+one room must exist):
+    odoo-bin shell -d your_database -c your_config.conf
+    >>> exec(open('Custom_Addons/property_management_lite/scripts/benchmark_dashboard.py').read())
+"""
+import time
+from datetime import date
+
+# Get environment
+env = globals().get('env')
+if not env:
+    print("ERROR: This script must be run from Odoo shell")
+    print("Usage: odoo-bin shell -d your_database")
+    print("Then: exec(open('Custom_Addons/property_management_lite/scripts/benchmark_dashboard.py').read())")
+    exit(1)
+
+COLLECTIONS = 2000000
+STATEMENTS = 1000000
+TENANTS = 5000
+
+# Maximum queries per section, whatever the data volume (record rule
+# lookups on a cold cache included)
+QUERY_BUDGETS = {
+    'collections': 3,
+    'expenses': 1,
+    'occupancy': 2,
+    'agents': 3,
+    'dues': 3,
+    'balances': 6,
+    'recent': 4,
+}
+
+cr = env.cr
+today = date.today()
+
+print("\n" + "="*80)
+print("Dashboard Benchmark")
+print("="*80 + "\n")
+
+cr.execute("SELECT id FROM property_room ORDER BY id LIMIT 1")
+room = cr.fetchone()
+if not room:
+    print("ERROR: Create at least one room before running the benchmark")
+    exit(1)
+room_id = room[0]
+
+# ------------------------------------------------------------------
+# Dataset
+# ------------------------------------------------------------------
+start = time.time()
+cr.execute("""
+    INSERT INTO property_tenant (name, mobile, phone, email, id_passport, id_type, status, active)
+    SELECT 'Dashboard Tenant ' || g, '+9710' || g, '+9710' || g, 'dash' || g || '@example.com',
+           'DASH-' || g, 'emirates_id', 'active', true
+      FROM generate_series(1, %s) g
+ RETURNING id
+""", (TENANTS,))
+tenant_ids = [row[0] for row in cr.fetchall()]
+
+cr.execute("""
+    INSERT INTO property_collection (tenant_id, room_id, date, amount_collected, payment_method,
+                                     collection_type, status, active)
+    SELECT t.ids[1 + (g %% %s)], %s, %s::date - (g %% 1500), 1000, 'cash', 'rent',
+           CASE WHEN g %% 50 = 0 THEN 'cancelled' ELSE 'collected' END, true
+      FROM generate_series(1, %s) g, (SELECT %s::int[] AS ids) t
+""", (TENANTS, room_id, today, COLLECTIONS, tenant_ids))
+
+cr.execute("""
+    INSERT INTO property_statement (tenant_id, transaction_date, reference, transaction_type, debit_amount, credit_amount)
+    SELECT t.ids[1 + (g %% %s)], %s::date - (g %% 1500), 'DASH/' || g,
+           CASE WHEN g %% 2 = 0 THEN 'rent' ELSE 'payment' END,
+           CASE WHEN g %% 2 = 0 THEN 1000 ELSE 0 END,
+           CASE WHEN g %% 2 = 0 THEN 0 ELSE 1000 END
+      FROM generate_series(1, %s) g, (SELECT %s::int[] AS ids) t
+""", (TENANTS, today, STATEMENTS, tenant_ids))
+env['property.statement.checkpoint']._rebuild(dict.fromkeys(tenant_ids))
+
+for table in ('property_tenant', 'property_collection', 'property_statement', 'property_statement_checkpoint'):
+    cr.execute(f"ANALYZE {table}")
+env.invalidate_all()
+print(f"Loaded {COLLECTIONS:,} collections and {STATEMENTS:,} statement entries in {time.time() - start:.1f}s\n")
+
+# ------------------------------------------------------------------
+# Sections
+# ------------------------------------------------------------------
+from odoo.addons.property_management_lite.models.property_dashboard import DASHBOARD_SECTIONS
+
+Dashboard = env['property.dashboard']
+over_budget = []
+total_queries = 0
+total_start = time.time()
+print(f"{'Section':<14}{'Queries':>10}{'Budget':>10}{'Time':>12}")
+for section, method in DASHBOARD_SECTIONS.items():
+    queries_before = cr.sql_log_count
+    start = time.time()
+    getattr(Dashboard, method)(today)
+    elapsed = time.time() - start
+    queries = cr.sql_log_count - queries_before
+    total_queries += queries
+    print(f"{section:<14}{queries:>10}{QUERY_BUDGETS[section]:>10}{elapsed * 1000:>10.0f}ms")
+    if queries > QUERY_BUDGETS[section]:
+        over_budget.append(section)
+print(f"{'total':<14}{total_queries:>10}{sum(QUERY_BUDGETS.values()):>10}{(time.time() - total_start) * 1000:>10.0f}ms\n")
+
+env.invalidate_all()
+start = time.time()
+Dashboard.default_get(list(Dashboard._fields))
+print(f"Dashboard default_get: {(time.time() - start) * 1000:.0f}ms")
+
+cr.rollback()
+
+print("\n" + "="*80)
+if over_budget:
+    print(f"FAILED: query budget exceeded by {', '.join(over_budget)}")
+else:
+    print("Benchmark finished within the query budgets, all generated data rolled back")
+print("="*80 + "\n")
@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the FIFO collection reconciliation engine
+
+Creates 50,000 posted rent invoices spread over 500 generated tenants, plus
+one collection per tenant covering most of its open balance, then times
+_reconcile_collections_fifo() in dry-run mode and for real. Everything runs
+inside one transaction that is rolled back at the end.
+
+Run this script from Odoo shell (the module must be installed, a cash
+journal must exist and at least one room must exist):
+    odoo-bin shell -d your_database -c your_config.conf
+    >>> exec(open('Custom_Addons/property_management_lite/scripts/benchmark_fifo_reconcile.py').read())
+"""
+import time
+from datetime import date, timedelta
+
+# Get environment
+env = globals().get('env')
+if not env:
+    print("ERROR: This script must be run from Odoo shell")
+    print("Usage: odoo-bin shell -d your_database")
+    print("Then: exec(open('Custom_Addons/property_management_lite/scripts/benchmark_fifo_reconcile.py').read())")
+    exit(1)
+
+INVOICES = 50000
+TENANTS = 500
+BATCH = 1000
+RENT = 1000.0
+
+print("\n" + "="*80)
+print("FIFO Reconciliation Benchmark")
+print("="*80 + "\n")
+
+room = env['property.room'].search([], limit=1)
+if not room:
+    print("ERROR: Create at least one room before running the benchmark")
+    exit(1)
+
+# ------------------------------------------------------------------
+# Dataset
+# ------------------------------------------------------------------
+start = time.time()
+tenants = env['property.tenant'].create([{
+    'name': f'FIFO Tenant {i}',
+    'mobile': f'+97155{i:07d}',
+    'phone': f'+97155{i:07d}',
+    'email': f'fifo{i}@example.com',
+    'id_passport': f'FIFO-{i}',
+    'id_type': 'emirates_id',
+} for i in range(TENANTS)])
+
+per_tenant = INVOICES // TENANTS
+base_date = date.today() - timedelta(days=per_tenant)
+invoice_vals = [{
+    'move_type': 'out_invoice',
+    'partner_id': tenant.partner_id.id,
+    'tenant_id': tenant.id,
+    'room_id': room.id,
+    'invoice_type': 'rent',
+    'invoice_date': base_date + timedelta(days=n),
+    'invoice_line_ids': [(0, 0, {'name': 'Benchmark rent', 'quantity': 1, 'price_unit': RENT, 'tax_ids': [(5, 0, 0)]})],
+} for n in range(per_tenant) for tenant in tenants]
+
+for offset in range(0, len(invoice_vals), BATCH):
+    env['account.move'].create(invoice_vals[offset:offset + BATCH]).action_post()
+print(f"Posted {len(invoice_vals):,} invoices in {time.time() - start:.1f}s")
+
+# Each tenant pays all but half a month, so the last allocation is partial
+start = time.time()
+collections = env['property.collection'].create_bulk([{
+    'tenant_id': tenant.id,
+    'room_id': room.id,
+    'date': date.today(),
+    'amount_collected': RENT * per_tenant - RENT / 2,
+    'payment_method': 'cash',
+    'collection_type': 'rent',
+    'status': 'collected',
+} for tenant in tenants])
+collections = env['property.collection'].browse([item['id'] for item in collections])
+# The queued registration jobs would compete with the engine
+env['property.payment.job'].search([('collection_id', 'in', collections.ids)]).write({'state': 'cancelled'})
+print(f"Created {len(collections):,} collections in {time.time() - start:.1f}s\n")
+
+env.flush_all()
+
+# ------------------------------------------------------------------
+# Dry run
+# ------------------------------------------------------------------
+start = time.time()
+result = collections._reconcile_collections_fifo(dry_run=True)
+elapsed = time.time() - start
+partials = sum(1 for step in result['plan'] if step['partial'])
+print("Dry run")
+print(f"   allocations:     {len(result['plan']):,} ({partials:,} partial)")
+print(f"   time:            {elapsed:.2f}s ({len(result['plan']) / max(elapsed, 0.001):,.0f} allocations/s)\n")
+
+# ------------------------------------------------------------------
+# Real run
+# ------------------------------------------------------------------
+queries_before = env.cr.sql_log_count
+start = time.time()
+result = collections._reconcile_collections_fifo()
+env.flush_all()
+elapsed = time.time() - start
+print("Reconcile")
+print(f"   payments created: {result['payments_created']:,}")
+print(f"   reconcile calls:  {result['reconcile_calls']:,}")
+print(f"   queries:          {env.cr.sql_log_count - queries_before:,}")
+print(f"   time:             {elapsed:.2f}s ({len(result['plan']) / max(elapsed, 0.001):,.0f} allocations/s)")
+
+env.cr.execute("""
+    SELECT payment_state, COUNT(*) FROM account_move
+     WHERE id = ANY(%s) GROUP BY payment_state ORDER BY payment_state
+""", (list({step['invoice_id'] for step in result['plan']}),))
+for state, count in env.cr.fetchall():
+    print(f"   {state:<16} {count:,}")
+
+env.cr.rollback()
+
+print("\n" + "="*80)
+print("Benchmark finished, all generated data rolled back")
+print("="*80 + "\n")
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark the module's composite indexes
+
+Loads 1,000,000 statement entries and 1,000,000 collections spread over
+5,000 generated tenants, then prints the query plan of each hot query with
+and without its index. Everything runs inside one transaction that is
+rolled back at the end, so the database is left untouched.
+
+Run this script from Odoo shell (the module must be installed and at least
+one room must exist):
+    odoo-bin shell -d your_database -c your_config.conf
+    >>> exec(open('Custom_Addons/property_management_lite/scripts/benchmark_indexes.py').read())
+"""
+import time
+
+# Get environment
+env = globals().get('env')
+if not env:
+    print("ERROR: This script must be run from Odoo shell")
+    print("Usage: odoo-bin shell -d your_database")
+    print("Then: exec(open('Custom_Addons/property_management_lite/scripts/benchmark_indexes.py').read())")
+    exit(1)
+
+ROWS = 1000000
+TENANTS = 5000
+
+cr = env.cr
+
+print("\n" + "="*80)
+print("Index Benchmark")
+print("="*80 + "\n")
+
+cr.execute("SELECT id FROM property_room ORDER BY id LIMIT 1")
+room = cr.fetchone()
+if not room:
+    print("ERROR: Create at least one room before running the benchmark")
+    exit(1)
+room_id = room[0]
+
+# ------------------------------------------------------------------
+# Dataset
+# ------------------------------------------------------------------
+start = time.time()
+cr.execute("""
+    INSERT INTO property_tenant (name, mobile, phone, email, id_passport, id_type, active)
+    SELECT 'Benchmark Tenant ' || g, '+9710' || g, '+9710' || g, 'bench' || g || '@example.com',
+           'BENCH-' || g, 'emirates_id', true
+      FROM generate_series(1, %s) g
+ RETURNING id
+""", (TENANTS,))
+tenant_ids = [row[0] for row in cr.fetchall()]
+
+cr.execute("""
+    INSERT INTO property_statement (tenant_id, transaction_date, reference, transaction_type, debit_amount, credit_amount)
+    SELECT t.ids[1 + (g %% %s)], DATE '2020-01-01' + (g %% 2000), 'BENCH/' || g,
+           CASE WHEN g %% 2 = 0 THEN 'rent' ELSE 'payment' END,
+           CASE WHEN g %% 2 = 0 THEN 1000 ELSE 0 END,
+           CASE WHEN g %% 2 = 0 THEN 0 ELSE 1000 END
+      FROM generate_series(1, %s) g, (SELECT %s::int[] AS ids) t
+""", (TENANTS, ROWS, tenant_ids))
+
+cr.execute("""
+    INSERT INTO property_collection (tenant_id, room_id, date, amount_collected, payment_method,
+                                     collection_type, status, active)
+    SELECT t.ids[1 + (g %% %s)], %s, DATE '2020-01-01' + (g %% 2000), 1000, 'cash',
+           'rent', 'collected', g %% 10 != 0
+      FROM generate_series(1, %s) g, (SELECT %s::int[] AS ids) t
+""", (TENANTS, room_id, ROWS, tenant_ids))
+
+cr.execute("ANALYZE property_tenant")
+cr.execute("ANALYZE property_statement")
+cr.execute("ANALYZE property_collection")
+cr.execute("ANALYZE property_agreement")
+cr.execute("ANALYZE account_move")
+print(f"Loaded {ROWS:,} statement entries and {ROWS:,} collections in {time.time() - start:.1f}s\n")
+
+sample_tenant = tenant_ids[len(tenant_ids) // 2]
+cr.execute("SELECT id FROM property_agreement ORDER BY id LIMIT 1")
+sample_agreement = (cr.fetchone() or [0])[0]
+
+QUERIES = [
+    ('property_statement_tenant_date_id_idx', 'Statement ledger walk', """
+        SELECT id, transaction_date, debit_amount, credit_amount FROM property_statement
+         WHERE tenant_id = %s AND transaction_date <= DATE '2024-12-31'
+      ORDER BY transaction_date, id LIMIT 2000
+    """, (sample_tenant,)),
+    ('property_collection_tenant_date_idx', 'Last collection of a tenant', """
+        SELECT id, date FROM property_collection
+         WHERE tenant_id = %s AND active ORDER BY date DESC LIMIT 1
+    """, (sample_tenant,)),
+    ('property_collection_room_date_idx', 'Room collections for a month', """
+        SELECT SUM(amount_collected) FROM property_collection
+         WHERE room_id = %s AND active AND date BETWEEN DATE '2022-03-01' AND DATE '2022-03-31'
+    """, (room_id,)),
+    ('property_collection_agreement_type_status_idx', 'Agreement rent collections', """
+        SELECT id FROM property_collection
+         WHERE agreement_id = %s AND collection_type = 'rent' AND status IN ('collected', 'verified')
+    """, (sample_agreement,)),
+    ('account_move_tenant_open_invoice_idx', 'Open invoices of a tenant', """
+        SELECT id FROM account_move
+         WHERE tenant_id = %s AND agreement_id = %s AND invoice_type = 'rent'
+           AND move_type = 'out_invoice' AND state = 'posted' AND payment_state IN ('not_paid', 'partial')
+      ORDER BY invoice_date, id
+    """, (sample_tenant, sample_agreement)),
+    ('property_agreement_room_state_period_idx', 'Active agreement of a room', """
+        SELECT id FROM property_agreement
+         WHERE room_id = %s AND state = 'active'
+           AND start_date <= CURRENT_DATE AND end_date >= CURRENT_DATE
+    """, (room_id,)),
+]
+
+
+def explain(query, params):
+    cr.execute("EXPLAIN (ANALYZE, BUFFERS) " + query, params)
+    plan = [row[0] for row in cr.fetchall()]
+    scans = [line.strip() for line in plan if 'Scan' in line]
+    timing = [line.strip() for line in plan if line.startswith('Execution Time')]
+    return scans[0] if scans else plan[0].strip(), timing[0] if timing else ''
+
+
+for index_name, label, query, params in QUERIES:
+    print(f"{label} ({index_name})")
+    cr.execute("SAVEPOINT bench_without_index")
+    cr.execute(f"DROP INDEX IF EXISTS {index_name}")
+    scan, timing = explain(query, params)
+    print(f"   without index: {scan}  [{timing}]")
+    cr.execute("ROLLBACK TO SAVEPOINT bench_without_index")
+    scan, timing = explain(query, params)
+    print(f"   with index:    {scan}  [{timing}]\n")
+
+cr.rollback()
+
+print("="*80)
+print("Benchmark finished, all generated data rolled back")
+print("="*80 + "\n")
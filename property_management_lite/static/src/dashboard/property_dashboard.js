@@ -0,0 +1,201 @@
+/** @odoo-module **/
+
+import { Component, onWillStart, useState } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { rpc } from "@web/core/network/rpc";
+import { useService } from "@web/core/utils/hooks";
+import { formatFloat, formatMonetary } from "@web/views/fields/formatters";
+
+// Cards in display order; each one is fetched from its own endpoint
+const CARDS = [
+    {
+        section: "collections",
+        title: "Collections",
+        action: "action_open_collections",
+        figures: [
+            { key: "today_collections", label: "Today", type: "monetary", count: "today_collections_count" },
+            { key: "week_collections", label: "This Week", type: "monetary", count: "week_collections_count" },
+            { key: "month_collections", label: "This Month", type: "monetary", count: "month_collections_count" },
+        ],
+    },
+    {
+        section: "expenses",
+        title: "Expenses",
+        figures: [
+            { key: "today_expenses", label: "Today", type: "monetary", count: "today_expenses_count" },
+            { key: "week_expenses", label: "This Week", type: "monetary", count: "week_expenses_count" },
+            { key: "month_expenses", label: "This Month", type: "monetary", count: "month_expenses_count" },
+        ],
+    },
+    {
+        section: "occupancy",
+        title: "Occupancy",
+        action: "action_open_rooms",
+        figures: [
+            { key: "total_properties", label: "Properties", type: "integer" },
+            { key: "total_rooms", label: "Rooms", type: "integer" },
+            { key: "occupied_rooms", label: "Occupied", type: "integer" },
+            { key: "vacant_rooms", label: "Vacant", type: "integer" },
+            { key: "occupancy_rate", label: "Occupancy", type: "percentage" },
+            { key: "total_tenants", label: "Active Tenants", type: "integer" },
+            { key: "month_new_tenants", label: "New This Month", type: "integer" },
+        ],
+    },
+    {
+        section: "agents",
+        title: "Agents",
+        action: "action_open_agents",
+        figures: [
+            { key: "total_agents", label: "Agents", type: "integer" },
+            { key: "agents_with_tenants", label: "With Tenants", type: "integer" },
+            { key: "top_agents_list", label: "Top Agents", type: "text" },
+        ],
+    },
+    {
+        section: "dues",
+        title: "Outstanding Dues",
+        action: "action_open_outstanding_dues",
+        figures: [
+            { key: "total_outstanding_amount", label: "Outstanding", type: "monetary", count: "total_outstanding_count" },
+            { key: "overdue_amount", label: "Overdue", type: "monetary", count: "overdue_tenants_count" },
+            { key: "critical_overdue_amount", label: "Critical", type: "monetary", count: "critical_overdue_count" },
+            { key: "top_debtors_list", label: "Top Debtors", type: "text" },
+            // Only sent for a property filter: the net statement balance, not the dues above
+            { key: "statement_outstanding_amount", label: "Statement Balance", type: "monetary" },
+            { key: "statement_overdue_amount", label: "Statement Balance (30+ Days)", type: "monetary" },
+        ],
+    },
+    {
+        section: "balances",
+        title: "Statement Balances",
+        action: "action_open_statement_analysis",
+        figures: [
+            { key: "month_total_debits", label: "Charges This Month", type: "monetary" },
+            { key: "month_total_credits", label: "Payments This Month", type: "monetary" },
+            { key: "collection_efficiency", label: "Collection Efficiency", type: "percentage" },
+            { key: "tenants_with_positive_balance", label: "Tenants Owing", type: "integer" },
+            { key: "tenants_with_negative_balance", label: "Tenants in Credit", type: "integer" },
+        ],
+    },
+    {
+        section: "recent",
+        title: "Recent Activity",
+        figures: [
+            { key: "recent_collections", label: "Collections", type: "text" },
+            { key: "recent_tenants", label: "Tenants", type: "text" },
+        ],
+    },
+];
+
+export class PropertyDashboard extends Component {
+    static template = "property_management_lite.PropertyDashboard";
+    static props = ["*"];
+
+    setup() {
+        this.orm = useService("orm");
+        this.action = useService("action");
+        this.cards = CARDS;
+        this.state = useState({
+            cards: Object.fromEntries(CARDS.map((card) => [card.section, { loading: true }])),
+            properties: [],
+            myPropertyIds: [],
+            filter: "all",
+        });
+        onWillStart(async () => {
+            const { properties, default_ids } = await rpc("/property_management_lite/dashboard_properties");
+            this.state.properties = properties;
+            this.state.myPropertyIds = default_ids;
+            this.state.filter = default_ids.length ? "mine" : "all";
+            // Do not wait for the cards: each one renders as soon as it arrives
+            this.loadCards();
+        });
+    }
+
+    get propertyIds() {
+        if (this.state.filter === "all") {
+            return [];
+        }
+        if (this.state.filter === "mine") {
+            return this.state.myPropertyIds;
+        }
+        return [parseInt(this.state.filter)];
+    }
+
+    onFilterChange(ev) {
+        this.state.filter = ev.target.value;
+        this.loadCards();
+    }
+
+    loadCards(refresh = false) {
+        for (const card of CARDS) {
+            this.loadCard(card.section, refresh);
+        }
+    }
+
+    async loadCard(section, refresh = false) {
+        const card = this.state.cards[section];
+        // Only the latest request of a card may update it when the filter changes quickly
+        const requestId = (card.requestId || 0) + 1;
+        Object.assign(card, { requestId, loading: true, error: false });
+        const started = performance.now();
+        try {
+            const result = await rpc(`/property_management_lite/dashboard/${section}`, {
+                refresh,
+                property_ids: this.propertyIds,
+            });
+            if (card.requestId === requestId) {
+                Object.assign(card, result, { roundTripMs: Math.round(performance.now() - started) });
+            }
+        } catch {
+            if (card.requestId === requestId) {
+                card.error = true;
+            }
+        } finally {
+            if (card.requestId === requestId) {
+                card.loading = false;
+            }
+        }
+    }
+
+    get profit() {
+        const collections = this.state.cards.collections.values;
+        const expenses = this.state.cards.expenses.values;
+        if (!collections || !expenses) {
+            return null;
+        }
+        return ["today", "week", "month"].map((period) => ({
+            label: { today: "Today", week: "This Week", month: "This Month" }[period],
+            value: formatMonetary(collections[`${period}_collections`] - expenses[`${period}_expenses`], {
+                currencyId: this.currencyId,
+            }),
+        }));
+    }
+
+    get currencyId() {
+        return this.env.services.company?.currentCompany?.currency_id;
+    }
+
+    formatFigure(figure, values) {
+        const value = values[figure.key];
+        if (value === undefined || value === null) {
+            return "";
+        }
+        switch (figure.type) {
+            case "monetary":
+                return formatMonetary(value, { currencyId: this.currencyId });
+            case "percentage":
+                return `${formatFloat(value * 100, { digits: [false, 1] })}%`;
+            case "integer":
+                return String(value);
+            default:
+                return value;
+        }
+    }
+
+    async openCard(card) {
+        const action = await this.orm.call("property.dashboard", card.action, [[]]);
+        this.action.doAction(action);
+    }
+}
+
+registry.category("actions").add("property_management_lite.dashboard", PropertyDashboard);
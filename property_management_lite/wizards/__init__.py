@@ -3,4 +3,7 @@
 from . import agreement_clean_wizard
 
 from . import property_data_import_wizard
-from . import property_statement_wizard
\ No newline at end of file
+from . import property_statement_wizard
+from . import property_collection_bulk_wizard
+from . import property_collection_fifo_wizard
+from . import property_kpi_backfill_wizard
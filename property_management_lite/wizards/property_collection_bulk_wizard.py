@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+
+class PropertyCollectionBulkWizard(models.TransientModel):
+    _name = 'property.collection.bulk.wizard'
+    _description = 'Bulk Collection Entry'
+
+    date = fields.Date(string='Collection Date', required=True, default=fields.Date.today)
+    collection_type = fields.Selection(
+        selection=lambda self: self.env['property.collection']._fields['collection_type'].selection,
+        string='Collection Type', required=True, default='rent')
+    payment_method = fields.Selection(
+        selection=lambda self: self.env['property.collection']._fields['payment_method'].selection,
+        string='Payment Method', required=True, default='cash')
+    property_id = fields.Many2one('property.property', string='Property',
+                                  help="Load the active tenants of this property as lines")
+    line_ids = fields.One2many('property.collection.bulk.wizard.line', 'wizard_id', string='Collections')
+    total_amount = fields.Float(string='Total Amount', compute='_compute_total_amount')
+
+    @api.depends('line_ids.amount_collected')
+    def _compute_total_amount(self):
+        for wizard in self:
+            wizard.total_amount = sum(wizard.line_ids.mapped('amount_collected'))
+
+    def action_load_tenants(self):
+        """Add a line for every active tenant of the property, pre-filled with the rent"""
+        self.ensure_one()
+        if not self.property_id:
+            raise UserError(_('Please select a property first.'))
+        tenants = self.env['property.tenant'].search([
+            ('current_property_id', '=', self.property_id.id),
+            ('current_agreement_id.state', '=', 'active'),
+        ], order='current_room_number, name')
+        existing = set(self.line_ids.tenant_id.ids)
+        self.write({'line_ids': [(0, 0, {
+            'tenant_id': tenant.id,
+            'room_id': tenant.current_room_id.id,
+            'amount_collected': tenant.current_agreement_id.rent_amount if self.collection_type == 'rent' else 0.0,
+        }) for tenant in tenants if tenant.id not in existing]})
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_create_collections(self):
+        """Create all lines with a single bulk call and show the result"""
+        self.ensure_one()
+        lines = self.line_ids.filtered(lambda l: l.amount_collected > 0)
+        if not lines:
+            raise UserError(_('Please enter at least one collection with an amount.'))
+        
+        # Keyed per line, so a double submit of the wizard creates nothing twice
+        results = self.env['property.collection'].create_bulk([{
+            'date': self.date,
+            'tenant_id': line.tenant_id.id,
+            'room_id': line.room_id.id or line.tenant_id.current_room_id.id,
+            'agreement_id': line.tenant_id.current_agreement_id.id,
+            'amount_collected': line.amount_collected,
+            'collection_type': self.collection_type,
+            'payment_method': line.payment_method or self.payment_method,
+            'reference_number': line.reference_number,
+            'notes': line.notes,
+            'idempotency_key': f'bulk-wizard-line-{line.id}',
+        } for line in lines])
+        collection_ids = [item['id'] for item in results]
+        
+        return {
+            'name': _('Collections Created'),
+            'type': 'ir.actions.act_window',
+            'res_model': 'property.collection',
+            'view_mode': 'list,form',
+            'domain': [('id', 'in', collection_ids)],
+            'target': 'current',
+        }
+
+
+class PropertyCollectionBulkWizardLine(models.TransientModel):
+    _name = 'property.collection.bulk.wizard.line'
+    _description = 'Bulk Collection Entry Line'
+
+    wizard_id = fields.Many2one('property.collection.bulk.wizard', string='Wizard', required=True, ondelete='cascade')
+    tenant_id = fields.Many2one('property.tenant', string='Tenant', required=True)
+    room_id = fields.Many2one('property.room', string='Room')
+    amount_collected = fields.Float(string='Amount', required=True)
+    payment_method = fields.Selection(
+        selection=lambda self: self.env['property.collection']._fields['payment_method'].selection,
+        string='Payment Method', help="Leave empty to use the method of the batch")
+    reference_number = fields.Char(string='Reference Number')
+    notes = fields.Char(string='Notes')
+
+    @api.onchange('tenant_id')
+    def _onchange_tenant_id(self):
+        if self.tenant_id:
+            self.room_id = self.tenant_id.current_room_id
+            if not self.amount_collected and self.tenant_id.current_agreement_id:
+                self.amount_collected = self.tenant_id.current_agreement_id.rent_amount
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+
+class PropertyCollectionFifoWizard(models.TransientModel):
+    _name = 'property.collection.fifo.wizard'
+    _description = 'FIFO Collection Reconciliation'
+
+    collection_ids = fields.Many2many('property.collection', string='Collections')
+    line_ids = fields.One2many('property.collection.fifo.wizard.line', 'wizard_id', string='Planned Allocations',
+                               readonly=True)
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('preview', 'Preview'),
+        ('done', 'Done'),
+    ], string='Status', default='draft', readonly=True)
+    total_allocated = fields.Float(string='Total Allocated', compute='_compute_total_allocated')
+    result_message = fields.Text(string='Result', readonly=True)
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        if self.env.context.get('active_model') == 'property.collection' and self.env.context.get('active_ids'):
+            res['collection_ids'] = [(6, 0, self.env.context['active_ids'])]
+        return res
+
+    @api.depends('line_ids.amount')
+    def _compute_total_allocated(self):
+        for wizard in self:
+            wizard.total_allocated = sum(wizard.line_ids.mapped('amount'))
+
+    def _reopen(self):
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def action_preview(self):
+        """Dry run: show how the collections would be allocated, without writing anything"""
+        self.ensure_one()
+        if not self.collection_ids:
+            raise UserError(_('Please select the collections to reconcile.'))
+        result = self.collection_ids._reconcile_collections_fifo(dry_run=True)
+        self.write({
+            'line_ids': [(5, 0, 0)] + [(0, 0, {
+                'collection_id': allocation['collection_id'],
+                'tenant_id': allocation['tenant_id'],
+                'invoice_id': allocation['invoice_id'],
+                'amount': allocation['amount'],
+                'invoice_residual': allocation['invoice_residual'],
+                'partial': allocation['partial'],
+            }) for allocation in result['plan']],
+            'state': 'preview',
+        })
+        return self._reopen()
+
+    def action_reconcile(self):
+        """Create the missing payments and reconcile them oldest invoice first"""
+        self.ensure_one()
+        if not self.collection_ids:
+            raise UserError(_('Please select the collections to reconcile.'))
+        # The engine registers the payments itself; the queued jobs would register them twice
+        self.env['property.payment.job'].search([
+            ('collection_id', 'in', self.collection_ids.ids),
+            ('state', '=', 'pending'),
+        ]).write({'state': 'cancelled', 'done_date': fields.Datetime.now()})
+        result = self.collection_ids._reconcile_collections_fifo()
+        self.write({
+            'state': 'done',
+            'result_message': _(
+                '%(payments)s payment(s) created, %(allocations)s allocation(s) over %(calls)s reconciliation(s).',
+                payments=result['payments_created'], allocations=len(result['plan']),
+                calls=result['reconcile_calls']),
+        })
+        return self._reopen()
+
+
+class PropertyCollectionFifoWizardLine(models.TransientModel):
+    _name = 'property.collection.fifo.wizard.line'
+    _description = 'FIFO Collection Reconciliation Line'
+    _order = 'id'
+
+    wizard_id = fields.Many2one('property.collection.fifo.wizard', string='Wizard', required=True, ondelete='cascade')
+    collection_id = fields.Many2one('property.collection', string='Collection', readonly=True)
+    tenant_id = fields.Many2one('property.tenant', string='Tenant', readonly=True)
+    invoice_id = fields.Many2one('account.move', string='Invoice', readonly=True)
+    amount = fields.Float(string='Allocated', readonly=True)
+    invoice_residual = fields.Float(string='Invoice Balance After', readonly=True)
+    partial = fields.Boolean(string='Partially Paid', readonly=True)
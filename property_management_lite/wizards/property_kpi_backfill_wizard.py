@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+################################################################################
+#
+#   SOD Infotech(https://sodinfotech.com/)
+#
+#
+#    This program is under the terms of Odoo Proprietary License v1.0 (OPL-1)
+#    It is forbidden to publish, distribute, sublicense, or sell copies of the
+#    Software or modified copies of the Software.
+#
+#    THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NON INFRINGEMENT. IN NO EVENT SHALL
+#    THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM,DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE,ARISING
+#    FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+#    DEALINGS IN THE SOFTWARE.
+#
+################################################################################
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+
+class PropertyKpiBackfillWizard(models.TransientModel):
+    _name = 'property.kpi.backfill.wizard'
+    _description = 'Daily KPI Backfill'
+
+    date_from = fields.Date(string='From Date', required=True,
+                            default=lambda self: fields.Date.today().replace(month=1, day=1))
+    date_to = fields.Date(string='To Date', required=True, default=fields.Date.today)
+    company_id = fields.Many2one('res.company', string='Company', required=True,
+                                 default=lambda self: self.env.company)
+
+    def action_backfill(self):
+        """Recompute the daily KPI rows of the period"""
+        self.ensure_one()
+        if self.date_from > self.date_to:
+            raise UserError(_('The start date must be before the end date.'))
+        self.env['property.kpi.daily']._backfill(self.date_from, self.date_to, company=self.company_id)
+        return {
+            'name': 'Daily KPIs',
+            'type': 'ir.actions.act_window',
+            'res_model': 'property.kpi.daily',
+            'view_mode': 'graph,pivot,list',
+            'domain': [('company_id', '=', self.company_id.id)],
+            'target': 'current',
+        }
@@ -17,15 +17,33 @@
 #    DEALINGS IN THE SOFTWARE.
 #
 ################################################################################
-from odoo import models, fields, api
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
 from datetime import datetime, timedelta
+import csv
+import os
+import re
+import tempfile
+import zipfile
+import logging
+
+import xlsxwriter
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.pdfgen import canvas
+
+_logger = logging.getLogger(__name__)
+
+# Statement rows fetched per round trip when exporting
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_HEADER = ['Date', 'Reference', 'Type', 'Description', 'Debit', 'Credit', 'Balance']
 
 
 class PropertyStatementWizard(models.TransientModel):
     _name = 'property.statement.wizard'
     _description = 'Statement Report Generator'
 
-    tenant_id = fields.Many2one('property.tenant', string='Tenant', required=True)
+    tenant_id = fields.Many2one('property.tenant', string='Tenant')
     date_from = fields.Date(string='From Date', required=True, 
                            default=lambda self: fields.Date.today().replace(day=1))
     date_to = fields.Date(string='To Date', required=True, default=fields.Date.today)
@@ -36,11 +54,21 @@ class PropertyStatementWizard(models.TransientModel):
     ], string='Report Type', default='detailed', required=True)
     
     include_zero_transactions = fields.Boolean(string='Include Zero Amount Transactions', default=False)
+    include_archived = fields.Boolean(string='Include Archived Entries', default=False,
+                                      help="Show entries of closed agreements that were moved to the archive")
 
-    def action_generate_report(self):
-        """Generate and display the statement report"""
-        self.ensure_one()
-        
+    # Export
+    export_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel (XLSX)'),
+        ('pdf', 'PDF'),
+    ], string='Export Format', default='xlsx', required=True)
+    batch_mode = fields.Boolean(string='All Tenants of a Property',
+                                help="Export one statement file per tenant of the selected property, bundled in a zip")
+    property_id = fields.Many2one('property.property', string='Property')
+
+    def _get_statement_domain(self):
+        """Domain of the statement entries shown on screen"""
         domain = [
             ('tenant_id', '=', self.tenant_id.id),
             ('transaction_date', '>=', self.date_from),
@@ -51,12 +79,23 @@ class PropertyStatementWizard(models.TransientModel):
             domain.append('|')
             domain.append(('debit_amount', '!=', 0))
             domain.append(('credit_amount', '!=', 0))
+        return domain
+
+    def action_generate_report(self):
+        """Generate and display the statement report"""
+        self.ensure_one()
+        if not self.tenant_id:
+            raise UserError(_('Please select a tenant.'))
+        
+        domain = self._get_statement_domain()
+        # Archived entries are only reachable through the history view
+        res_model = 'property.statement.history' if self.include_archived else 'property.statement'
         
         if self.report_type == 'detailed':
             return {
                 'name': f'Statement - {self.tenant_id.name} ({self.date_from} to {self.date_to})',
                 'type': 'ir.actions.act_window',
-                'res_model': 'property.statement',
+                'res_model': res_model,
                 'view_mode': 'list',
                 'domain': domain,
                 'context': {
@@ -69,11 +108,224 @@ class PropertyStatementWizard(models.TransientModel):
             return {
                 'name': f'Statement Summary - {self.tenant_id.name}',
                 'type': 'ir.actions.act_window',
-                'res_model': 'property.statement',
+                'res_model': res_model,
                 'view_mode': 'pivot,graph',
                 'domain': domain,
                 'context': {
                     'search_default_tenant_id': self.tenant_id.id,
                 },
                 'target': 'current',
-            }
\ No newline at end of file
+            }
+
+    def _get_export_tenants(self):
+        """Tenants to export: the selected one, or every tenant of the property in batch mode"""
+        if not self.batch_mode:
+            if not self.tenant_id:
+                raise UserError(_('Please select a tenant.'))
+            return self.tenant_id
+        if not self.property_id:
+            raise UserError(_('Please select a property for the batch export.'))
+        tenants = self.env['property.tenant'].search([('current_property_id', '=', self.property_id.id)], order='name, id')
+        if not tenants:
+            raise UserError(_('No tenants found for property %s.', self.property_id.name))
+        return tenants
+
+    def action_export_statement(self):
+        """Write the statement of account to a file and download it"""
+        self.ensure_one()
+        if self.date_from > self.date_to:
+            raise UserError(_('From Date must be before To Date.'))
+        tenants = self._get_export_tenants()
+        
+        # Balance carried in from before the period, for all tenants in one query
+        if self.include_archived:
+            openings = self.env['property.statement.history']._get_balances_before(tenants.ids, self.date_from)
+        else:
+            openings = {
+                tenant_id: balance['balance']
+                for tenant_id, balance in self.env['property.statement'].get_tenant_balances(
+                    tenants.ids, self.date_from - timedelta(days=1)).items()
+            }
+        
+        start = datetime.now()
+        with tempfile.TemporaryDirectory(prefix='property_statement_') as tmpdir:
+            paths = []
+            for tenant in tenants:
+                filename = self._get_export_filename(tenant)
+                path = os.path.join(tmpdir, filename)
+                self._write_statement_file(tenant, openings[tenant.id], path)
+                paths.append((path, filename))
+            
+            if self.batch_mode:
+                filename = f"statements_{self._slugify(self.property_id.name)}_{self.date_from}_{self.date_to}.zip"
+                zip_path = os.path.join(tmpdir, filename)
+                with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as archive:
+                    for path, arcname in paths:
+                        archive.write(path, arcname)
+                path = zip_path
+            else:
+                path, filename = paths[0]
+            
+            # Drop the files of earlier exports from this wizard
+            self._get_export_attachments().unlink()
+            attachment = self._store_export_file(path, filename)
+        
+        _logger.info("Exported %s statement(s) as %s in %.2fs",
+                     len(tenants), self.export_format, (datetime.now() - start).total_seconds())
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{attachment.id}?download=true',
+            'target': 'self',
+        }
+
+    def _get_export_attachments(self):
+        return self.env['ir.attachment'].sudo().search([('res_model', '=', self._name), ('res_id', 'in', self.ids)])
+
+    def _store_export_file(self, path, filename):
+        """Attach an export file to the wizard, stored wherever attachments are configured to go"""
+        with open(path, 'rb') as output:
+            return self.env['ir.attachment'].sudo().create({
+                'name': filename,
+                'type': 'binary',
+                'raw': output.read(),
+                'res_model': self._name,
+                'res_id': self.id,
+            })
+
+    def unlink(self):
+        # Export files are attached to the wizard; do not leave them behind when it is vacuumed
+        self._get_export_attachments().unlink()
+        return super().unlink()
+
+    @staticmethod
+    def _slugify(value):
+        return re.sub(r'[^A-Za-z0-9_-]+', '_', value or '').strip('_') or 'statement'
+
+    def _get_export_filename(self, tenant):
+        return f"statement_{self._slugify(tenant.name)}_{tenant.id}_{self.date_from}_{self.date_to}.{self.export_format}"
+
+    def _iter_statement_rows(self, tenant, opening_balance):
+        """Yield export rows for a tenant, reading entries in keyset-paginated chunks
+
+        The first row carries the opening balance in; each following row
+        holds the balance after the entry, so memory use does not grow with
+        the size of the ledger.
+        """
+        type_labels = dict(self.env['property.statement']._fields['transaction_type']._description_selection(self.env))
+        balance = opening_balance
+        yield [self.date_from, '', '', 'Opening Balance', 0.0, 0.0, balance]
+        
+        self.env['property.statement'].flush_model()
+        if self.include_archived:
+            # Archived entries keep their original id, so the merged ledger sorts as it did live
+            source, key = f"({self.env['property.statement.history']._table_query}) src", 'statement_id'
+        else:
+            source, key = 'property_statement', 'id'
+        amount_filter = "" if self.include_zero_transactions else \
+            "AND (COALESCE(debit_amount, 0) != 0 OR COALESCE(credit_amount, 0) != 0)"
+        last_date, last_id = self.date_from, 0
+        while True:
+            self.env.cr.execute(f"""
+                SELECT {key}, transaction_date, reference, transaction_type, description,
+                       COALESCE(debit_amount, 0), COALESCE(credit_amount, 0)
+                  FROM {source}
+                 WHERE tenant_id = %s
+                   AND transaction_date <= %s
+                   AND (transaction_date, {key}) > (%s, %s)
+                   {amount_filter}
+              ORDER BY transaction_date, {key}
+                 LIMIT %s
+            """, (tenant.id, self.date_to, last_date, last_id, EXPORT_CHUNK_SIZE))
+            rows = self.env.cr.fetchall()
+            if not rows:
+                break
+            for row_id, date, reference, transaction_type, description, debit, credit in rows:
+                balance += debit - credit
+                yield [date, reference, type_labels.get(transaction_type, transaction_type),
+                       description or '', debit, credit, balance]
+            last_date, last_id = rows[-1][1], rows[-1][0]
+            if len(rows) < EXPORT_CHUNK_SIZE:
+                break
+        
+        yield [self.date_to, '', '', 'Closing Balance', 0.0, 0.0, balance]
+
+    def _write_statement_file(self, tenant, opening_balance, path):
+        rows = self._iter_statement_rows(tenant, opening_balance)
+        if self.export_format == 'csv':
+            self._write_csv(path, rows)
+        elif self.export_format == 'xlsx':
+            self._write_xlsx(path, tenant, rows)
+        else:
+            self._write_pdf(path, tenant, rows)
+
+    def _write_csv(self, path, rows):
+        with open(path, 'w', newline='', encoding='utf-8') as output:
+            writer = csv.writer(output)
+            writer.writerow(EXPORT_HEADER)
+            for row in rows:
+                writer.writerow([fields.Date.to_string(row[0])] + row[1:4] + ['%.2f' % amount for amount in row[4:]])
+
+    def _write_xlsx(self, path, tenant, rows):
+        # constant_memory flushes each row to disk once the next one starts
+        workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+        sheet = workbook.add_worksheet('Statement')
+        bold = workbook.add_format({'bold': True})
+        date_format = workbook.add_format({'num_format': 'yyyy-mm-dd'})
+        amount_format = workbook.add_format({'num_format': '#,##0.00'})
+        sheet.set_column(0, 0, 12)
+        sheet.set_column(1, 2, 18)
+        sheet.set_column(3, 3, 50)
+        sheet.set_column(4, 6, 14)
+        
+        sheet.write(0, 0, f'Statement of Account - {tenant.name}', bold)
+        sheet.write(1, 0, f'{self.date_from} to {self.date_to}')
+        for col, title in enumerate(EXPORT_HEADER):
+            sheet.write(3, col, title, bold)
+        for row_index, row in enumerate(rows, start=4):
+            sheet.write_datetime(row_index, 0, datetime.combine(row[0], datetime.min.time()), date_format)
+            sheet.write_string(row_index, 1, row[1] or '')
+            sheet.write_string(row_index, 2, row[2] or '')
+            sheet.write_string(row_index, 3, row[3])
+            for col in (4, 5, 6):
+                sheet.write_number(row_index, col, row[col], amount_format)
+        workbook.close()
+
+    def _write_pdf(self, path, tenant, rows):
+        # Pages are drawn as rows arrive and released by showPage()
+        page_width, page_height = landscape(A4)
+        margin = 36
+        line_height = 14
+        columns = [margin, margin + 70, margin + 180, margin + 290, margin + 560, margin + 640, margin + 720]
+        pdf = canvas.Canvas(path, pagesize=(page_width, page_height))
+        
+        def start_page(page):
+            pdf.setFont('Helvetica-Bold', 12)
+            pdf.drawString(margin, page_height - margin, f'Statement of Account - {tenant.name}')
+            pdf.setFont('Helvetica', 9)
+            pdf.drawString(margin, page_height - margin - 16, f'{self.date_from} to {self.date_to}')
+            pdf.drawRightString(page_width - margin, page_height - margin - 16, f'Page {page}')
+            pdf.setFont('Helvetica-Bold', 9)
+            y = page_height - margin - 40
+            for index, title in enumerate(EXPORT_HEADER):
+                if index >= 4:
+                    pdf.drawRightString(columns[index] + 60, y, title)
+                else:
+                    pdf.drawString(columns[index], y, title)
+            pdf.setFont('Helvetica', 8)
+            return y - line_height
+        
+        page = 1
+        y = start_page(page)
+        for row in rows:
+            if y < margin:
+                pdf.showPage()
+                page += 1
+                y = start_page(page)
+            pdf.drawString(columns[0], y, fields.Date.to_string(row[0]))
+            pdf.drawString(columns[1], y, (row[1] or '')[:20])
+            pdf.drawString(columns[2], y, (row[2] or '')[:20])
+            pdf.drawString(columns[3], y, row[3].replace('\n', ' ')[:55])
+            for index in (4, 5, 6):
+                pdf.drawRightString(columns[index] + 60, y, '{:,.2f}'.format(row[index]))
+            y -= line_height
+        pdf.save()